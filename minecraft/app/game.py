@@ -1,12 +1,28 @@
+import math, os, time
 from ursina import *
+from minecraft.config.settings import Settings
 from minecraft.systems.world import WorldManager
-from minecraft.systems.ui import UIManager
+from minecraft.systems.ui import UIManager, DebugOverlay
+from minecraft.systems.profiler import FrameProfiler, rss_mb
+from minecraft.core.chunk import world_to_block
 from minecraft.core.player import PlayerController
+from minecraft.core.chunk_mesh import ChunkRenderer
+from minecraft.systems.streaming import ChunkStreamer
+from minecraft.systems.region import RegionStore
+from minecraft.systems.replay import Recorder, Recording
+
+CSV_COUNTS = ('chunks', 'meshed', 'dirty', 'visible', 'frustum_culled', 'distance_culled', 'entities', 'ticks_queued', 'memory_mb')
 
 
 class MinecraftGame:
-    def __init__(self):
+    # replay: path of a Recording to play back; record: path to save this
+    # session's input to on exit. Both need a fresh world (no SAVE_DIR).
+    def __init__(self, replay=None, record=None):
         self.app = Ursina()
+        recording = Recording.load(replay) if replay else None
+        if recording:
+            Settings.SEED = recording.seed
+        self.record_path = record
 
         # --- 修改开始 ---
         # 暂时把背景改成黑色，方便看清楚方块
@@ -16,17 +32,92 @@ class MinecraftGame:
         # scene.fog_color = window.color
         # --- 修改结束 ---
 
-        self.world = WorldManager()
+        self.storage = None
+        if Settings.SAVE_DIR:
+            # An existing save keeps the seed it was generated with; asking
+            # for another one explicitly is an error, not a silent swap.
+            self.storage = RegionStore(Settings.SAVE_DIR)
+            if Settings.SEED_PINNED and self.storage.seed != Settings.SEED:
+                raise ValueError(f'{Settings.SAVE_DIR} holds a world with seed {self.storage.seed}, not '
+                                 f'{Settings.SEED}: move it away or drop --seed / MINECRAFT_SEED')
+            Settings.SEED = self.storage.seed
+        self.world = WorldManager(renderer=ChunkRenderer(), storage=self.storage)
         # ... 后面的代码不变
         self.ui = UIManager()
-        self.world.generate_terrain()
-        self.player = PlayerController(self.world, self.ui)
+        self.streamer = None
+        if Settings.INFINITE_WORLD:
+            self.streamer = ChunkStreamer(self.world)
+            self.streamer.preload((0, 0, 0))
+        else:
+            self.world.generate_terrain()
+        self.profiler = FrameProfiler()
+        if recording:
+            self.player = PlayerController(self.world, self.ui, profiler=self.profiler,
+                                           replay=iter(recording), position=recording.position)
+        else:
+            self.player = PlayerController(self.world, self.ui, profiler=self.profiler)
+        if record:
+            self.player.recorder = Recorder(Settings.SEED, self.player.body.position)
+        self.overlay = DebugOverlay(self.profiler, self.world)
 
         self.app.input = self.input
+        self.ticker = Entity(update=self.update)
+
+    def update(self):
+        p = self.profiler
+        scripted = self.player.replay is not None or self.player.recorder is not None
+        if self.streamer:
+            with p.section('generation'):
+                self.streamer.schedule(self.player.position)
+                if scripted:
+                    # Recorded and replayed runs must never wait on streaming.
+                    self.streamer.ensure(self.player.position)
+            with p.section('upload'):
+                self.streamer.upload()
+        with p.section('ticks'):
+            if scripted and self.player.frame is not None:
+                # As in replay.replay: the frame's recorded dt and no time
+                # budget, so block updates come out the same on every run.
+                self.world.ticks.update(self.player.frame.dt, budget_ms=math.inf)
+            else:
+                self.world.ticks.update(time.dt)
+        with p.section('upload'):
+            self.world.flush_remesh()
+        renderer = self.world.renderer
+        renderer.cull()
+        cull = renderer.culler.stats
+        p.end_frame(chunks=len(self.world.chunks), meshed=len(renderer.meshes), dirty=len(self.world.dirty),
+                    visible=cull['visible'], frustum_culled=cull['frustum_culled'],
+                    distance_culled=cull['distance_culled'], entities=len(scene.entities),
+                    ticks_queued=len(self.world.ticks.queue), memory_mb=rss_mb())
+        self.overlay.refresh(self.player.position, self.world.get_block(world_to_block(self.player.position - Vec3(0, 0.01, 0))))
 
     def input(self, key):
+        with self.profiler.section('input'):
+            self.handle_key(key)
+
+    def handle_key(self, key):
         # 删掉 super().input(key)
+        if key == 'f3':
+            self.overlay.toggle()
+        if key == 'f4':
+            # 把每一帧的耗时写入 CSV，用来找长时间飞行中的卡顿
+            if self.profiler.recording:
+                self.profiler.stop_csv()
+            else:
+                path = os.path.join(Settings.PROFILE_DIR, f"frames-{time.strftime('%Y%m%d-%H%M%S')}.csv")
+                self.profiler.start_csv(path, counts=CSV_COUNTS)
         if key == 'escape':
+            if self.player.recorder is not None:
+                self.player.recorder.recording.save(self.record_path)
+            self.profiler.close()
+            if self.streamer:
+                self.streamer.shutdown()
+            self.world.save()
+            if Settings.JOURNAL_PATH:
+                self.world.journal.save(Settings.JOURNAL_PATH)
+            if self.storage:
+                self.storage.close()
             application.quit()
 
     def run(self):
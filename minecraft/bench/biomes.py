@@ -0,0 +1,72 @@
+# Biome layer cost: chunk generation with biomes off and on, the cached
+# coarse climate fields against evaluating both noise fields at every
+# column, and how the biomes split the area.
+#   python -m minecraft.bench.biomes [chunks_per_side]
+import sys
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.bench.common import timed
+from minecraft.systems.biomes import BIOMES, classify
+from minecraft.systems.terrain import chunk_columns
+from minecraft.systems.world import WorldManager
+
+SIDE = 24
+
+
+def keys(side):
+    return [(cx, cz) for cx in range(-side // 2, side - side // 2) for cz in range(-side // 2, side - side // 2)]
+
+
+def generation(side, biomes):
+    Settings.BIOMES = biomes
+    world = WorldManager()
+    _, seconds = timed(lambda: [world.generate_chunk(*key) for key in keys(side)])
+    return world, seconds * 1000 / side**2
+
+
+def climate(side):
+    # Per chunk: both climate fields straight from noise at every column,
+    # against the interpolated lookup, cold (regions computed on the way)
+    # and warm (all cached).
+    world = WorldManager()
+    b = world.biomes
+    f = Settings.BIOME_SCALE
+
+    def direct():
+        out = {}
+        for key in keys(side):
+            xs, zs = chunk_columns(*key)
+            out[key] = classify(b.temperature(xs * f, zs * f), b.humidity(xs * f, zs * f))
+        return out
+
+    exact, t_direct = timed(direct)
+    _, t_cold = timed(lambda: [b.chunk(*key) for key in keys(side)])
+    misses = b.misses
+    cached, t_warm = timed(lambda: {key: b.chunk(*key)[0] for key in keys(side)})
+    n = side**2
+    agree = np.mean([(exact[k] == cached[k]).mean() for k in exact])
+    return {'direct_ms': t_direct * 1000 / n, 'cold_ms': t_cold * 1000 / n, 'warm_ms': t_warm * 1000 / n,
+            'regions': misses, 'hits': b.hits, 'agree': agree}
+
+
+def run(side=SIDE):
+    saved = Settings.BIOMES
+    try:
+        _, off = generation(side, False)
+        world, on = generation(side, True)
+    finally:
+        Settings.BIOMES = saved
+    biome = np.concatenate([world.biomes.chunk(*key)[0].ravel() for key in keys(side)])
+    share = {b.name: float((biome == i).mean()) for i, b in enumerate(BIOMES)}
+    return {'chunks': side**2, 'generate_off_ms': off, 'generate_on_ms': on, 'climate': climate(side), 'share': share}
+
+
+if __name__ == '__main__':
+    r = run(*[int(a) for a in sys.argv[1:2]])
+    c = r['climate']
+    print(f"{r['chunks']} chunks: generate {r['generate_off_ms']:.2f} ms/chunk without biomes, "
+          f"{r['generate_on_ms']:.2f} with")
+    print(f"climate per chunk: every column {c['direct_ms']:.3f} ms  cached cold {c['cold_ms']:.3f} ms  "
+          f"warm {c['warm_ms']:.3f} ms  ({c['regions']} regions, {c['hits']} hits, "
+          f"{c['agree']:.1%} columns same biome as exact)")
+    print('  '.join(f'{name} {share:.0%}' for name, share in r['share'].items()))
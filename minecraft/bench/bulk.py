@@ -0,0 +1,53 @@
+# Bulk region edits against one create_block/remove_block call per position.
+#   python -m minecraft.bench.bulk [chunks_per_side]
+import sys, time
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.bench.common import build_world, timed
+
+SAMPLE = 2000
+
+
+def per_block_rate(world, lo):
+    # Time a sample of single-block edits including their remeshes, then
+    # extrapolate; the full run would take far too long.
+    x0, y0, z0 = lo
+    cells = [(x0 + i % 40, y0 + i // 1600, z0 + i // 40 % 40) for i in range(SAMPLE)]
+    world.fill_box(lo, (x0 + 39, y0 + SAMPLE // 1600, z0 + 39), BlockID.STONE)
+    world.flush_remesh(float('inf'))
+    start = time.perf_counter()
+    for pos in cells:
+        world.remove_block(pos)
+        world.flush_remesh(float('inf'))
+    return (time.perf_counter() - start) / SAMPLE
+
+
+def run(side=16):
+    world = build_world([(cx, cz) for cx in range(-side // 2, side // 2) for cz in range(-side // 2, side // 2)])
+    half = side * Settings.CHUNK_SIZE // 2
+    lo, hi = (-half, Settings.MIN_Y, -half), (half - 1, Settings.MIN_Y + Settings.CHUNK_HEIGHT - 1, half - 1)
+    volume = int(np.prod([b - a + 1 for a, b in zip(lo, hi)]))
+    structure = np.random.default_rng(1).integers(0, 8, [b - a + 1 for a, b in zip(lo, hi)], dtype=np.uint8)
+    results = {'blocks': volume}
+    for name, op in (
+            ('fill_box', lambda: world.fill_box(lo, hi, BlockID.STONE)),
+            ('replace_box', lambda: world.replace_box(lo, hi, BlockID.STONE, BlockID.DIRT)),
+            ('clear_sphere', lambda: world.clear_sphere((0, 0, 0), half)),
+            ('paste', lambda: world.paste(structure, lo))):
+        changed, t_edit = timed(op)
+        remeshes = len(world.dirty)
+        _, t_mesh = timed(lambda: world.flush_remesh(float('inf')))
+        results[name] = {'changed': changed, 'edit_s': t_edit, 'remeshes': remeshes, 'remesh_s': t_mesh}
+    results['per_block_estimate_s'] = per_block_rate(world, (-20, 0, -20)) * volume
+    return results
+
+
+if __name__ == '__main__':
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
+    print(f"{r['blocks']} blocks in the box")
+    for name in ('fill_box', 'replace_box', 'clear_sphere', 'paste'):
+        o = r[name]
+        print(f"  {name:<12} {o['changed']:>9} changed  edit {o['edit_s']:6.3f} s  "
+              f"{o['remeshes']:>4} remeshes {o['remesh_s']:6.2f} s")
+    print(f"  one create/remove per block: ~{r['per_block_estimate_s']:.0f} s (extrapolated)")
@@ -0,0 +1,85 @@
+# Cave carving: per-voxel CaveNoise.point vs the batched CaveNoise.chunk over
+# whole chunk volumes, then what the cave stage adds to chunk generation and
+# to the meshes.
+#   python -m minecraft.bench.caves [chunks ...]
+import sys, time
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.bench.common import timed
+from minecraft.systems.world import WorldManager
+
+CHUNKS = (1, 4)
+AREA = 3
+
+
+def keys(count):
+    side = int(np.ceil(np.sqrt(count)))
+    return [(i % side, i // side) for i in range(count)]
+
+
+def per_voxel(world, count):
+    s, h = Settings.CHUNK_SIZE, Settings.CHUNK_HEIGHT
+    out = {}
+    for cx, cz in keys(count):
+        out[(cx, cz)] = np.array([[[world.caves.point(cx*s + i, Settings.MIN_Y + j, cz*s + k) for k in range(s)]
+                                   for j in range(h)] for i in range(s)])
+    return out
+
+
+def batched(world, count):
+    return {(cx, cz): world.caves.chunk(cx, cz) for cx, cz in keys(count)}
+
+
+def noise(counts=CHUNKS):
+    results = []
+    world = WorldManager()
+    for count in counts:
+        slow, t_slow = timed(per_voxel, world, count)
+        fast, t_fast = timed(batched, world, count)
+        results.append({
+            'chunks': count,
+            'voxels': count * Settings.CHUNK_SIZE**2 * Settings.CHUNK_HEIGHT,
+            'per_voxel_s': t_slow,
+            'batched_s': t_fast,
+            'speedup': t_slow / t_fast,
+            'identical': all((slow[k] == fast[k]).all() for k in slow),
+        })
+    return results
+
+
+def generation(caves):
+    # Generate an AREA x AREA patch (plus a ring so borders mesh against
+    # real neighbours) and mesh the inside.
+    Settings.CAVES = caves
+    world = WorldManager()
+    ring = [(cx, cz) for cx in range(-1, AREA + 1) for cz in range(-1, AREA + 1)]
+    inner = [(cx, cz) for cx in range(AREA) for cz in range(AREA)]
+    start = time.perf_counter()
+    for key in ring:
+        world.add_chunk(*world.generate_chunk(*key))
+    t_gen = time.perf_counter() - start
+    start = time.perf_counter()
+    faces = sum(world.build_mesh(key).face_count for key in inner)
+    t_mesh = time.perf_counter() - start
+    air = sum(np.count_nonzero(world.chunks[key].view() == 0) for key in inner)
+    return {'generate_ms': t_gen * 1000 / len(ring), 'mesh_ms': t_mesh * 1000 / len(inner),
+            'faces': faces / len(inner), 'air': air / (len(inner) * Settings.CHUNK_SIZE**2 * Settings.CHUNK_HEIGHT)}
+
+
+def run(counts=CHUNKS):
+    caves = Settings.CAVES
+    try:
+        stages = {'off': generation(False), 'on': generation(True)}
+    finally:
+        Settings.CAVES = caves
+    return {'noise': noise(counts), 'generation': stages}
+
+
+if __name__ == '__main__':
+    result = run([int(a) for a in sys.argv[1:]] or CHUNKS)
+    for r in result['noise']:
+        print(f"{r['chunks']:>3} chunks: {r['voxels']:>7} voxels  per-voxel {r['per_voxel_s']:7.3f} s  "
+              f"batched {r['batched_s']:7.4f} s  x{r['speedup']:.0f}  identical={r['identical']}")
+    for name, g in result['generation'].items():
+        print(f"caves {name:<3}  generate {g['generate_ms']:5.2f} ms/chunk  mesh {g['mesh_ms']:5.2f} ms/chunk  "
+              f"{g['faces']:7.0f} faces/chunk  air {g['air']:.0%}")
@@ -0,0 +1,32 @@
+# Helpers the benches share; not a bench itself.
+import time
+from minecraft.systems.world import WorldManager
+
+
+def timed(fn, *args, repeat=1):
+    # (fn(*args), seconds), the best of repeat runs.
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def around(radius):
+    # Chunk keys of the square within radius chunks of (0, 0).
+    return [(cx, cz) for cx in range(-radius, radius + 1) for cz in range(-radius, radius + 1)]
+
+
+def build_world(keys=None, remesh=()):
+    # A WorldManager with the chunks at keys generated (default around(2)).
+    # The chunks in remesh are meshed up front, leaving nothing dirty, so
+    # the run only measures its own remeshes.
+    world = WorldManager()
+    for key in around(2) if keys is None else keys:
+        world.add_chunk(*world.generate_chunk(*key))
+    for key in remesh:
+        world.remesh_chunk(key)
+    world.dirty.clear()
+    return world
@@ -0,0 +1,47 @@
+# Frustum and distance culling: chunks drawn and cost per frame as the render
+# distance grows, averaged over random camera headings.
+#   python -m minecraft.bench.culling [render_distance ...]
+import random, sys, time
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.core.controls import look_vector
+from minecraft.core.culling import ChunkCuller
+
+DISTANCES = (4, 8, 16, 32)
+VIEWS = 200
+FOV, ASPECT = 90, 16 / 9
+
+
+def camera(yaw, pitch):
+    # forward/right/up for ursina-style yaw and pitch in degrees.
+    f = np.array(look_vector(yaw, pitch))
+    r = np.array(look_vector(yaw + 90, 0))
+    return f, r, np.cross(f, r)
+
+
+def run(distances=DISTANCES, seed=1):
+    s = Settings.CHUNK_SIZE
+    results = []
+    for r in distances:
+        Settings.RENDER_DISTANCE = r
+        culler = ChunkCuller()
+        for cx in range(-r, r + 1):
+            for cz in range(-r, r + 1):
+                if cx * cx + cz * cz <= r * r:
+                    # Terrain-ish boxes: the visible surface band of each chunk.
+                    culler.set((cx, cz), (cx * s, -8, cz * s), (cx * s + s, 24, cz * s + s))
+        rng = random.Random(seed)
+        visible, start = 0, time.perf_counter()
+        for _ in range(VIEWS):
+            f, right, up = camera(rng.uniform(0, 360), rng.uniform(-30, 60))
+            visible += len(culler.update((0, 20, 0), f, right, up, FOV, ASPECT))
+        elapsed = time.perf_counter() - start
+        results.append({'render_distance': r, 'chunks': len(culler.bounds), 'visible': visible / VIEWS,
+                        'ms_per_frame': elapsed * 1000 / VIEWS})
+    return results
+
+
+if __name__ == '__main__':
+    for r in run([int(a) for a in sys.argv[1:]] or DISTANCES):
+        print(f"distance {r['render_distance']:>3}: {r['chunks']:>5} chunks, {r['visible']:7.1f} drawn "
+              f"({r['visible'] / r['chunks']:.0%}), cull {r['ms_per_frame']:.3f} ms/frame")
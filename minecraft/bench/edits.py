@@ -0,0 +1,73 @@
+# Bursts of block edits in one frame: rebuilds and frame time with the dirty
+# queue, against remeshing on every edit.
+#   python -m minecraft.bench.edits [edits_per_frame ...]
+import random, sys, time
+from minecraft.config.settings import Settings
+from minecraft.bench.common import build_world
+
+BURSTS = (1, 10, 100)
+FRAME_MS = 1000 / 60
+
+
+def edits(world, count, rng):
+    # Break and place around the origin chunk, like clicking while turning.
+    span = Settings.CHUNK_SIZE
+    out = []
+    for _ in range(count):
+        x, z = rng.randrange(-span, span), rng.randrange(-span, span)
+        out.append((x, world.get_height(x, z), z))
+    return out
+
+
+def eager(world, positions):
+    # Old behaviour: each edit rebuilds its chunk and border neighbours at once.
+    start = time.perf_counter()
+    rebuilt = 0
+    for pos in positions:
+        world.remove_block(pos)
+        rebuilt += len(world.dirty)
+        while world.dirty:
+            world.remesh_chunk(world.dirty.popitem(last=False)[0])
+    return rebuilt, time.perf_counter() - start
+
+
+def queued(world, positions):
+    start = time.perf_counter()
+    for pos in positions:
+        world.remove_block(pos)
+    rebuilt = world.flush_remesh()
+    first = time.perf_counter() - start
+    frames = 1
+    while world.dirty:
+        rebuilt += world.flush_remesh()
+        frames += 1
+    return rebuilt, first, frames
+
+
+def run(bursts=BURSTS, seed=1):
+    world = build_world()
+    results = []
+    for count in bursts:
+        positions = edits(world, count, random.Random(seed))
+        original = [world.get_block(pos) for pos in positions]
+
+        def restore():
+            for pos, block_id in zip(positions, original):
+                world.create_block(pos, block_id)
+            world.dirty.clear()
+
+        n_eager, t_eager = eager(world, positions)
+        restore()
+        n_queued, t_first, frames = queued(world, positions)
+        restore()
+        results.append({'edits': count, 'eager_rebuilds': n_eager, 'eager_ms': t_eager * 1000,
+                        'queued_rebuilds': n_queued, 'first_frame_ms': t_first * 1000,
+                        'frames_to_drain': frames})
+    return results
+
+
+if __name__ == '__main__':
+    for r in run([int(a) for a in sys.argv[1:]] or BURSTS):
+        print(f"{r['edits']:>4} edits: eager {r['eager_rebuilds']:>4} rebuilds {r['eager_ms']:8.1f} ms  |  "
+              f"queued {r['queued_rebuilds']:>2} rebuilds, first frame {r['first_frame_ms']:5.1f} ms "
+              f"(frame is {FRAME_MS:.1f} ms), drained in {r['frames_to_drain']} frames")
@@ -0,0 +1,66 @@
+# Scripted flythroughs replayed headless against a fixed seed, with frame
+# timings. Each run is replayed twice to check it is deterministic.
+#   python -m minecraft.bench.flythrough [--seed N] [--realtime] [--csv DIR] [recording ...]
+#
+# Recordings from `python -m minecraft.main --record PATH` can be passed
+# instead of the built-in scripts (walk, sprint, edit).
+import argparse, math, os
+from minecraft.core.controls import InputFrame, held_mask
+from minecraft.systems.profiler import FrameProfiler, SECTIONS
+from minecraft.systems.replay import Recording, fingerprint, replay
+
+DT = 1 / 60
+SEED = 1234
+
+
+def scripted(name, seed=SEED, seconds=20):
+    frames = []
+    for i in range(int(seconds / DT)):
+        t = i * DT
+        if name == 'walk':
+            held = held_mask(lambda k: k == 'w')
+            frames.append(InputFrame(DT, 20 * math.sin(t / 3), 10, held, ('space',) if i % 90 == 0 else ()))
+        elif name == 'sprint':
+            held = held_mask(lambda k: k in ('w', 'left shift'))
+            frames.append(InputFrame(DT, t * 6, 0, held, ('space',) if i % 45 == 0 else ()))
+        elif name == 'edit':
+            # Turn on the spot, digging and building as fast as the mouse clicks.
+            keys = ('left mouse down',) if i % 2 else ('right mouse down', str(1 + i // 2 % 5))
+            frames.append(InputFrame(DT, t * 40, 35 + 20 * math.sin(t), 0, keys))
+        else:
+            raise ValueError(f'no scripted flythrough called {name!r}')
+    return Recording(seed, (0, 30, 0), frames)
+
+
+def run(recording, realtime=False, csv_path=None):
+    profiler = FrameProfiler(window=len(recording))
+    if csv_path:
+        profiler.start_csv(csv_path, counts=('chunks', 'meshed', 'dirty'))
+    world, sim = replay(recording, realtime, profiler)
+    profiler.close()
+    result = {'frames': len(recording), 'recorded_s': recording.duration,
+              'replay_s': sum(f['frame'] for f in profiler.frames) / 1000,
+              'percentiles': profiler.percentiles(), 'sections': profiler.averages(),
+              'gc_pauses': profiler.gc_pauses()[0], 'fingerprint': fingerprint(world, sim)}
+    again, sim = replay(recording)
+    result['deterministic'] = fingerprint(again, sim) == result['fingerprint']
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('recordings', nargs='*')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--realtime', action='store_true', help='pace frames by their recorded dt')
+    parser.add_argument('--csv', metavar='DIR', help='write per-frame timings here')
+    args = parser.parse_args()
+    runs = [(os.path.basename(p), Recording.load(p)) for p in args.recordings] or \
+           [(name, scripted(name, args.seed)) for name in ('walk', 'sprint', 'edit')]
+    for name, recording in runs:
+        csv_path = os.path.join(args.csv, f'{name}.csv') if args.csv else None
+        r = run(recording, args.realtime, csv_path)
+        pct = r['percentiles']
+        print(f"{name:<8} {r['frames']} frames ({r['recorded_s']:.1f} s recorded, replayed in {r['replay_s']:.1f} s)  "
+              f"p50 {pct[50]:.2f}  p95 {pct[95]:.2f}  p99 {pct[99]:.2f} ms  gc {r['gc_pauses']}  "
+              f"deterministic={r['deterministic']}")
+        print('         ' + '  '.join(f'{s} {r["sections"][s]:.2f}' for s in SECTIONS))
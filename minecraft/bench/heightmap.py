@@ -0,0 +1,54 @@
+# Per-column get_height vs batched WorldManager.heights, one chunk per call:
+#   python -m minecraft.bench.heightmap [size ...]
+import sys
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.bench.common import timed
+from minecraft.systems.terrain import chunk_columns
+from minecraft.systems.world import WorldManager
+
+SIZES = (40, 128, 512)
+
+
+def chunk_range(size):
+    offset = size // 2
+    return range((-offset) // Settings.CHUNK_SIZE, (size - offset - 1) // Settings.CHUNK_SIZE + 1)
+
+
+def per_column(world, size):
+    r = chunk_range(size)
+    out = {}
+    for cx in r:
+        for cz in r:
+            xs, zs = chunk_columns(cx, cz)
+            out[(cx, cz)] = np.array([[world.get_height(x, z) for x, z in zip(rx, rz)]
+                                      for rx, rz in zip(xs.tolist(), zs.tolist())])
+    return out
+
+
+def batched(world, size):
+    r = chunk_range(size)
+    return {(cx, cz): world.heights(*chunk_columns(cx, cz)) for cx in r for cz in r}
+
+
+def run(sizes=SIZES):
+    results = []
+    for size in sizes:
+        # Fresh worlds so neither path benefits from the other's gradient cache.
+        slow, t_slow = timed(per_column, WorldManager(), size)
+        fast, t_fast = timed(batched, WorldManager(), size)
+        results.append({
+            'world_size': size,
+            'columns': len(slow) * Settings.CHUNK_SIZE**2,
+            'per_column_s': t_slow,
+            'batched_s': t_fast,
+            'speedup': t_slow / t_fast,
+            'identical': all((slow[k] == fast[k]).all() for k in slow),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    for r in run([int(a) for a in sys.argv[1:]] or SIZES):
+        print(f"world {r['world_size']:>4}: {r['columns']:>7} columns  per-column {r['per_column_s']:8.3f} s  "
+              f"batched {r['batched_s']:7.3f} s  x{r['speedup']:.0f}  identical={r['identical']}")
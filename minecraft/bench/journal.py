@@ -0,0 +1,99 @@
+# Edit journal: bytes per recorded edit and what a million cost, recording
+# single and bulk edits, undoing and redoing them, saving the log and
+# replaying it onto a fresh world of the same seed, on a few seeds. Raises if
+# undo, redo or replay does not reproduce the world.
+#   python -m minecraft.bench.journal [single_edits]
+import os, sys, tempfile, time
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.bench.common import around, build_world, timed
+from minecraft.systems.journal import pack, replay_journal
+
+EDITS = 1024
+SEEDS = (1, 2, 3)
+MILLION = 1_000_000
+
+
+def snapshot(world):
+    return {key: chunk.view().copy() for key, chunk in world.chunks.items()}
+
+
+def check(what, world, blocks, keys=None):
+    keys = blocks.keys() if keys is None else keys
+    bad = [key for key in keys if key not in world.chunks or (world.chunks[key].view() != blocks[key]).any()]
+    if bad:
+        raise RuntimeError(f'{what}: {len(bad)} chunks differ, e.g. {bad[0]} (seed {Settings.SEED})')
+
+
+def memory():
+    # A million records straight into a journal's log.
+    world = build_world(around(0))
+    rng = np.random.default_rng(0)
+    xs, zs = rng.integers(-5000, 5000, (2, MILLION))
+    ys = rng.integers(Settings.MIN_Y, Settings.MIN_Y + Settings.CHUNK_HEIGHT, MILLION)
+    ids = rng.integers(0, 8, (2, MILLION))
+    records = pack(xs, ys, zs, ids[0], ids[1], np.ones(MILLION, dtype=bool))
+    _, seconds = timed(lambda: world.journal.append(records))
+    return {'bytes_per_edit': world.journal.nbytes / len(world.journal), 'mb': world.journal.nbytes / 2**20,
+            'append_ms': seconds * 1000}
+
+
+def run(edits=EDITS):
+    world = build_world(around(3), remesh=around(2))
+    base = snapshot(world)
+    journal = world.journal
+    spots = [(x, world.get_height(x, z) + 1, z) for x in range(-24, 24) for z in range(-24, 24)][:edits]
+
+    # The same edits with the journal off first, for its share of the cost.
+    plain = build_world(around(3), remesh=around(2))
+    plain.journal.applying = True
+    _, t_plain = timed(lambda: [plain.create_block(pos, BlockID.STONE) for pos in spots])
+    _, t_place = timed(lambda: [world.create_block(pos, BlockID.STONE) for pos in spots])
+
+    bulk, t_bulk = timed(lambda: world.fill_box((-24, 10, -24), (23, 17, 23), BlockID.DIRT))
+    edited = snapshot(world)
+    _, t_undo_bulk = timed(journal.undo)
+    _, t_redo_bulk = timed(journal.redo)
+    journal.undo()
+    _, t_undo_one = timed(journal.undo)
+    journal.redo()
+    journal.redo()
+    steps = 0
+    start = time.perf_counter()
+    while journal.undo():
+        steps += 1
+    t_undo_all = time.perf_counter() - start
+    check('undo all', world, base)
+    while journal.redo():
+        pass
+    check('redo all', world, edited)
+
+    path = os.path.join(tempfile.mkdtemp(), 'edits.journal')
+    _, t_save = timed(lambda: journal.save(path))
+    replayed, t_replay = timed(lambda: replay_journal(path))
+    # Chunks the edits touch; the ones around them only need their spill.
+    touched = {key for key in edited if (edited[key] != base[key]).any()}
+    check('replay', replayed, edited, touched)
+    return {'edits': len(spots), 'place_us': t_place * 1e6 / len(spots), 'plain_us': t_plain * 1e6 / len(spots),
+            'bulk': bulk, 'bulk_ms': t_bulk * 1000, 'undo_bulk_ms': t_undo_bulk * 1000,
+            'redo_bulk_ms': t_redo_bulk * 1000, 'undo_one_ms': t_undo_one * 1000, 'steps': steps,
+            'undo_all_ms': t_undo_all * 1000,
+            'file_kb': os.path.getsize(path) / 1024, 'save_ms': t_save * 1000, 'replay_ms': t_replay * 1000,
+            'replay_chunks': len(replayed.chunks), 'touched': len(touched), 'memory': memory()}
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:2]]
+    for seed in SEEDS:
+        Settings.SEED = seed
+        r = run(*args)
+        m = r['memory']
+        print(f"seed {seed}")
+        print(f"  {m['bytes_per_edit']:.0f} bytes/edit: 1M edits {m['mb']:.1f} MB, appended in {m['append_ms']:.0f} ms")
+        print(f"  {r['edits']} single edits: {r['place_us']:.1f} us each journaled, {r['plain_us']:.1f} us without")
+        print(f"  fill_box {r['bulk']} blocks {r['bulk_ms']:.1f} ms  undo {r['undo_bulk_ms']:.1f} ms  "
+              f"redo {r['redo_bulk_ms']:.1f} ms")
+        print(f"  undo one edit {r['undo_one_ms']:.3f} ms  undo all {r['steps']} steps {r['undo_all_ms']:.0f} ms")
+        print(f"  save {r['file_kb']:.0f} KB in {r['save_ms']:.1f} ms  replay onto a fresh world "
+              f"{r['replay_ms']:.0f} ms ({r['replay_chunks']} chunks, {r['touched']} edited match)")
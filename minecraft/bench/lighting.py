@@ -0,0 +1,79 @@
+# Lighting: a full relight of every loaded chunk against the incremental
+# updates single edits get, plus what baking light and ambient occlusion
+# adds to meshing.
+#   python -m minecraft.bench.lighting [radius]
+import random, sys, time
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.core.lighting import LightEngine
+from minecraft.bench.common import around, build_world
+
+EDITS = 200
+
+
+def full_relight(world):
+    world.light = LightEngine(world)
+    start = time.perf_counter()
+    for key in world.chunks:
+        world.light.ensure(key)
+    return time.perf_counter() - start
+
+
+def edit_kinds(world):
+    # (name, action(x, z), light updates per action); each lands at a random column.
+    def place(x, z):
+        world.create_block((x, world.get_height(x, z) + 1, z), BlockID.STONE)
+
+    def dig(x, z):
+        # Two blocks down from the surface: opens a shaft for sky light.
+        y = world.get_height(x, z)
+        world.remove_block((x, y, z))
+        world.remove_block((x, y - 1, z))
+
+    def lamp(x, z):
+        pos = (x, world.get_height(x, z) + 1, z)
+        world.create_block(pos, BlockID.LAMP)
+        world.remove_block(pos)
+    return (('place', place, 1), ('dig', dig, 2), ('lamp on/off', lamp, 2))
+
+
+def run(radius=2, seed=1):
+    Settings.SEED = seed
+    Settings.LIGHTING = True
+    world = build_world(around(radius + 1))
+    chunks = len(world.chunks)
+    relight = full_relight(world)
+    rng = random.Random(seed)
+    span = radius * Settings.CHUNK_SIZE
+    edits = []
+    for name, action, updates in edit_kinds(world):
+        columns = [(rng.randrange(-span, span), rng.randrange(-span, span)) for _ in range(EDITS)]
+        world.dirty.clear()
+        start = time.perf_counter()
+        for x, z in columns:
+            action(x, z)
+        elapsed = time.perf_counter() - start
+        edits.append({'edit': name, 'ms': elapsed * 1000 / (EDITS * updates), 'remesh': len(world.dirty)})
+
+    keys = [(cx, cz) for cx in range(-radius, radius + 1) for cz in range(-radius, radius + 1)]
+    meshing = {}
+    for lit in (False, True):
+        Settings.LIGHTING = lit
+        world.light = LightEngine(world) if lit else None
+        for key in keys:
+            world.mesh_input(key)  # light outside the timing
+        start = time.perf_counter()
+        faces = sum(world.build_mesh(key).face_count for key in keys)
+        meshing['lit' if lit else 'flat'] = {'ms': (time.perf_counter() - start) * 1000 / len(keys),
+                                             'faces': faces / len(keys)}
+    return {'chunks': chunks, 'relight_ms': relight * 1000, 'edits': edits, 'meshing': meshing}
+
+
+if __name__ == '__main__':
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 2)
+    print(f"full relight of {r['chunks']} chunks: {r['relight_ms']:7.1f} ms "
+          f"({r['relight_ms'] / r['chunks']:.2f} ms/chunk)")
+    for e in r['edits']:
+        print(f"incremental {e['edit']:<12} {e['ms']:6.3f} ms/update, {e['remesh']} chunks to remesh")
+    for name, m in r['meshing'].items():
+        print(f"mesh {name:<5} {m['ms']:6.2f} ms/chunk, {m['faces']:6.0f} faces/chunk")
@@ -0,0 +1,87 @@
+# Level-of-detail meshes: triangles and meshing time per chunk at each level,
+# the triangle count of a full-resolution render distance against one three
+# times as far with LOD, and how often a chunk switches level while the
+# player paces across an LOD edge.
+#   python -m minecraft.bench.lod [render_distance]
+import sys, time
+from minecraft.config.settings import Settings
+from minecraft.systems.streaming import ChunkStreamer
+from minecraft.systems.world import WorldManager
+
+SAMPLE = 2      # mesh the (2*SAMPLE+1)^2 chunks around the origin
+LEVELS = (0, 1, 2, 3)
+
+
+def ring_counts(radius, edges):
+    # Chunks per level inside radius, for LOD edges in chunks.
+    counts = [0] * (len(edges) + 1)
+    for cx in range(-radius, radius + 1):
+        for cz in range(-radius, radius + 1):
+            d2 = cx * cx + cz * cz
+            if d2 <= radius * radius:
+                counts[sum(d2 > e * e for e in edges)] += 1
+    return counts
+
+
+def switches(world, streamer, key, path):
+    # Level changes of one chunk as the player's chunk follows path.
+    changes = 0
+    for center in path:
+        streamer.center = center
+        lod = streamer.lod_for(key)
+        if lod != world.lods.get(key, 0):
+            world.lods[key] = lod
+            changes += 1
+    return changes
+
+
+def run(render_distance=4, seed=1):
+    Settings.SEED = seed
+    world = WorldManager()
+    span = range(-SAMPLE - 1, SAMPLE + 2)
+    for cx in span:
+        for cz in span:
+            world.add_chunk(*world.load_chunk(cx, cz))
+    keys = [(cx, cz) for cx in span[1:-1] for cz in span[1:-1]]
+    levels = []
+    for lod in LEVELS:
+        for key in keys:
+            world.lods[key] = lod
+        start = time.perf_counter()
+        triangles = sum(len(world.build_mesh(key).triangles) // 3 for key in keys)
+        elapsed = time.perf_counter() - start
+        levels.append({'lod': lod, 'triangles': triangles / len(keys), 'ms': elapsed * 1000 / len(keys)})
+
+    per_chunk = [l['triangles'] for l in levels]
+    edges = (render_distance, 2 * render_distance)
+    near = ring_counts(render_distance, ())
+    far = ring_counts(3 * render_distance, edges)
+    budget = {'full': sum(n * t for n, t in zip(near, per_chunk)),
+              'lod': sum(n * t for n, t in zip(far, per_chunk)),
+              'lod_chunks': far}
+
+    # Step back and forth over the first edge, forty times.
+    world.lods.clear()
+    streamer = ChunkStreamer(world, workers=1)
+    path = [(render_distance + dx, 0) for dx in (-1, 0) * 40]
+    paced = {}
+    for hysteresis in (0, Settings.LOD_HYSTERESIS):
+        old = Settings.LOD_DISTANCES, Settings.LOD_HYSTERESIS
+        Settings.LOD_DISTANCES, Settings.LOD_HYSTERESIS = (render_distance - 0.5,), hysteresis
+        world.lods.clear()
+        paced[hysteresis] = switches(world, streamer, (0, 0), path)
+        Settings.LOD_DISTANCES, Settings.LOD_HYSTERESIS = old
+    streamer.shutdown()
+    return levels, budget, paced
+
+
+if __name__ == '__main__':
+    r = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    levels, budget, paced = run(r)
+    for l in levels:
+        print(f"lod {l['lod']} ({1 << l['lod']}x): {l['triangles']:8.0f} triangles/chunk, {l['ms']:6.2f} ms/chunk")
+    print(f"distance {r:>2} full resolution: {budget['full']:10.0f} triangles")
+    print(f"distance {3 * r:>2} with LOD edges at {r}, {2 * r}: {budget['lod']:10.0f} triangles "
+          f"(x{budget['lod'] / budget['full']:.2f}, chunks per level {budget['lod_chunks']})")
+    for h, n in paced.items():
+        print(f"hysteresis {h}: {n} level switches pacing across an edge")
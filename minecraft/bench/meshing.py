@@ -0,0 +1,46 @@
+# Headless meshing throughput, naive vs greedy:
+#   python -m minecraft.bench.meshing [world_size]
+import sys, time
+from minecraft.config.settings import Settings
+from minecraft.core.mesher import build_chunk_mesh
+from minecraft.systems.world import WorldManager
+
+
+def mesh_all(world, padded, greedy, repeat):
+    best, meshes = None, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        meshes = [build_chunk_mesh(p, world.colors, greedy=greedy) for p in padded]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    faces = sum(m.face_count for m in meshes)
+    return {
+        'faces': faces,
+        'vertices': sum(m.vertex_count for m in meshes),
+        'ms_per_chunk': best * 1000 / len(padded),
+        'faces_per_sec': faces / best,
+    }
+
+
+def run(world_size=None, repeat=3):
+    if world_size:
+        Settings.WORLD_SIZE = world_size
+    world = WorldManager()
+    world.generate_terrain()
+    padded = [world.padded_blocks(*key) for key in world.chunks]
+    return {
+        'world_size': Settings.WORLD_SIZE,
+        'chunks': len(padded),
+        'naive': mesh_all(world, padded, False, repeat),
+        'greedy': mesh_all(world, padded, True, repeat),
+    }
+
+
+if __name__ == '__main__':
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    print(f"world {r['world_size']}: {r['chunks']} chunks")
+    for mode in ('naive', 'greedy'):
+        m = r[mode]
+        print(f"  {mode:<6} {m['vertices']:>9} vertices  {m['faces']:>8} quads  "
+              f"{m['ms_per_chunk']:7.2f} ms/chunk  {m['faces_per_sec']:>12,.0f} quads/s")
+    print(f"  greedy keeps {r['greedy']['vertices'] / max(r['naive']['vertices'], 1):.1%} of the vertices")
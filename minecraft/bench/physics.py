@@ -0,0 +1,48 @@
+# Player physics without ursina: scripted walking and jumping over real terrain.
+#   python -m minecraft.bench.physics [ticks]
+import math, sys, time
+from minecraft.config.settings import Settings
+from minecraft.core.physics import PlayerBody
+from minecraft.bench.common import build_world
+
+DT = 1 / 60
+RADIUS = 20  # blocks; well inside the 5x5 chunks around the origin
+
+
+def script(tick, position, radius=RADIUS):
+    # Chase a point going round a circle about the origin, jumping every
+    # second. Steering at the point rather than walking a fixed heading
+    # keeps the body on the loaded terrain however often walls push it off
+    # course.
+    angle = tick * DT * 0.25
+    dx, dz = radius * math.cos(angle) - position[0], radius * math.sin(angle) - position[2]
+    d = math.hypot(dx, dz) or 1.0
+    return (dx / d, dz / d), tick % 60 == 0
+
+
+def check_on_terrain(body):
+    # A body below the world has been free-falling off its edge, and its
+    # ticks measure nothing.
+    if body.position[1] < Settings.MIN_Y:
+        raise RuntimeError(f'body fell off the world, ended at {tuple(round(p, 1) for p in body.position)}')
+
+
+def run(ticks=20000):
+    world = build_world()
+    body = PlayerBody((0, world.get_height(0, 0) + 3, 0))
+    grounded = 0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        move, jump = script(tick, body.position)
+        body.step(DT, world.is_solid, move, jump=jump)
+        grounded += body.on_ground
+    elapsed = time.perf_counter() - start
+    check_on_terrain(body)
+    return {'ticks': ticks, 'seconds': elapsed, 'ticks_per_s': ticks / elapsed,
+            'grounded': grounded / ticks, 'position': tuple(round(p, 3) for p in body.position)}
+
+
+if __name__ == '__main__':
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
+    print(f"{r['ticks']} ticks in {r['seconds']:.3f} s: {r['ticks_per_s']:.0f} ticks/s, "
+          f"on ground {r['grounded']:.0%}, ended at {r['position']}")
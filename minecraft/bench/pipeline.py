@@ -0,0 +1,27 @@
+# Process-pool pre-generation scaling:
+#   python -m minecraft.bench.pipeline [chunks_per_side] [workers ...]
+import os, sys, time
+from minecraft.systems.pipeline import GenerationPipeline
+
+
+def run(side=64, workers=None, mesh=True):
+    workers = workers or sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    results = []
+    for n in workers:
+        start = time.perf_counter()
+        with GenerationPipeline(n).run(-side // 2, -side // 2, side, side, mesh=mesh) as r:
+            elapsed = time.perf_counter() - start
+            faces = sum(m.face_count for m in r.meshes.values())
+        results.append({'workers': n, 'chunks': side * side, 'faces': faces, 'seconds': elapsed,
+                        'ms_per_chunk': elapsed * 1000 / (side * side)})
+    base = results[0]['seconds'] * results[0]['workers']
+    for r in results:
+        r['speedup'] = base / r['seconds']
+    return results
+
+
+if __name__ == '__main__':
+    args = [int(a) for a in sys.argv[1:]]
+    for r in run(args[0] if args else 64, args[1:] or None):
+        print(f"{r['workers']:>2} workers: {r['chunks']} chunks in {r['seconds']:7.2f} s  "
+              f"{r['ms_per_chunk']:6.2f} ms/chunk  x{r['speedup']:.2f}")
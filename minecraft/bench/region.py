@@ -0,0 +1,29 @@
+# Region files: generate vs save vs load an area of chunks.
+#   python -m minecraft.bench.region [chunks_per_side]
+import sys, tempfile
+from minecraft.bench.common import timed
+from minecraft.systems.region import RegionStore
+from minecraft.systems.world import WorldManager
+
+
+def run(side=16):
+    keys = [(cx, cz) for cx in range(-side // 2, side // 2) for cz in range(-side // 2, side // 2)]
+    with tempfile.TemporaryDirectory() as path:
+        store = RegionStore(path)
+        world = WorldManager(storage=store)
+        _, t_gen = timed(lambda: [world.add_chunk(*world.generate_chunk(*k)) for k in keys])
+        saved, t_save = timed(world.save)
+        store.close()
+
+        store = RegionStore(path)
+        world = WorldManager(storage=store)
+        _, t_load = timed(lambda: [world.add_chunk(*world.load_chunk(*k)) for k in keys])
+        store.close()
+    return {'chunks': len(keys), 'saved': saved, 'generate_s': t_gen, 'save_s': t_save,
+            'load_s': t_load, 'load_speedup': t_gen / t_load}
+
+
+if __name__ == '__main__':
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
+    print(f"{r['chunks']} chunks: generate {r['generate_s']:.3f} s, save {r['save_s']:.3f} s, "
+          f"load {r['load_s']:.3f} s (x{r['load_speedup']:.1f} faster than generating)")
@@ -0,0 +1,27 @@
+# Block property lookups for a chunk's worth of IDs: BlockRegistry.get per
+# block vs one fancy index into the registry tables.
+#   python -m minecraft.bench.registry
+import numpy as np
+from minecraft.config.blocks import BlockRegistry
+from minecraft.bench.common import timed
+from minecraft.core.chunk import chunk_shape
+from minecraft.systems.world import WorldManager
+
+
+def run():
+    world = WorldManager()
+    chunk, _ = world.generate_chunk(0, 0)
+    ids = chunk.view()
+    flat = ids.reshape(-1).tolist()
+    per_block, t_dict = timed(lambda: np.array([BlockRegistry.get(i)['breakable'] for i in flat]).reshape(ids.shape),
+                              repeat=5)
+    table, t_table = timed(lambda: BlockRegistry.BREAKABLE[ids], repeat=5)
+    _, t_rgba = timed(lambda: BlockRegistry.RGBA[ids], repeat=5)
+    return {'blocks': int(np.prod(chunk_shape())), 'dict_ms': t_dict * 1000, 'table_ms': t_table * 1000,
+            'rgba_ms': t_rgba * 1000, 'speedup': t_dict / t_table, 'identical': bool((per_block == table).all())}
+
+
+if __name__ == '__main__':
+    r = run()
+    print(f"{r['blocks']} blocks: BlockRegistry.get {r['dict_ms']:.2f} ms, BREAKABLE[ids] {r['table_ms']:.3f} ms "
+          f"(x{r['speedup']:.0f}), RGBA[ids] {r['rgba_ms']:.3f} ms, identical={r['identical']}")
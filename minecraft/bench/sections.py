@@ -0,0 +1,33 @@
+# Block memory with palette-compacted chunk sections vs dense arrays, and what
+# compaction costs.
+#   python -m minecraft.bench.sections [chunks_per_side]
+import sys
+from minecraft.config.settings import Settings
+from minecraft.bench.common import timed
+from minecraft.systems.world import WorldManager
+
+
+def run(side=16):
+    world = WorldManager()
+    keys = [(cx, cz) for cx in range(-side // 2, side // 2) for cz in range(-side // 2, side // 2)]
+    for key in keys:
+        world.add_chunk(*world.generate_chunk(*key))
+    _, t_compact = timed(lambda: [world.chunks[k].compact() for k in keys])
+    kinds, dense = world.memory_report()
+    compact = sum(size for _, size in kinds.values())
+    _, t_read = timed(lambda: [world.chunks[k].view() for k in keys])
+    _, t_write = timed(lambda: [world.chunks[k].blocks for k in keys])
+    return {'chunks': len(keys), 'kinds': kinds, 'dense_bytes': dense, 'compact_bytes': compact,
+            'ratio': dense / compact, 'compact_ms_per_chunk': t_compact * 1000 / len(keys),
+            'decode_ms_per_chunk': t_read * 1000 / len(keys), 'expand_ms_per_chunk': t_write * 1000 / len(keys)}
+
+
+if __name__ == '__main__':
+    r = run(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
+    print(f"{r['chunks']} chunks, {Settings.SECTION_HEIGHT}-block sections")
+    for kind, (count, size) in sorted(r['kinds'].items()):
+        print(f"  {kind:<8} {count:>6} sections {size / 1024:10.1f} KiB  ({size / count:7.1f} B each)")
+    print(f"  dense {r['dense_bytes'] / (1 << 20):.1f} MiB -> compacted {r['compact_bytes'] / (1 << 20):.2f} MiB "
+          f"(x{r['ratio']:.1f}, ~x{r['ratio'] ** 0.5:.1f} render distance in the same RAM)")
+    print(f"  compact {r['compact_ms_per_chunk']:.2f} ms/chunk, decode {r['decode_ms_per_chunk']:.2f} ms/chunk, "
+          f"expand for writing {r['expand_ms_per_chunk']:.2f} ms/chunk")
@@ -0,0 +1,81 @@
+# Structure templates: stamping with one slice assignment vs placing the same
+# template block by block (how trees used to be built), then what decoration
+# costs per chunk.
+#   python -m minecraft.bench.structures [placements]
+import random, sys, time
+from minecraft.config.settings import Settings
+from minecraft.core.chunk import SPILL_RANK, TERRAIN_RANK, Chunk, chunk_key, in_height_range
+from minecraft.systems.structures import TEMPLATES, stamp
+from minecraft.systems.terrain import chunk_columns
+from minecraft.systems.world import WorldManager
+
+PLACEMENTS = 2000
+SIDE = 8
+
+
+def per_block(chunk, template, pos, spills):
+    for (dx, dy, dz), block_id in template.cells:
+        x, y, z = pos[0] + dx, pos[1] + dy, pos[2] + dz
+        key = chunk_key(x, z)
+        if key != chunk.key:
+            spills.setdefault(key, []).append(((x, y, z), block_id))
+        elif in_height_range(y) and SPILL_RANK.get(block_id, TERRAIN_RANK) > SPILL_RANK.get(chunk.get(x, y, z),
+                                                                                            TERRAIN_RANK):
+            chunk.set(x, y, z, block_id)
+
+
+def placements(world, count):
+    # Random spots on the surface of chunk (0, 0), border columns included
+    # so some structures overhang into the neighbours.
+    rng = random.Random(count)
+    out = []
+    for _ in range(count):
+        x, z = rng.randrange(Settings.CHUNK_SIZE), rng.randrange(Settings.CHUNK_SIZE)
+        out.append((x, world.get_height(x, z) + 1, z))
+    return out
+
+
+def compare(world, kind, spots):
+    results = {}
+    for name, place in (('per_block', per_block), ('stamped', stamp)):
+        chunk, _ = world.generate_chunk(0, 0)
+        spills = {}
+        variants = TEMPLATES[kind]
+        start = time.perf_counter()
+        for i, pos in enumerate(spots):
+            place(chunk, variants[i % len(variants)], pos, spills)
+        results[name] = (time.perf_counter() - start, chunk.view().copy(), spills)
+    (t_slow, slow, slow_spills), (t_fast, fast, fast_spills) = results['per_block'], results['stamped']
+    return {'kind': kind, 'per_block_us': t_slow * 1e6 / len(spots), 'stamped_us': t_fast * 1e6 / len(spots),
+            'speedup': t_slow / t_fast, 'identical': (slow == fast).all() and slow_spills == fast_spills}
+
+
+def decoration(world, side):
+    # Terrain and caves first, untimed; then only the decoration pass.
+    keys = [(cx, cz) for cx in range(side) for cz in range(side)]
+    chunks, heights = {}, {}
+    for key in keys:
+        chunks[key] = Chunk(*key)
+        heights[key] = world.heights(*chunk_columns(*key))
+        world.stratify(chunks[key], heights[key])
+        world.carve(chunks[key], heights[key])
+    start = time.perf_counter()
+    spills = [world.decorate(chunks[key], heights[key]) for key in keys]
+    seconds = time.perf_counter() - start
+    overhang = sum(len(blocks) for s in spills for blocks in s.values())
+    return {'chunks': len(keys), 'ms_per_chunk': seconds * 1000 / len(keys), 'spilled_blocks': overhang}
+
+
+def run(count=PLACEMENTS, side=SIDE):
+    world = WorldManager()
+    spots = placements(world, count)
+    return {'templates': [compare(world, kind, spots) for kind in TEMPLATES], 'decoration': decoration(world, side)}
+
+
+if __name__ == '__main__':
+    r = run(*[int(a) for a in sys.argv[1:2]])
+    for t in r['templates']:
+        print(f"{t['kind']:<8} per-block {t['per_block_us']:7.1f} us  stamped {t['stamped_us']:6.1f} us  "
+              f"x{t['speedup']:.1f}  identical={t['identical']}")
+    d = r['decoration']
+    print(f"decorate {d['chunks']} chunks: {d['ms_per_chunk']:.2f} ms/chunk, {d['spilled_blocks']} blocks spilled")
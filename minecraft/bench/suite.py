@@ -0,0 +1,165 @@
+# Headless benchmark matrix: generation, trees, meshing, raycasts and player
+# collision for every (world size, seed) pair, written as JSON so runs from
+# different commits can be diffed.
+#   python -m minecraft.bench.suite [--sizes 40 128] [--seeds 1 2 3] [--out bench.json]
+#
+# Each case runs in a fresh process so peak RSS belongs to that case alone,
+# then once more under tracemalloc for what each stage allocates: "peak_mb" is
+# the most Python and NumPy memory the stage had allocated at once, "kept_mb"
+# what it left alive. The traced run is slower, so its timings are dropped.
+import argparse, gc, json, platform, random, subprocess, sys, time, tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SIZES = (40, 128)
+SEEDS = (1, 2, 3)
+RAYS = 5000
+TICKS = 5000
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+class Stage:
+    def __init__(self, results, name, trace=False):
+        self.results = results
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self):
+        gc.collect()
+        if self.trace:
+            tracemalloc.start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if not self.trace:
+            self.results[self.name] = {'seconds': seconds}
+            return
+        gc.collect()
+        kept, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.results[self.name] = {'seconds': seconds, 'peak_mb': peak / 2**20, 'kept_mb': kept / 2**20}
+
+
+def run_case(size, seed, trace=False):
+    from minecraft.config.settings import Settings
+    Settings.SEED = seed
+    Settings.WORLD_SIZE = size
+    from minecraft.bench.physics import RADIUS, check_on_terrain, script
+    from minecraft.core.physics import PlayerBody
+    from minecraft.systems.terrain import chunk_columns
+    from minecraft.systems.world import WorldManager
+
+    world = WorldManager()
+    offset = size // 2
+    span = range(-offset // Settings.CHUNK_SIZE, (size - offset - 1) // Settings.CHUNK_SIZE + 1)
+    keys = [(cx, cz) for cx in span for cz in span]
+    stages = {}
+
+    with Stage(stages, 'generation', trace):
+        heights = {}
+        for cx, cz in keys:
+            chunk = world.get_chunk(cx, cz, create=True)
+            heights[(cx, cz)] = world.heights(*chunk_columns(cx, cz))
+            world.stratify(chunk, heights[(cx, cz)])
+            world.carve(chunk, heights[(cx, cz)])
+
+    with Stage(stages, 'trees', trace):
+        spills = {key: world.decorate(world.chunks[key], heights[key]) for key in keys}
+        for key in keys:
+            world.add_chunk(world.chunks[key], spills[key])
+
+    with Stage(stages, 'meshing', trace):
+        faces = sum(world.build_mesh(key).face_count for key in keys)
+
+    rng = random.Random(seed)
+    half = len(span) * Settings.CHUNK_SIZE // 2
+    rays = [((rng.uniform(-half, half), 30, rng.uniform(-half, half)),
+             (rng.uniform(-1, 1), -1, rng.uniform(-1, 1))) for _ in range(RAYS)]
+    with Stage(stages, 'raycast', trace):
+        hits = sum(world.raycast(o, d, reach=64) is not None for o, d in rays)
+
+    # The same steered circle as bench.physics, its radius kept well inside
+    # the generated footprint.
+    body = PlayerBody((0, world.get_height(0, 0) + 3, 0))
+    with Stage(stages, 'collision', trace):
+        for tick in range(TICKS):
+            move, jump = script(tick, body.position, radius=min(RADIUS, half - 12))
+            body.step(1 / 60, world.is_solid, move, jump=jump)
+    check_on_terrain(body)
+
+    volume = len(keys) * Settings.CHUNK_SIZE**2 * Settings.CHUNK_HEIGHT
+    stages['generation']['blocks_per_s'] = volume / stages['generation']['seconds']
+    for name in ('generation', 'trees', 'meshing'):
+        stages[name]['ms_per_chunk'] = stages[name]['seconds'] * 1000 / len(keys)
+    stages['meshing']['faces'] = faces
+    stages['raycast'].update(rays=RAYS, hits=hits, rays_per_s=RAYS / stages['raycast']['seconds'])
+    stages['collision'].update(ticks=TICKS, ticks_per_s=TICKS / stages['collision']['seconds'])
+    return {
+        'world_size': size,
+        'seed': seed,
+        'chunks': len(keys),
+        'solid_blocks': int(sum(np.count_nonzero(c.view()) for c in world.chunks.values())),
+        'stages': stages,
+        'peak_rss_mb': peak_rss_mb(),
+        'renderer_imported': 'ursina' in sys.modules,
+    }
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes=SIZES, seeds=SEEDS):
+    cases = []
+    for size in sizes:
+        for seed in seeds:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                case = pool.submit(run_case, size, seed).result()
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                traced = pool.submit(run_case, size, seed, trace=True).result()
+            for name, stage in case['stages'].items():
+                stage.update(peak_mb=traced['stages'][name]['peak_mb'], kept_mb=traced['stages'][name]['kept_mb'])
+            cases.append(case)
+    return {'commit': commit(), 'python': platform.python_version(), 'numpy': np.__version__,
+            'cases': cases}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--seeds', type=int, nargs='+', default=SEEDS)
+    parser.add_argument('--out', help='write the results to this JSON file')
+    args = parser.parse_args()
+    report = run(args.sizes, args.seeds)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    for c in report['cases']:
+        s = c['stages']
+        rss = 'n/a' if c['peak_rss_mb'] is None else f"{c['peak_rss_mb']:.0f} MB"
+        print(f"size {c['world_size']:>4} seed {c['seed']:>6} ({c['chunks']} chunks, peak {rss}): "
+              f"gen {s['generation']['blocks_per_s'] / 1e6:6.1f} Mblocks/s  "
+              f"trees {s['trees']['ms_per_chunk']:5.2f} ms/chunk  "
+              f"mesh {s['meshing']['ms_per_chunk']:5.2f} ms/chunk  "
+              f"rays {s['raycast']['rays_per_s']:8.0f}/s  ticks {s['collision']['ticks_per_s']:7.0f}/s  "
+              f"stage peak {max(st['peak_mb'] for st in s.values()):.0f} MB")
+        if c['renderer_imported']:
+            print('  warning: ursina was imported during the run')
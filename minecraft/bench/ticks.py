@@ -0,0 +1,57 @@
+# Scheduled block ticks: a slab of sand dropped from the sky and a water
+# source left to spread, stepped at 60 fps. Reports frame cost against the
+# per-frame budget, the deepest the tick queue got and how long it took to
+# settle.
+#   python -m minecraft.bench.ticks [sand_slab_side ...]
+import sys, time
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.bench.common import around, build_world
+
+SIDES = (4, 16, 32)
+DT = 1 / 60
+MAX_FRAMES = 60 * 60
+
+
+def settle(world):
+    ticks = world.ticks
+    frames, depth, times = 0, len(ticks.queue), []
+    while ticks.queue and frames < MAX_FRAMES:
+        start = time.perf_counter()
+        ticks.update(DT)
+        world.flush_remesh()
+        times.append((time.perf_counter() - start) * 1000)
+        depth = max(depth, len(ticks.queue))
+        frames += 1
+    times = np.array(times or [0.0])
+    return {'frames': frames, 'seconds': frames * DT, 'max_queue': depth, 'left': len(ticks.queue),
+            'p50_ms': float(np.percentile(times, 50)), 'p95_ms': float(np.percentile(times, 95)),
+            'max_ms': float(times.max())}
+
+
+def run(sides=SIDES, seed=1):
+    Settings.SEED = seed
+    results = []
+    for side in sides:
+        world = build_world(around(3), remesh=around(2))
+        half = side // 2
+        top = max(world.get_height(x, z) for x in range(-half, half) for z in range(-half, half))
+        placed = world.fill_box((-half, top + 8, -half), (half - 1, top + 9, half - 1), BlockID.SAND)
+        results.append(dict(settle(world), case=f'sand {side}x{side}x2', blocks=placed))
+
+    world = build_world(around(3), remesh=around(2))
+    world.create_block((0, world.get_height(0, 0) + 1, 0), BlockID.WATER)
+    result = settle(world)
+    water = sum(int(np.isin(c.view(), (BlockID.WATER, BlockID.WATER_1, BlockID.WATER_2, BlockID.WATER_3)).sum())
+                for c in world.chunks.values())
+    results.append(dict(result, case='water source', blocks=water))
+    return results
+
+
+if __name__ == '__main__':
+    print(f'budget {Settings.BLOCK_TICK_BUDGET_MS} ms/frame for ticks, plus remeshing')
+    for r in run([int(a) for a in sys.argv[1:]] or SIDES):
+        print(f"{r['case']:<16} {r['blocks']:>5} blocks: settled in {r['seconds']:5.1f} s, "
+              f"queue max {r['max_queue']:>5} (left {r['left']}), "
+              f"frame p50 {r['p50_ms']:5.2f}  p95 {r['p95_ms']:5.2f}  max {r['max_ms']:6.2f} ms")
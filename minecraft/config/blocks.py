@@ -1,26 +1,72 @@
-from ursina import color
+import numpy as np
+
 
 class BlockID:
-    GRASS = 1
-    STONE = 2
-    DIRT = 3
-    OBSIDIAN = 4
-    WOOD = 5
-    SAND = 6
-    LEAVES = 7
+    # Filled in by BlockRegistry.register below: BlockID.GRASS == 1, ...
+    pass
 
 
 class BlockRegistry:
-    DATA = {
-        BlockID.GRASS:    {'color': color.rgb(124,189,107), 'breakable': True},
-        BlockID.STONE:    {'color': color.rgb(125,125,125), 'breakable': True},
-        BlockID.DIRT:     {'color': color.rgb(155,108,76),  'breakable': True},
-        BlockID.OBSIDIAN: {'color': color.rgb(20,20,200),   'breakable': False},
-        BlockID.WOOD:     {'color': color.rgb(150,110,70),  'breakable': True},
-        BlockID.SAND:     {'color': color.rgb(230,220,170), 'breakable': True},
-        BlockID.LEAVES:   {'color': color.rgb(50,150,50),   'breakable': True},
-    }
+    # Per-ID properties, both as dicts (get) and as dense tables indexed by
+    # block ID, so a whole chunk's IDs can be looked up in one fancy index:
+    #   BlockRegistry.OPAQUE[chunk.blocks]  -> bool array shaped like the chunk
+    # IDs that were never registered behave like FALLBACK.
+    DATA = {}
+    FALLBACK = 'GRASS'
+    KNOWN = np.zeros(256, dtype=bool)
+    RGBA = np.zeros((256, 4), dtype=np.float32)   # 0..1
+    BREAKABLE = np.zeros(256, dtype=bool)
+    OPAQUE = np.zeros(256, dtype=bool)            # hides the faces of blocks next to it
+    SOLID = np.zeros(256, dtype=bool)             # the player collides with it
+    LIGHT = np.zeros(256, dtype=np.uint8)         # block light it gives off, 0..15
+    TICK = np.zeros(256, dtype=np.uint8)          # game ticks between scheduled updates, 0: static
+
+    @staticmethod
+    def register(name, block_id, rgb, breakable=True, opaque=True, solid=True, alpha=1.0, light=0, tick=0):
+        R = BlockRegistry
+        setattr(BlockID, name, block_id)
+        R.DATA[block_id] = {'name': name, 'rgb': rgb, 'breakable': breakable, 'opaque': opaque, 'solid': solid,
+                           'light': light, 'tick': tick}
+        R.KNOWN[block_id] = True
+        R.RGBA[block_id] = (*(c / 255 for c in rgb), alpha)
+        R.BREAKABLE[block_id] = breakable
+        R.OPAQUE[block_id] = opaque
+        R.SOLID[block_id] = solid
+        R.LIGHT[block_id] = light
+        R.TICK[block_id] = tick
+        fallback = getattr(BlockID, R.FALLBACK, None)
+        if fallback is not None:
+            for table in (R.RGBA, R.BREAKABLE, R.OPAQUE, R.SOLID, R.LIGHT, R.TICK):
+                table[~R.KNOWN] = table[fallback]
 
     @staticmethod
     def get(block_id):
-        return BlockRegistry.DATA.get(block_id, BlockRegistry.DATA[BlockID.GRASS])
+        return BlockRegistry.DATA.get(block_id, BlockRegistry.DATA[getattr(BlockID, BlockRegistry.FALLBACK)])
+
+    @staticmethod
+    def color(block_id):
+        # ursina is imported here, not at module level, so headless code
+        # (generation, meshing, benchmarks) never loads the renderer.
+        from ursina import color
+        return color.rgb(*BlockRegistry.get(block_id)['rgb'])
+
+
+BlockRegistry.register('AIR',      0, (0,0,0), breakable=False, opaque=False, solid=False, alpha=0.0)
+BlockRegistry.register('GRASS',    1, (124,189,107))
+BlockRegistry.register('STONE',    2, (125,125,125))
+BlockRegistry.register('DIRT',     3, (155,108,76))
+BlockRegistry.register('OBSIDIAN', 4, (20,20,200), breakable=False)
+BlockRegistry.register('WOOD',     5, (150,110,70))
+BlockRegistry.register('SAND',     6, (230,220,170), tick=1)
+BlockRegistry.register('LEAVES',   7, (50,150,50))
+BlockRegistry.register('LAMP',     8, (255,220,140), light=15)
+BlockRegistry.register('WATER',    9, (60,110,220), opaque=False, solid=False, alpha=0.7, tick=5)
+# Flowing water, one ID per block of distance from a source (see systems/ticks.py).
+BlockRegistry.register('WATER_1', 10, (70,120,225), opaque=False, solid=False, alpha=0.7, tick=5)
+BlockRegistry.register('WATER_2', 11, (80,130,230), opaque=False, solid=False, alpha=0.7, tick=5)
+BlockRegistry.register('WATER_3', 12, (90,140,235), opaque=False, solid=False, alpha=0.7, tick=5)
+FLUID_LEVELS = {BlockID.WATER: 0, BlockID.WATER_1: 1, BlockID.WATER_2: 2, BlockID.WATER_3: 3}
+
+# Blocks on the hotbar, selected with keys 1-8.
+HOTBAR = [BlockID.GRASS, BlockID.STONE, BlockID.DIRT, BlockID.WOOD, BlockID.SAND, BlockID.OBSIDIAN, BlockID.LAMP,
+          BlockID.WATER]
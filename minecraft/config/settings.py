@@ -1,18 +1,67 @@
-import random
+import os, random
+
+
+def parse_seed(value):
+    # PerlinNoise treats seed 0 as "pick a random one", which would defeat pinning.
+    seed = int(value)
+    if seed == 0:
+        raise ValueError('seed must be a non-zero integer')
+    return seed
+
 
 class Settings:
     # 世界
-    SEED = random.randint(0, 100000)
+    # 固定种子: 环境变量 MINECRAFT_SEED 或 python -m minecraft.main --seed N
+    SEED = parse_seed(os.environ['MINECRAFT_SEED']) if os.environ.get('MINECRAFT_SEED') else random.randint(1, 100000)
+    SEED_PINNED = bool(os.environ.get('MINECRAFT_SEED'))  # 种子是显式指定的（不是随机的）
     WORLD_SIZE = 40  # <--- 改回 30 或 40 (现在电脑带得动了！)
     CHUNK_SIZE = 16
+    CHUNK_HEIGHT = 64    # 每个区块是一整根柱子，y 范围 [MIN_Y, MIN_Y + CHUNK_HEIGHT)
+    MIN_Y = -32
+    SECTION_HEIGHT = 16  # 区块按 16 格高分段做调色板压缩；CHUNK_HEIGHT 必须是它的整数倍
+    COMPACT_CHUNKS = True  # 网格建好后把区块压缩成调色板分段，省内存
+    INFINITE_WORLD = True  # True: 围绕玩家后台流式加载区块；False: 只生成 WORLD_SIZE 大小的世界
+    RENDER_DISTANCE = 6    # 区块数
+    LOD_DISTANCES = (8, 12)  # 超过这些区块距离改用 2x / 4x 降采样的粗网格，加大 RENDER_DISTANCE 时生效
+    LOD_HYSTERESIS = 1     # 切换 LOD 前要多走出的区块数，避免在边界来回重建
+    STREAM_WORKERS = 4
+    UPLOAD_BUDGET_MS = 4.0 # 每帧上传网格的时间预算
+    REMESH_BUDGET_MS = 4.0 # 每帧重建被编辑区块的时间预算（至少重建一个）
+    GREEDY_MESHING = True  # 合并同种方块的共面面片，顶点数大幅减少
+    FRUSTUM_CULLING = True # 不渲染视锥外和渲染距离外的区块（网格保留）
+    LIGHTING = True        # 天空光 + 方块光洪水填充，连同环境光遮蔽烘焙进顶点颜色
+    LIGHT_BATCH_CELLS = 16 # 一批改动里单个区块超过这么多格就整块重算光照
+    BLOCK_TICK_RATE = 20   # 沙子下落、水流动的游戏刻每秒次数
+    BLOCK_UPDATES_PER_TICK = 256  # 每刻最多处理的方块更新，多出的顺延到下一刻
+    BLOCK_TICK_BUDGET_MS = 3.0    # 每帧方块更新的时间预算
+    MAX_TICK_BACKLOG = 10  # 落后超过这么多刻就丢弃游戏时间，不再补算
+    SAVE_DIR = 'saves/world'  # None: 不存档
+    REGION_SIZE = 32       # 每个存档文件 32x32 个区块
+    PROFILE_DIR = 'saves/profiles'  # F4 录制的逐帧 CSV
+    JOURNAL_PATH = 'saves/edits.journal'  # 退出时保存本次的编辑日志（可在同一种子的新世界上重放）；None: 不保存
 
     # 地形
     TERRAIN_SCALE = 0.05
     TERRAIN_AMPLITUDE = 8
     TERRAIN_OCTAVES = 3
+    BIOMES = True          # 温度/湿度噪声决定地表方块、树木密度和起伏
+    BIOME_SCALE = 0.005    # 气候噪声频率，越小生物群系越大
+    BIOME_REGION = 8       # 气候场按 8x8 个区块为一个区域粗采样并缓存
+    BIOME_CELL = 8         # 粗采样间隔（格），区块内双线性插值
+    BIOME_CACHE_REGIONS = 64  # 最多缓存的区域数，超出按最近最少使用淘汰
+    CAVES = True           # 用 3D 噪声在地下挖洞穴
+    CAVE_SCALE = 0.06      # 洞穴噪声频率，越小洞越大
+    CAVE_THRESHOLD = 0.35  # 噪声超过这个值的格子挖空，越大洞越少
+    CAVE_DEPTH = (4, 28)   # 只挖地表以下这个深度范围（格）；世界最底层始终保留
 
     # 玩家
     WALK_SPEED = 8.0     # <--- 稍微改快一点，走路更爽
     RUN_SPEED = 12.0
     JUMP_HEIGHT = 1.5    # <--- 跳得稍微高一点，防止被地面缝隙绊倒
-    PLAYER_HEIGHT = 1.8
\ No newline at end of file
+    PLAYER_HEIGHT = 1.8
+    PLAYER_WIDTH = 0.6
+    EYE_HEIGHT = 1.62
+    GRAVITY = 25.0
+    TERMINAL_VELOCITY = 50.0
+    MAX_PHYSICS_DT = 0.05  # 卡顿时也别一步穿墙
+    REACH = 6.0          # 能挖/放方块的最远距离
\ No newline at end of file
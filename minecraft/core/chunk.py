@@ -0,0 +1,198 @@
+import math
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.core.palette import Section
+
+# Block (x, y, z) is drawn over [x-.5, x+.5] x [y-1, y] x [z-.5, z+.5] (the old
+# Voxel used origin_y=0.5), so world + BLOCK_OFFSET puts it on the unit lattice.
+BLOCK_OFFSET = (0.5, 1.0, 0.5)
+
+
+def world_to_block(pos):
+    return tuple(math.floor(p + o) for p, o in zip(pos, BLOCK_OFFSET))
+
+
+# Which block wins when generation writes overlap. Terrain beats trunks beats
+# leaves beats air; taking the max makes merging tree spill order-independent.
+SPILL_RANK = {BlockID.AIR: 0, BlockID.LEAVES: 1, BlockID.WOOD: 2}
+TERRAIN_RANK = 3
+# The same ranks as a table indexed by block ID, for whole arrays at once.
+RANKS = np.full(256, TERRAIN_RANK, dtype=np.uint8)
+RANKS[list(SPILL_RANK)] = list(SPILL_RANK.values())
+
+
+def chunk_shape():
+    return (Settings.CHUNK_SIZE, Settings.CHUNK_HEIGHT, Settings.CHUNK_SIZE)
+
+
+def chunk_key(x, z):
+    return (x // Settings.CHUNK_SIZE, z // Settings.CHUNK_SIZE)
+
+
+def local_index(x, y, z):
+    s = Settings.CHUNK_SIZE
+    return (x % s, y - Settings.MIN_Y, z % s)
+
+
+def in_height_range(y):
+    return Settings.MIN_Y <= y < Settings.MIN_Y + Settings.CHUNK_HEIGHT
+
+
+def section_shape():
+    return (Settings.CHUNK_SIZE, Settings.SECTION_HEIGHT, Settings.CHUNK_SIZE)
+
+
+_section_flat = {}
+
+
+def section_flat():
+    # Flat index of every cell in a section, shaped like the section.
+    shape = section_shape()
+    if shape not in _section_flat:
+        _section_flat[shape] = np.arange(int(np.prod(shape))).reshape(shape)
+    return _section_flat[shape]
+
+
+class Chunk:
+    # One column of CHUNK_SIZE x CHUNK_HEIGHT x CHUNK_SIZE block IDs. Held
+    # either dense (one byte per block, needed for writing) or compacted into
+    # SECTION_HEIGHT-tall palette sections. Reading works in both forms;
+    # touching .blocks expands a compacted chunk back to dense.
+    def __init__(self, cx, cz, blocks=None):
+        self.cx = cx
+        self.cz = cz
+        # blocks may be a view into a larger (e.g. shared-memory) buffer.
+        self.dense = np.zeros(chunk_shape(), dtype=np.uint8) if blocks is None else blocks
+        self.sections = None
+        # Bumped on every set(); lets background meshing spot stale results
+        # and saving skip chunks that have not changed since saved_version.
+        self.version = 0
+        self.saved_version = None
+        # Loaded from a save: already holds its neighbours' tree spill and the
+        # player's edits, so generation spill is no longer merged into it.
+        self.from_disk = False
+        # Generation spill this chunk sent to its neighbours, kept for saving.
+        self.spills_out = {}
+
+    @property
+    def key(self):
+        return (self.cx, self.cz)
+
+    @property
+    def origin(self):
+        return (self.cx * Settings.CHUNK_SIZE, Settings.MIN_Y, self.cz * Settings.CHUNK_SIZE)
+
+    @property
+    def blocks(self):
+        # Dense, writable block array.
+        if self.dense is None:
+            self.dense = self.view()
+            self.sections = None
+        return self.dense
+
+    def view(self):
+        # Block array for reading only; a compacted chunk is decoded into a
+        # temporary copy and stays compacted.
+        if self.dense is not None:
+            return self.dense
+        shape = section_shape()
+        return np.concatenate([s.decode(shape) for s in self.sections], axis=1)
+
+    def read(self, index):
+        # view()[index] for an (x slice, :, z slice) index, decoding only the
+        # requested cells of a compacted chunk.
+        if self.dense is not None:
+            return self.dense[index]
+        flat = section_flat()[index]
+        return np.concatenate([s.take(flat) for s in self.sections], axis=1)
+
+    def compact(self):
+        if self.dense is None:
+            return
+        h = Settings.SECTION_HEIGHT
+        self.sections = [Section.encode(self.dense[:, y:y+h, :])
+                         for y in range(0, Settings.CHUNK_HEIGHT, h)]
+        self.dense = None
+
+    def memory(self):
+        # {kind: (sections, payload bytes)}, kind being 'dense', 'uniform' or
+        # 'packed'. Python object headers are not counted.
+        if self.dense is not None:
+            return {'dense': (Settings.CHUNK_HEIGHT // Settings.SECTION_HEIGHT, self.dense.nbytes)}
+        out = {}
+        for s in self.sections:
+            count, size = out.get(s.kind, (0, 0))
+            out[s.kind] = (count + 1, size + s.nbytes)
+        return out
+
+    def get(self, x, y, z):
+        i, j, k = local_index(x, y, z)
+        if self.dense is not None:
+            return int(self.dense[i, j, k])
+        h = Settings.SECTION_HEIGHT
+        return self.sections[j // h].get((i * h + j % h) * Settings.CHUNK_SIZE + k)
+
+    def set(self, x, y, z, block_id):
+        self.blocks[local_index(x, y, z)] = block_id
+        self.version += 1
+
+    def assign(self, index, blocks):
+        # Bulk write into a slice of the chunk; one version bump for the lot.
+        self.blocks[index] = blocks
+        self.version += 1
+
+    def merge(self, blocks):
+        # Apply generation spill [(pos, id)] from neighbouring chunks.
+        if self.from_disk:
+            return
+        for (x, y, z), block_id in blocks:
+            if not in_height_range(y):
+                continue
+            current = self.get(x, y, z)
+            if SPILL_RANK.get(block_id, TERRAIN_RANK) > SPILL_RANK.get(current, TERRAIN_RANK):
+                self.set(x, y, z, block_id)
+
+    def is_empty(self):
+        if self.dense is None:
+            return all(s.bits == 0 and s.palette[0] == BlockID.AIR for s in self.sections)
+        return not self.dense.any()
+
+    def world_positions(self, mask):
+        # Local index arrays of a boolean mask -> world (x, y, z) tuples.
+        ox, oy, oz = self.origin
+        xs, ys, zs = np.nonzero(mask)
+        return zip((xs + ox).tolist(), (ys + oy).tolist(), (zs + oz).tolist())
+
+
+def box_chunks(lo, hi):
+    # Splits the inclusive block box lo..hi by chunk. Yields (key, local
+    # slices, world position of the piece's low corner); y is clipped to the
+    # chunk height.
+    s = Settings.CHUNK_SIZE
+    (x0, y0, z0), (x1, y1, z1) = tuple(map(min, lo, hi)), tuple(map(max, lo, hi))
+    y0, y1 = max(y0, Settings.MIN_Y), min(y1, Settings.MIN_Y + Settings.CHUNK_HEIGHT - 1)
+    if y0 > y1:
+        return
+    ys = slice(y0 - Settings.MIN_Y, y1 - Settings.MIN_Y + 1)
+    for cx in range(x0 // s, x1 // s + 1):
+        ax, bx = max(x0, cx * s), min(x1, cx * s + s - 1)
+        for cz in range(z0 // s, z1 // s + 1):
+            az, bz = max(z0, cz * s), min(z1, cz * s + s - 1)
+            index = (slice(ax - cx * s, bx - cx * s + 1), ys, slice(az - cz * s, bz - cz * s + 1))
+            yield (cx, cz), index, (ax, y0, az)
+
+
+def pad_blocks(lookup, cx, cz, border=1):
+    # The chunk's blocks with a border (one block unless a coarser LOD mesh
+    # needs more) copied from the 8 surrounding chunks; lookup(key, index)
+    # returns that slice of a chunk's blocks, or None for missing chunks.
+    s, h, b = Settings.CHUNK_SIZE, Settings.CHUNK_HEIGHT, border
+    out = np.zeros((s+2*b, h+2*b, s+2*b), dtype=np.uint8)
+    spans = {-1: (slice(0, b), slice(s-b, s)), 0: (slice(b, s+b), slice(0, s)), 1: (slice(s+b, s+2*b), slice(0, b))}
+    for dx, (ox, sx) in spans.items():
+        for dz, (oz, sz) in spans.items():
+            blocks = lookup((cx+dx, cz+dz), (sx, slice(None), sz))
+            if blocks is not None:
+                out[ox, b:h+b, oz] = blocks
+    return out
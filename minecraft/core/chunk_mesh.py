@@ -0,0 +1,64 @@
+import numpy as np
+from ursina import *
+from minecraft.config.settings import Settings
+from minecraft.core.chunk import BLOCK_OFFSET
+from minecraft.core.culling import ChunkCuller
+
+
+class ChunkMesh(Entity):
+    def __init__(self, key, mesh_data):
+        cx, cz = key
+        super().__init__(
+            parent=scene,
+            position=(
+                cx*Settings.CHUNK_SIZE - BLOCK_OFFSET[0],
+                Settings.MIN_Y - BLOCK_OFFSET[1],
+                cz*Settings.CHUNK_SIZE - BLOCK_OFFSET[2]
+            ),
+        )
+        self.key = key
+        self.set_mesh(mesh_data)
+
+    def set_mesh(self, mesh_data):
+        self.model = Mesh(
+            vertices=mesh_data.vertices.tolist(),
+            triangles=mesh_data.triangles.tolist(),
+            colors=[color.Color(*c) for c in mesh_data.colors.tolist()],
+            static=True
+        )
+
+
+class ChunkRenderer:
+    # One ChunkMesh entity per chunk; WorldManager pushes MeshData in here.
+    # cull() disables the entities the camera cannot see; their meshes stay.
+    def __init__(self):
+        self.meshes = {}
+        self.culler = ChunkCuller()
+
+    def show(self, key, mesh_data):
+        entity = self.meshes.get(key)
+        if entity is None:
+            entity = self.meshes[key] = ChunkMesh(key, mesh_data)
+        else:
+            entity.set_mesh(mesh_data)
+        if mesh_data.vertex_count:
+            origin = np.array(tuple(entity.position))
+            self.culler.set(key, mesh_data.vertices.min(axis=0) + origin, mesh_data.vertices.max(axis=0) + origin)
+        else:
+            self.culler.remove(key)
+
+    def hide(self, key):
+        self.culler.remove(key)
+        entity = self.meshes.pop(key, None)
+        if entity is not None:
+            destroy(entity)
+
+    def cull(self):
+        if not Settings.FRUSTUM_CULLING:
+            return
+        visible = self.culler.update(tuple(camera.world_position), tuple(camera.forward), tuple(camera.right),
+                                     tuple(camera.up), camera.fov, window.aspect_ratio)
+        for key, entity in self.meshes.items():
+            show = key in visible
+            if entity.enabled != show:
+                entity.enabled = show
@@ -0,0 +1,123 @@
+import math
+from contextlib import nullcontext
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockRegistry, HOTBAR
+from minecraft.core.physics import PlayerBody
+
+# Keys sampled every frame while held, in the order InputFrame.held stores them.
+HELD_KEYS = ('w', 's', 'a', 'd', 'left shift')
+# Key events that act once per press; z / y undo and redo block edits.
+PRESS_KEYS = ('space', 'left mouse down', 'right mouse down', 'z', 'y') + tuple(str(i + 1) for i in range(len(HOTBAR)))
+
+
+class InputFrame:
+    # Everything the player did in one frame: the frame time, where they were
+    # looking (degrees, like ursina's rotation_y / rotation_x), which keys were
+    # held and which were pressed. Replaying the same frames against the same
+    # seed gives the same world.
+    __slots__ = ('dt', 'yaw', 'pitch', 'held', 'keys')
+
+    def __init__(self, dt, yaw, pitch, held=0, keys=()):
+        self.dt = dt
+        self.yaw = yaw
+        self.pitch = pitch
+        self.held = held    # bit i set: HELD_KEYS[i] is down
+        self.keys = tuple(keys)
+
+    def is_held(self, key):
+        return bool(self.held >> HELD_KEYS.index(key) & 1)
+
+    def to_list(self):
+        return [self.dt, self.yaw, self.pitch, self.held, list(self.keys)]
+
+    @classmethod
+    def from_list(cls, row):
+        return cls(*row)
+
+
+def held_mask(is_down):
+    return sum(1 << i for i, key in enumerate(HELD_KEYS) if is_down(key))
+
+
+def look_vector(yaw, pitch):
+    # ursina is left-handed with +z forward; positive pitch looks down.
+    y, p = math.radians(yaw), math.radians(pitch)
+    return (math.sin(y) * math.cos(p), -math.sin(p), math.cos(y) * math.cos(p))
+
+
+def move_vector(frame):
+    y = math.radians(frame.yaw)
+    f = frame.is_held('w') - frame.is_held('s')
+    r = frame.is_held('d') - frame.is_held('a')
+    x, z = f * math.sin(y) + r * math.cos(y), f * math.cos(y) - r * math.sin(y)
+    length = math.hypot(x, z)
+    return (x / length, z / length) if length else (0.0, 0.0)
+
+
+class PlayerSim:
+    # The player's side of the game without ursina: look, move, jump, pick a
+    # hotbar slot, break and place, undo and redo. PlayerController feeds it live input; a
+    # replay feeds it recorded InputFrames.
+    def __init__(self, world, position, profiler=None):
+        self.world = world
+        self.body = PlayerBody(position)
+        self.profiler = profiler
+        self.yaw = 0.0
+        self.pitch = 0.0
+        self.slot = 0
+
+    @property
+    def block_id(self):
+        return HOTBAR[self.slot]
+
+    @property
+    def eye(self):
+        x, y, z = self.body.position
+        return (x, y + Settings.EYE_HEIGHT, z)
+
+    def section(self, name):
+        return self.profiler.section(name) if self.profiler else nullcontext()
+
+    def apply(self, frame):
+        self.yaw, self.pitch = frame.yaw, frame.pitch
+        jump = False
+        with self.section('input'):
+            for key in frame.keys:
+                if key == 'space':
+                    jump = True
+                else:
+                    self.press(key)
+        # Hold still over chunks that have not streamed in yet instead of falling through.
+        if not self.world.is_loaded(self.body.position):
+            return
+        speed = Settings.RUN_SPEED if frame.is_held('left shift') else Settings.WALK_SPEED
+        with self.section('physics'):
+            self.body.step(frame.dt, self.world.is_solid, move_vector(frame), speed, jump)
+
+    def press(self, key):
+        if key.isdigit() and 0 < int(key) <= len(HOTBAR):
+            self.slot = int(key) - 1
+        elif key == 'left mouse down':
+            self.break_block()
+        elif key == 'right mouse down':
+            self.place_block()
+        elif key == 'z':
+            self.world.journal.undo()
+        elif key == 'y':
+            self.world.journal.redo()
+
+    def target(self):
+        # Grid raycast from the eye through the crosshair; no colliders involved.
+        return self.world.raycast(self.eye, look_vector(self.yaw, self.pitch))
+
+    def break_block(self):
+        hit = self.target()
+        if hit and BlockRegistry.BREAKABLE[hit.block_id]:
+            self.world.remove_block(hit.block)
+
+    def place_block(self):
+        hit = self.target()
+        if hit and hit.normal != (0, 0, 0):
+            pos = hit.adjacent
+            if not self.body.intersects_block(pos):
+                self.world.create_block(pos, self.block_id)
@@ -0,0 +1,79 @@
+import math
+import numpy as np
+from minecraft.config.settings import Settings
+
+
+def frustum_planes(eye, forward, right, up, fov_y, aspect, near=0.1, far=None):
+    # Six planes (nx, ny, nz, d); a point p is inside when n.p + d >= 0 for all
+    # of them. The normals are not unit length, which is fine for sign tests.
+    # fov_y is the vertical field of view in degrees, like ursina's camera.fov.
+    eye, f, r, u = (np.asarray(v, dtype=np.float64) for v in (eye, forward, right, up))
+    tan_v = math.tan(math.radians(fov_y) / 2)
+    tan_h = tan_v * aspect
+    normals = [tan_h * f - r, tan_h * f + r, tan_v * f - u, tan_v * f + u, f]
+    offsets = [0.0, 0.0, 0.0, 0.0, -near]
+    if far is not None:
+        normals.append(-f)
+        offsets.append(far)
+    planes = np.zeros((len(normals), 4))
+    for i, (n, d) in enumerate(zip(normals, offsets)):
+        planes[i, :3] = n
+        planes[i, 3] = d - n @ eye
+    return planes
+
+
+def boxes_in_frustum(planes, mins, maxs):
+    # Conservative box test: for each plane take the box corner furthest along
+    # its normal; a box is out if that corner is behind any plane.
+    n = planes[:, None, :3]
+    corner = np.where(n >= 0, maxs[None], mins[None])
+    return ((corner * n).sum(axis=2) + planes[:, 3:4] >= 0).all(axis=0)
+
+
+def boxes_within(eye, mins, maxs, distance):
+    # Horizontal distance from the eye to the nearest point of each box.
+    x, z = eye[0], eye[2]
+    dx = np.maximum(np.maximum(mins[:, 0] - x, x - maxs[:, 0]), 0)
+    dz = np.maximum(np.maximum(mins[:, 2] - z, z - maxs[:, 2]), 0)
+    return dx * dx + dz * dz <= distance * distance
+
+
+class ChunkCuller:
+    # World-space bounding boxes of the chunk meshes and which of them the
+    # camera can see. Vectorised over all chunks, so a frame's test is a few
+    # NumPy operations however many chunks are loaded.
+    def __init__(self):
+        self.bounds = {}
+        self.keys = []
+        self.mins = self.maxs = np.zeros((0, 3))
+        self.changed = False
+        self.visible = set()
+        self.stats = {'chunks': 0, 'visible': 0, 'frustum_culled': 0, 'distance_culled': 0}
+
+    def set(self, key, lo, hi):
+        self.bounds[key] = (lo, hi)
+        self.changed = True
+
+    def remove(self, key):
+        if self.bounds.pop(key, None) is not None:
+            self.changed = True
+        self.visible.discard(key)
+
+    def update(self, eye, forward, right, up, fov_y, aspect, max_distance=None):
+        # Returns the set of visible chunk keys.
+        if self.changed:
+            self.keys = list(self.bounds)
+            self.mins = np.array([self.bounds[k][0] for k in self.keys], dtype=np.float64).reshape(-1, 3)
+            self.maxs = np.array([self.bounds[k][1] for k in self.keys], dtype=np.float64).reshape(-1, 3)
+            self.changed = False
+        if max_distance is None:
+            max_distance = (Settings.RENDER_DISTANCE + 1) * Settings.CHUNK_SIZE
+        eye = np.asarray(eye, dtype=np.float64)
+        near = boxes_within(eye, self.mins, self.maxs, max_distance)
+        planes = frustum_planes(eye, forward, right, up, fov_y, aspect)
+        seen = near & boxes_in_frustum(planes, self.mins, self.maxs)
+        self.visible = {k for k, v in zip(self.keys, seen.tolist()) if v}
+        self.stats = {'chunks': len(self.keys), 'visible': len(self.visible),
+                      'frustum_culled': int(near.sum()) - len(self.visible),
+                      'distance_culled': len(self.keys) - int(near.sum())}
+        return self.visible
@@ -0,0 +1,266 @@
+from collections import deque
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockRegistry
+from minecraft.core.chunk import chunk_key, chunk_shape, in_height_range, local_index, pad_blocks
+
+MAX_LIGHT = 15
+NEIGHBOURS = ((1,0,0), (-1,0,0), (0,1,0), (0,-1,0), (0,0,1), (0,0,-1))
+
+
+def sky_seed(clear):
+    # Full sky light straight down each column until the first opaque block.
+    open_above = np.logical_and.accumulate(clear[:, ::-1, :], axis=1)[:, ::-1]
+    return np.where(open_above, MAX_LIGHT, 0).astype(np.uint8)
+
+
+def flood(light, free):
+    # Spreads light into the free cells, one level lost per block, one block
+    # per pass, until nothing changes; cells that are not free keep their
+    # value. The array edges count as dark.
+    for _ in range(MAX_LIGHT):
+        spread = np.zeros_like(light)
+        for axis in range(3):
+            lo = [slice(None)] * 3
+            hi = [slice(None)] * 3
+            lo[axis], hi[axis] = slice(None, -1), slice(1, None)
+            lo, hi = tuple(lo), tuple(hi)
+            np.maximum(spread[lo], light[hi], out=spread[lo])
+            np.maximum(spread[hi], light[lo], out=spread[hi])
+        new = np.where(free, np.maximum(light, np.maximum(spread, 1) - 1), light)
+        if np.array_equal(new, light):
+            break
+        light = new
+    return light
+
+
+def light_blocks(padded):
+    # Combined sky/block light of a padded block array taken on its own, with
+    # nothing known about the world around it. Good enough for one-shot
+    # meshing (the pregeneration pipeline); the live world uses LightEngine.
+    clear = ~BlockRegistry.OPAQUE[padded]
+    sky = flood(sky_seed(clear), clear)
+    block = flood(BlockRegistry.LIGHT[padded], clear)
+    return np.maximum(sky, block)
+
+
+def flood_chunk(padded, lit, known):
+    # One chunk's full flood from LightEngine.snapshot(): (sky, block) for
+    # the chunk without its border. Touches nothing shared, so it can run
+    # on a worker thread.
+    clear = ~BlockRegistry.OPAQUE[padded]
+    free = np.zeros_like(clear)
+    free[1:-1, 1:-1, 1:-1] = clear[1:-1, 1:-1, 1:-1]
+    core = (slice(1, -1), slice(1, -1), slice(1, -1))
+    return tuple(flood(np.where(lit, k, seed), free)[core].copy()
+                 for k, seed in zip(known, (sky_seed(clear), BlockRegistry.LIGHT[padded])))
+
+
+class LightEngine:
+    # Sky light and block light (0..15) for the loaded chunks, one dense array
+    # of each per chunk. A chunk is lit in one vectorised flood the first time
+    # it is meshed (on the streamer's workers: snapshot, flood_chunk,
+    # install); after that block edits update only the cells whose light
+    # actually changes, with the usual remove / add breadth-first queues.
+    def __init__(self, world):
+        self.world = world
+        self.sky = {}
+        self.block = {}
+        self.touched = set()
+        self.views = {}
+        # A fresh stamp per chunk whenever its light changes, so a flood
+        # run elsewhere can tell its snapshot went stale.
+        self.versions = {}
+        self.stamp = 0
+
+    def is_lit(self, key):
+        return key in self.sky
+
+    def invalidate(self, key):
+        # Dropped light is recomputed from scratch the next time it is needed.
+        self.sky.pop(key, None)
+        self.block.pop(key, None)
+        self.versions.pop(key, None)
+
+    def ensure(self, key):
+        # Returns the other chunks whose light changed while lighting this one.
+        if key in self.sky or key not in self.world.chunks:
+            return set()
+        return self.relight(key)
+
+    def relight(self, key):
+        # Full flood of one chunk, here and now.
+        return self.install(key, *flood_chunk(*self.snapshot(key)))
+
+    def bump(self, keys):
+        for key in keys:
+            self.stamp += 1
+            self.versions[key] = self.stamp
+
+    def snapshot(self, key):
+        # flood_chunk's inputs, copied out of the world: the padded blocks,
+        # which of them already have light, and that light. Lit neighbours
+        # supply the border; the others are seeded from their own sky
+        # columns and emitters.
+        cx, cz = key
+        ones = np.ones(chunk_shape(), dtype=bool)
+        lit = pad_blocks(lambda k, index: ones[index] if k in self.sky else None, cx, cz).astype(bool)
+        known = [pad_blocks(lambda k, index: lights[k][index] if k in lights else None, cx, cz)
+                 for lights in (self.sky, self.block)]
+        return self.world.padded_blocks(cx, cz), lit, known
+
+    def install(self, key, sky, block):
+        # store(), then the light that should flow back into lit neighbours
+        # is pushed there. Returns the other chunks whose light changed.
+        self.touched = set()
+        self.views = {}
+        chunk = self.world.chunks[key]
+        for _, lights, mask in self.store(key, sky, block):
+            self.brighten(lights, deque(chunk.world_positions(mask)))
+        self.bump(self.touched)
+        self.touched.discard(key)
+        return self.touched
+
+    def store(self, key, sky, block):
+        # Stores a chunk's flooded light. Returns [(lit neighbour, sky or
+        # block light, mask)], mask marking the chunk's edge cells that are
+        # brighter than the neighbour's cell they face allows.
+        cx, cz = key
+        self.sky[key], self.block[key] = sky, block
+        self.bump([key])
+        s, every = Settings.CHUNK_SIZE, slice(None)
+        first, last = slice(0, 1), slice(s-1, s)
+        sides = {(cx-1, cz): ((first, every, every), (last, every, every)),
+                 (cx+1, cz): ((last, every, every), (first, every, every)),
+                 (cx, cz-1): ((every, every, first), (every, every, last)),
+                 (cx, cz+1): ((every, every, last), (every, every, first))}
+        out = []
+        for lights in (self.sky, self.block):
+            for other, (edge, facing) in sides.items():
+                if other not in lights or other not in self.world.chunks:
+                    continue
+                opaque = BlockRegistry.OPAQUE[self.world.chunks[other].read(facing)]
+                gain = (lights[key][edge] > lights[other][facing].astype(np.int16) + 1) & ~opaque
+                if gain.any():
+                    mask = np.zeros(chunk_shape(), dtype=bool)
+                    mask[edge] = gain
+                    out.append((other, lights, mask))
+        return out
+
+    def padded(self, cx, cz):
+        # Combined light with a border from the neighbours, shaped like
+        # WorldManager.padded_blocks, for baking into a mesh. Lights this
+        # chunk and its side neighbours first if needed; returns (light, the
+        # other chunks whose light changed on the way).
+        touched = set()
+        for key in ((cx, cz), (cx+1, cz), (cx-1, cz), (cx, cz+1), (cx, cz-1)):
+            touched |= self.ensure(key)
+        sky = pad_blocks(lambda k, index: self.sky[k][index] if k in self.sky else None, cx, cz)
+        block = pad_blocks(lambda k, index: self.block[k][index] if k in self.block else None, cx, cz)
+        sky[:, -1, :] = MAX_LIGHT
+        touched.discard((cx, cz))
+        return np.maximum(sky, block), touched
+
+    def blocks(self, key):
+        # (block IDs, opaque mask) of a loaded chunk, decoded once per update.
+        cells = self.views.get(key)
+        if cells is None:
+            view = self.world.chunks[key].view()
+            cells = self.views[key] = (view, BlockRegistry.OPAQUE[view])
+        return cells
+
+    def touch(self, x, z):
+        # The faces that show a cell's light can belong to the chunk next door.
+        s = Settings.CHUNK_SIZE
+        self.touched.add((x // s, z // s))
+        if x % s in (0, s - 1) or z % s in (0, s - 1):
+            for dx, dz in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                self.touched.add(((x + dx) // s, (z + dz) // s))
+
+    def update(self, pos):
+        # Call after the block at pos changed. Returns the chunks whose light
+        # changed, including neighbours showing it on their border faces.
+        self.touched = set()
+        self.views = {}
+        x, y, z = pos
+        key = chunk_key(x, z)
+        if key not in self.sky or not in_height_range(y):
+            return set()
+        index = local_index(x, y, z)
+        block_id = self.blocks(key)[0][index]
+        clear = not BlockRegistry.OPAQUE[block_id]
+        top = y == Settings.MIN_Y + Settings.CHUNK_HEIGHT - 1
+        for lights, source in ((self.sky, MAX_LIGHT if clear and top else 0),
+                               (self.block, int(BlockRegistry.LIGHT[block_id]))):
+            add = deque()
+            old = int(lights[key][index])
+            lights[key][index] = source
+            self.touch(x, z)
+            if old:
+                self.darken(lights, deque([(pos, old)]), add)
+            if source:
+                add.append(pos)
+            if clear:
+                # Let the surrounding light flow back in.
+                add.extend((x+dx, y+dy, z+dz) for dx, dy, dz in NEIGHBOURS)
+            self.brighten(lights, add)
+        self.bump(self.touched)
+        return self.touched
+
+    def darken(self, lights, queue, add):
+        # Removal pass: zero every cell whose light came from the removed
+        # level, and queue the brighter cells at the edge of that volume so
+        # brighten() can fill it back in from them. Emitters inside it are
+        # relit and queued too.
+        sky = lights is self.sky
+        s, lo, hi = Settings.CHUNK_SIZE, Settings.MIN_Y, Settings.MIN_Y + Settings.CHUNK_HEIGHT
+        while queue:
+            (x, y, z), level = queue.popleft()
+            for dx, dy, dz in NEIGHBOURS:
+                nx, ny, nz = x+dx, y+dy, z+dz
+                target = lights.get((nx // s, nz // s))
+                if target is None or not lo <= ny < hi:
+                    continue
+                i = (nx % s, ny - lo, nz % s)
+                nl = int(target[i])
+                if not nl:
+                    continue
+                n = (nx, ny, nz)
+                if nl < level or (sky and dy == -1 and level == MAX_LIGHT):
+                    emit = 0 if sky else int(BlockRegistry.LIGHT[self.blocks((nx // s, nz // s))[0][i]])
+                    target[i] = emit
+                    self.touch(nx, nz)
+                    queue.append((n, nl))
+                    if emit:
+                        add.append(n)
+                else:
+                    add.append(n)
+
+    def brighten(self, lights, queue):
+        # Add pass: spread light outwards from the queued cells. Full sky
+        # light travels straight down without fading.
+        sky = lights is self.sky
+        s, lo, hi = Settings.CHUNK_SIZE, Settings.MIN_Y, Settings.MIN_Y + Settings.CHUNK_HEIGHT
+        while queue:
+            x, y, z = queue.popleft()
+            source = lights.get((x // s, z // s))
+            if source is None or not lo <= y < hi:
+                continue
+            level = int(source[x % s, y - lo, z % s])
+            if level <= 1:
+                continue
+            for dx, dy, dz in NEIGHBOURS:
+                nx, ny, nz = x+dx, y+dy, z+dz
+                if not lo <= ny < hi:
+                    continue
+                key = (nx // s, nz // s)
+                target = lights.get(key)
+                if target is None:
+                    continue
+                i = (nx % s, ny - lo, nz % s)
+                new = level if sky and dy == -1 and level == MAX_LIGHT else level - 1
+                if target[i] >= new or self.blocks(key)[1][i]:
+                    continue
+                target[i] = new
+                self.touch(nx, nz)
+                queue.append((nx, ny, nz))
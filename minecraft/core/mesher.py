@@ -0,0 +1,243 @@
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID, BlockRegistry
+
+# (axis, sign) for +x, -x, +y, -y, +z, -z
+DIRECTIONS = ((0, 1), (0, -1), (1, 1), (1, -1), (2, 1), (2, -1))
+# Flat per-face shading so block edges stay readable without scene lighting.
+FACE_SHADE = {(0, 1): 0.8, (0, -1): 0.8, (1, 1): 1.0, (1, -1): 0.55, (2, 1): 0.7, (2, -1): 0.7}
+QUAD_TRIANGLES = np.array([0, 1, 2, 0, 2, 3], dtype=np.uint32)
+# Brightness by light level 0..15 and by ambient occlusion 0 (corner boxed in)
+# to 3 (open).
+LIGHT_CURVE = (0.05 + 0.95 * 0.8 ** (15 - np.arange(16))).astype(np.float32)
+AO_CURVE = np.array([0.5, 0.65, 0.8, 1.0], dtype=np.float32)
+
+
+def face_corners(axis, sign):
+    # Unit-quad corners on the given face of the cell [0,1]^3. Ursina is
+    # left-handed, so a face is front-facing when its corners run clockwise
+    # in right-handed terms, i.e. cross(v1-v0, v2-v0) points into the cell.
+    u, v = [a for a in range(3) if a != axis]
+    corners = np.zeros((4, 3), dtype=np.float32)
+    corners[:, axis] = 1 if sign > 0 else 0
+    corners[:, u] = (0, 1, 1, 0)
+    corners[:, v] = (0, 0, 1, 1)
+    normal = np.zeros(3)
+    normal[axis] = sign
+    if np.dot(np.cross(corners[1] - corners[0], corners[2] - corners[0]), normal) > 0:
+        corners = corners[::-1].copy()
+    return corners
+
+
+FACE_CORNERS = {d: face_corners(*d) for d in DIRECTIONS}
+
+
+def color_table():
+    return BlockRegistry.RGBA.copy()
+
+
+class MeshData:
+    # Plain vertex/index/color buffers for one chunk, in chunk-local lattice
+    # coordinates where block (i, j, k) fills [i, i+1] x [j, j+1] x [k, k+1].
+    def __init__(self, vertices, triangles, colors):
+        self.vertices = vertices
+        self.triangles = triangles
+        self.colors = colors
+
+    @property
+    def face_count(self):
+        return len(self.triangles) // 6
+
+    @property
+    def vertex_count(self):
+        return len(self.vertices)
+
+    @staticmethod
+    def empty():
+        return MeshData(
+            np.zeros((0, 3), dtype=np.float32),
+            np.zeros(0, dtype=np.uint32),
+            np.zeros((0, 4), dtype=np.float32)
+        )
+
+    @staticmethod
+    def concat(parts):
+        parts = [p for p in parts if p.vertex_count]
+        if not parts:
+            return MeshData.empty()
+        offsets = np.cumsum([0] + [p.vertex_count for p in parts[:-1]])
+        return MeshData(
+            np.concatenate([p.vertices for p in parts]),
+            np.concatenate([p.triangles + o for p, o in zip(parts, offsets)]).astype(np.uint32),
+            np.concatenate([p.colors for p in parts])
+        )
+
+
+def quads(corners, colors):
+    # corners (n, 4, 3), colors (n, 4) per quad or (n, 4, 4) per corner ->
+    # MeshData with two triangles per quad.
+    n = len(corners)
+    base = (np.arange(n, dtype=np.uint32) * 4)[:, None]
+    return MeshData(
+        corners.reshape(-1, 3).astype(np.float32),
+        (base + QUAD_TRIANGLES[None, :]).reshape(-1),
+        colors.reshape(-1, 4) if colors.ndim == 3 else np.repeat(colors, 4, axis=0)
+    )
+
+
+def neighbour_slice(axis, sign):
+    sl = [slice(1, -1)] * 3
+    sl[axis] = slice(2, None) if sign > 0 else slice(None, -2)
+    return tuple(sl)
+
+
+def visible_faces(padded, d, clear=None):
+    # Block IDs of the faces pointing in direction d whose neighbour is not
+    # opaque, 0 elsewhere. Transparent blocks (water) only show faces towards
+    # air, not towards each other. clear: ~OPAQUE[padded], if the caller has it.
+    if clear is None:
+        clear = ~BlockRegistry.OPAQUE[padded]
+    core = padded[1:-1, 1:-1, 1:-1]
+    n = neighbour_slice(*d)
+    show = clear[n] & (~clear[1:-1, 1:-1, 1:-1] | (padded[n] == BlockID.AIR))
+    return np.where(show, core, 0)
+
+
+def shifted(a, offset):
+    # The core of a padded array moved by offset (each -1, 0 or 1).
+    return a[tuple(slice(1 + o, n - 1 + o) for o, n in zip(offset, a.shape))]
+
+
+def face_keys(faces, d, light, opaque):
+    # Packs each visible face's block ID (bits 0-7) with the light of the cell
+    # it faces (8-11) and the ambient occlusion of its four corners (2 bits
+    # each from 12), so greedy meshing only merges faces that shade alike.
+    axis, sign = d
+    u, v = [a for a in range(3) if a != axis]
+    out = np.zeros(3, dtype=int)
+    out[axis] = sign
+    keys = faces.astype(np.int32) | shifted(light, out).astype(np.int32) << 8
+    for k, corner in enumerate(FACE_CORNERS[d]):
+        du = np.zeros(3, dtype=int)
+        dv = np.zeros(3, dtype=int)
+        du[u] = 2 * int(corner[u]) - 1
+        dv[v] = 2 * int(corner[v]) - 1
+        side1, side2 = shifted(opaque, out + du), shifted(opaque, out + dv)
+        ao = np.where(side1 & side2, 0, 3 - side1.astype(np.int32) - side2 - shifted(opaque, out + du + dv))
+        keys |= ao << (12 + 2 * k)
+    return np.where(faces != 0, keys, 0)
+
+
+def shade(values, d, colors):
+    # Vertex colors for quads carrying face_keys values: (n, 4 corners, rgba).
+    values = np.asarray(values)
+    rgba = np.repeat(colors[values & 0xFF][:, None, :], 4, axis=1)
+    light = LIGHT_CURVE[(values >> 8) & 0xF] * FACE_SHADE[d]
+    ao = AO_CURVE[(values[:, None] >> (12 + 2 * np.arange(4))) & 3]
+    rgba[:, :, :3] *= (light[:, None] * ao)[:, :, None]
+    return rgba
+
+
+def naive_quads(faces, d):
+    # Corners and face value (block ID or face key) of every visible face.
+    idx = np.argwhere(faces)
+    corners = idx[:, None, :].astype(np.float32) + FACE_CORNERS[d][None, :, :]
+    return corners, faces[faces != 0]
+
+
+def greedy_rects(ids):
+    # Merge equal, non-zero cells of a 2D grid into maximal rectangles,
+    # widest along the second axis first. Yields (u, v, du, dv, id).
+    rows = ids.tolist()
+    n_u, n_v = len(rows), len(rows[0])
+    # Visit only the non-zero cells, row by row; cells already swallowed by
+    # an earlier rectangle have been zeroed and are skipped.
+    for u, v in zip(*(i.tolist() for i in np.nonzero(ids))):
+        row = rows[u]
+        b = row[v]
+        if not b:
+            continue
+        w = 1
+        while v + w < n_v and row[v + w] == b:
+            w += 1
+        run = [b] * w
+        h = 1
+        while u + h < n_u and rows[u + h][v:v + w] == run:
+            h += 1
+        for k in range(h):
+            rows[u + k][v:v + w] = [0] * w
+        yield u, v, h, w, b
+
+
+def greedy_quads(faces, d):
+    axis = d[0]
+    u_axis, v_axis = [a for a in range(3) if a != axis]
+    layers = np.moveaxis(faces, axis, 0)
+    rects = []
+    for i in np.nonzero(layers.reshape(len(layers), -1).any(axis=1))[0]:
+        rects.extend((i,) + r for r in greedy_rects(layers[i]))
+    if not rects:
+        return np.zeros((0, 4, 3), dtype=np.float32), faces[:0, 0, 0]
+    rects = np.array(rects, dtype=np.int64)
+    origin = np.zeros((len(rects), 3), dtype=np.float32)
+    scale = np.ones((len(rects), 3), dtype=np.float32)
+    origin[:, axis], origin[:, u_axis], origin[:, v_axis] = rects[:, 0], rects[:, 1], rects[:, 2]
+    scale[:, u_axis], scale[:, v_axis] = rects[:, 3], rects[:, 4]
+    corners = origin[:, None, :] + FACE_CORNERS[d][None, :, :] * scale[:, None, :]
+    return corners, rects[:, 5]
+
+
+def downsample(padded, factor):
+    # Shrink blocks by factor along every axis: each factor^3 cell becomes one
+    # block, taken from its highest non-air layer so grass stays on top. A
+    # layer stands for its most common non-air block (ties to the lower ID),
+    # so one leaf, lamp or water cell does not repaint a whole coarse cell.
+    # A factor-wide border comes out as the usual one-cell border.
+    x, y, z = (n // factor for n in padded.shape)
+    cells = padded.reshape(x, factor, y, factor, z, factor).transpose(0, 2, 4, 3, 1, 5)
+    # Block counts per layer in one bincount, air's column zeroed.
+    k = int(padded.max()) + 1
+    layer = np.arange(x * y * z * factor).repeat(factor * factor) * k
+    counts = np.bincount(layer + cells.ravel(), minlength=x * y * z * factor * k).reshape(x, y, z, factor, k)
+    counts[..., 0] = 0
+    layers = np.where(counts.any(axis=4), counts.argmax(axis=4), 0).astype(padded.dtype)
+    out = layers[..., 0].copy()
+    for dy in range(1, factor):
+        top = layers[..., dy]
+        out = np.where(top != 0, top, out)
+    return out
+
+
+def build_chunk_mesh(padded, colors=None, greedy=None, scale=1, light=None):
+    # padded: chunk blocks with a one-block neighbour border (see
+    # WorldManager.padded_blocks). Only faces next to a non-opaque block are emitted;
+    # greedy mode merges coplanar faces of the same block into larger quads.
+    # scale > 1 builds a level-of-detail mesh: padded then carries a
+    # scale-wide border and is meshed at 1/scale resolution.
+    # light: light levels shaped like padded (LightEngine.padded); baked into
+    # the vertex colors together with ambient occlusion. LOD meshes stay unlit.
+    if scale > 1:
+        mesh = build_chunk_mesh(downsample(padded, scale), colors, greedy)
+        mesh.vertices *= scale
+        return mesh
+    if colors is None:
+        colors = color_table()
+    if greedy is None:
+        greedy = Settings.GREEDY_MESHING
+    make_quads = greedy_quads if greedy else naive_quads
+    opaque = BlockRegistry.OPAQUE[padded]
+    clear = ~opaque
+    parts = []
+    for d in DIRECTIONS:
+        faces = visible_faces(padded, d, clear)
+        if not faces.any():
+            continue
+        if light is None:
+            corners, ids = make_quads(faces, d)
+            face_colors = colors[ids]
+            face_colors[:, :3] *= FACE_SHADE[d]
+        else:
+            corners, keys = make_quads(face_keys(faces, d, light, opaque), d)
+            face_colors = shade(keys, d, colors)
+        parts.append(quads(corners, face_colors))
+    return MeshData.concat(parts)
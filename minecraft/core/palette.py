@@ -0,0 +1,92 @@
+import numpy as np
+
+# Index widths that divide a byte evenly; 0 means "single-value, no indices".
+WIDTHS = (0, 1, 2, 4, 8)
+
+
+def index_bits(palette_size):
+    for bits in WIDTHS:
+        if palette_size <= 1 << bits:
+            return bits
+    raise ValueError(f'palette of {palette_size} entries does not fit in 8 bits')
+
+
+def encode(blocks):
+    # Dense block IDs -> (palette, bits, packed index bytes).
+    palette, indices = np.unique(blocks.reshape(-1), return_inverse=True)
+    bits = index_bits(len(palette))
+    return palette.astype(np.uint8), bits, pack_bits(indices.astype(np.uint8), bits)
+
+
+def decode(palette, bits, packed, shape):
+    count = int(np.prod(shape))
+    if bits == 0:
+        return np.full(shape, palette[0], dtype=np.uint8)
+    return palette[unpack_bits(packed, bits, count)].reshape(shape)
+
+
+def pack_bits(indices, bits):
+    if bits == 0:
+        return np.zeros(0, dtype=np.uint8)
+    if bits == 8:
+        return indices.astype(np.uint8)
+    per_byte = 8 // bits
+    padded = np.zeros(-(-len(indices) // per_byte) * per_byte, dtype=np.uint8)
+    padded[:len(indices)] = indices
+    shifts = (np.arange(per_byte, dtype=np.uint8) * bits)[None, :]
+    return np.bitwise_or.reduce(padded.reshape(-1, per_byte) << shifts, axis=1).astype(np.uint8)
+
+
+def unpack_bits(packed, bits, count):
+    if bits == 8:
+        return packed[:count]
+    per_byte = 8 // bits
+    shifts = (np.arange(per_byte, dtype=np.uint8) * bits)[None, :]
+    mask = np.uint8((1 << bits) - 1)
+    return ((packed[:, None] >> shifts) & mask).reshape(-1)[:count]
+
+
+class Section:
+    # One palette-compressed slab of a chunk. A uniform slab (all air, all
+    # stone) is a one-entry palette with no index bytes at all.
+    __slots__ = ('palette', 'bits', 'packed')
+
+    def __init__(self, palette, bits, packed):
+        self.palette = palette
+        self.bits = bits
+        self.packed = packed
+
+    @classmethod
+    def encode(cls, blocks):
+        return cls(*encode(blocks))
+
+    @property
+    def kind(self):
+        return 'uniform' if self.bits == 0 else 'packed'
+
+    @property
+    def nbytes(self):
+        return self.palette.nbytes + self.packed.nbytes
+
+    def decode(self, shape):
+        return decode(self.palette, self.bits, self.packed, shape)
+
+    def take(self, flat):
+        # Block IDs at an array of flat indices.
+        if self.bits == 0:
+            return np.full(flat.shape, self.palette[0], dtype=np.uint8)
+        if self.bits == 8:
+            return self.palette[self.packed[flat]]
+        per_byte = 8 // self.bits
+        shift = (flat % per_byte * self.bits).astype(np.uint8)
+        return self.palette[(self.packed[flat // per_byte] >> shift) & np.uint8((1 << self.bits) - 1)]
+
+    def get(self, i):
+        # Block ID at flat (C-order) index i, without unpacking the rest.
+        if self.bits == 0:
+            return int(self.palette[0])
+        if self.bits == 8:
+            return int(self.palette[self.packed[i]])
+        per_byte = 8 // self.bits
+        byte = int(self.packed[i // per_byte])
+        return int(self.palette[byte >> (i % per_byte * self.bits) & ((1 << self.bits) - 1)])
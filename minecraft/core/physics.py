@@ -0,0 +1,85 @@
+import math
+from minecraft.config.settings import Settings
+from minecraft.core.chunk import BLOCK_OFFSET
+
+EPS = 1e-4
+
+
+class PlayerBody:
+    # Headless player physics: an axis-aligned box swept against the block grid
+    # one axis at a time (y, then x, then z). Only the cells the box's leading
+    # face passes through are queried, so the cost per tick does not depend on
+    # the size of the world. position is the centre of the feet, in world
+    # coordinates like the player Entity.
+    def __init__(self, position, width=None, height=None):
+        self.position = [float(c) for c in position]
+        self.velocity = [0.0, 0.0, 0.0]
+        self.width = Settings.PLAYER_WIDTH if width is None else width
+        self.height = Settings.PLAYER_HEIGHT if height is None else height
+        self.on_ground = False
+
+    @property
+    def jump_velocity(self):
+        return math.sqrt(2 * Settings.GRAVITY * Settings.JUMP_HEIGHT)
+
+    def bounds(self):
+        # Box corners in lattice space, where block (x, y, z) fills the unit cell at (x, y, z).
+        x, y, z = (p + o for p, o in zip(self.position, BLOCK_OFFSET))
+        r = self.width / 2
+        return (x - r, y, z - r), (x + r, y + self.height, z + r)
+
+    def intersects_block(self, block):
+        lo, hi = self.bounds()
+        return all(lo[a] < block[a] + 1 and block[a] < hi[a] for a in range(3))
+
+    def step(self, dt, is_solid, move=(0.0, 0.0), speed=None, jump=False):
+        # move: desired horizontal direction (x, z), length <= 1.
+        # is_solid(x, y, z) -> bool for integer block coordinates.
+        dt = min(dt, Settings.MAX_PHYSICS_DT)
+        speed = Settings.WALK_SPEED if speed is None else speed
+        vx, vz = move[0] * speed, move[1] * speed
+        vy = max(self.velocity[1] - Settings.GRAVITY * dt, -Settings.TERMINAL_VELOCITY)
+        if jump and self.on_ground:
+            vy = self.jump_velocity
+
+        self.on_ground = False
+        for axis, v in ((1, vy), (0, vx), (2, vz)):
+            wanted = v * dt
+            moved = self.sweep(axis, wanted, is_solid)
+            self.position[axis] += moved
+            if moved != wanted and axis == 1:
+                self.on_ground = wanted < 0
+                vy = 0.0
+        self.velocity = [vx, vy, vz]
+
+    def sweep(self, axis, d, is_solid):
+        # How far the box can move along one axis before touching a solid cell.
+        if d == 0:
+            return 0.0
+        lo, hi = self.bounds()
+        a, b = [i for i in range(3) if i != axis]
+        span_a = range(math.floor(lo[a] + EPS), math.floor(hi[a] - EPS) + 1)
+        span_b = range(math.floor(lo[b] + EPS), math.floor(hi[b] - EPS) + 1)
+
+        def blocked(k):
+            cell = [0, 0, 0]
+            cell[axis] = k
+            for i in span_a:
+                cell[a] = i
+                for j in span_b:
+                    cell[b] = j
+                    if is_solid(*cell):
+                        return True
+            return False
+
+        if d > 0:
+            edge = hi[axis]
+            for k in range(math.ceil(edge - EPS), math.ceil(edge + d)):
+                if blocked(k):
+                    return max(0.0, k - EPS - edge)
+        else:
+            edge = lo[axis]
+            for k in range(math.floor(edge + EPS) - 1, math.floor(edge + d) - 1, -1):
+                if blocked(k):
+                    return min(0.0, k + 1 + EPS - edge)
+        return d
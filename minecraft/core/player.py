@@ -1,23 +1,34 @@
 from ursina import *
-from ursina.prefabs.first_person_controller import FirstPersonController
 from minecraft.config.settings import Settings
 from minecraft.config.blocks import BlockRegistry
-from minecraft.core.voxel import Voxel
+from minecraft.core.controls import InputFrame, PlayerSim, PRESS_KEYS, held_mask
 
 
-
-class PlayerController(FirstPersonController):
-    def __init__(self, world, ui):
+class PlayerController(Entity):
+    # First-person view on top of PlayerSim. Each frame the live input (or a
+    # replay's recorded frame) becomes one InputFrame; collision queries the
+    # block grid directly, so chunk meshes need no colliders.
+    # 确保改成 (0, 30, 0)，给一点高度让你掉下来
+    def __init__(self, world, ui, profiler=None, replay=None, position=(0, 30, 0)):
         super().__init__()
         self.world = world
         self.ui = ui
+        self.replay = replay        # iterator of InputFrames, or None for live input
+        self.recorder = None
+        self.frame = None           # the InputFrame applied this frame
+
+        self.mouse_sensitivity = Vec2(40, 40)
+        self.camera_pivot = Entity(parent=self, y=Settings.EYE_HEIGHT)
+        camera.parent = self.camera_pivot
+        camera.position = (0, 0, 0)
+        camera.rotation = (0, 0, 0)
+        camera.fov = 90
+        mouse.locked = replay is None
 
-        self.speed = Settings.WALK_SPEED
-        self.jump_height = Settings.JUMP_HEIGHT
-        self.height = Settings.PLAYER_HEIGHT
-        self.gravity = 0.6
-        # 确保改成 (0, 30, 0)，给一点高度让你掉下来
-        self.position = (0, 30, 0)
+        self.sim = PlayerSim(world, position, profiler)
+        self.body = self.sim.body
+        self.position = self.body.position
+        self.pressed = []
 
         self.hand = Entity(
             parent=self.camera_pivot,
@@ -29,35 +40,42 @@ class PlayerController(FirstPersonController):
         self.update_hand_color()
 
     def update_hand_color(self):
-        self.hand.color = BlockRegistry.get(
-            self.ui.get_current_block_id()
-        )['color']
+        self.hand.color = BlockRegistry.color(self.sim.block_id)
 
-    def input(self, key):
-        super().input(key)
+    def live_frame(self):
+        yaw = self.sim.yaw + mouse.velocity[0] * self.mouse_sensitivity[1]
+        pitch = clamp(self.sim.pitch - mouse.velocity[1] * self.mouse_sensitivity[0], -90, 90)
+        frame = InputFrame(time.dt, yaw, pitch, held_mask(lambda key: held_keys[key]), self.pressed)
+        self.pressed = []
+        return frame
 
-        if key in '123456':
-            self.ui.select_slot(int(key)-1)
-            self.update_hand_color()
+    def update(self):
+        if self.replay is not None:
+            frame = next(self.replay, None)
+            if frame is None:
+                self.replay = None
+                return
+        else:
+            frame = self.live_frame()
+        if self.recorder is not None:
+            self.recorder.add(frame)
+        self.frame = frame
 
-        if key == 'left mouse down':
-            self.break_block()
-        if key == 'right mouse down':
-            self.place_block()
-
-    def break_block(self):
-        self.animate_hand()
-        if mouse.hovered_entity and isinstance(mouse.hovered_entity, Voxel):
-            voxel = mouse.hovered_entity
-            if voxel.breakable:
-                self.world.remove_block(voxel)
+        slot = self.sim.slot
+        self.sim.apply(frame)
+        if self.sim.slot != slot:
+            self.ui.select_slot(self.sim.slot)
+            self.update_hand_color()
+        if 'left mouse down' in frame.keys or 'right mouse down' in frame.keys:
+            self.animate_hand()
+        self.rotation_y = self.sim.yaw
+        self.camera_pivot.rotation_x = self.sim.pitch
+        self.position = self.body.position
 
-    def place_block(self):
-        self.animate_hand()
-        if mouse.hovered_entity and isinstance(mouse.hovered_entity, Voxel):
-            pos = mouse.hovered_entity.position + mouse.normal
-            if distance(pos, self.position) > 1.5:
-                self.world.create_block(pos, self.ui.get_current_block_id())
+    def input(self, key):
+        # Applied on the next update, in order, so recordings see them too.
+        if self.replay is None and key in PRESS_KEYS:
+            self.pressed.append(key)
 
     def animate_hand(self):
         self.hand.animate_rotation((30,-10,0), duration=0.1)
@@ -0,0 +1,47 @@
+import math
+from minecraft.config.blocks import BlockID
+from minecraft.core.chunk import BLOCK_OFFSET
+
+
+class RayHit:
+    def __init__(self, block, normal, distance, block_id):
+        self.block = block        # (x, y, z) of the block that was hit
+        self.normal = normal      # face normal, e.g. (0, 1, 0) for the top face
+        self.distance = distance
+        self.block_id = block_id
+
+    @property
+    def adjacent(self):
+        # Cell in front of the hit face, where a placed block goes.
+        return tuple(b + n for b, n in zip(self.block, self.normal))
+
+
+def raycast(get_block, origin, direction, reach):
+    # Amanatides & Woo grid traversal: visit every cell the ray passes through,
+    # nearest first, until a non-air block or `reach` is hit. get_block takes
+    # integer block coordinates. Cost grows with reach, not with world size.
+    length = math.sqrt(sum(d*d for d in direction))
+    if length == 0:
+        return None
+    d = [c / length for c in direction]
+    p = [o + off for o, off in zip(origin, BLOCK_OFFSET)]  # lattice space
+    cell = [math.floor(c) for c in p]
+    step, t_max, t_delta = [0]*3, [math.inf]*3, [math.inf]*3
+    for a in range(3):
+        if d[a] > 0:
+            step[a], t_max[a], t_delta[a] = 1, (cell[a] + 1 - p[a]) / d[a], 1 / d[a]
+        elif d[a] < 0:
+            step[a], t_max[a], t_delta[a] = -1, (p[a] - cell[a]) / -d[a], -1 / d[a]
+
+    normal = (0, 0, 0)
+    t = 0.0
+    while t <= reach:
+        block_id = get_block(tuple(cell))
+        if block_id != BlockID.AIR:
+            return RayHit(tuple(cell), normal, t, block_id)
+        a = t_max.index(min(t_max))
+        t = t_max[a]
+        t_max[a] += t_delta[a]
+        cell[a] += step[a]
+        normal = tuple(-step[a] if i == a else 0 for i in range(3))
+    return None
@@ -1,4 +1,18 @@
-from minecraft.app.game import MinecraftGame
+import argparse
+from minecraft.config.settings import Settings, parse_seed
 
 if __name__ == '__main__':
-    MinecraftGame().run()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seed', type=parse_seed, help='world seed (default: $MINECRAFT_SEED or random)')
+    parser.add_argument('--record', metavar='PATH', help='save this session\'s input for replay on exit')
+    parser.add_argument('--replay', metavar='PATH', help='play back a recording made with --record')
+    args = parser.parse_args()
+    if args.seed is not None:
+        Settings.SEED = args.seed
+        Settings.SEED_PINNED = True
+    if args.record or args.replay:
+        # 录制/回放必须从同一个种子的全新世界开始
+        Settings.SAVE_DIR = None
+
+    from minecraft.app.game import MinecraftGame
+    MinecraftGame(replay=args.replay, record=args.record).run()
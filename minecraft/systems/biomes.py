@@ -0,0 +1,134 @@
+import random, threading
+from collections import OrderedDict
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.systems.terrain import TerrainNoise, chunk_columns
+
+
+class Biome:
+    # strata: the surface layers from the top down, stone below them.
+    # amplitude: multiplies TERRAIN_AMPLITUDE. structures: (kind in
+    # structures.TEMPLATES, chance per column), tried in order.
+    def __init__(self, name, strata, amplitude, structures):
+        self.name = name
+        self.strata = strata
+        self.amplitude = amplitude
+        self.structures = structures
+
+
+# Index 0 is the world before biomes (plus the odd house), and what
+# BIOMES = False generates.
+BIOMES = (
+    Biome('plains',    (BlockID.GRASS, BlockID.DIRT, BlockID.STONE, BlockID.STONE), 1.0,
+          (('tree', 0.02), ('house', 0.0005))),
+    Biome('forest',    (BlockID.GRASS, BlockID.DIRT, BlockID.DIRT, BlockID.STONE), 1.25,
+          (('tree', 0.08), ('boulder', 0.002))),
+    Biome('desert',    (BlockID.SAND, BlockID.SAND, BlockID.SAND, BlockID.STONE), 0.5, ()),
+    Biome('hills',     (BlockID.GRASS, BlockID.DIRT, BlockID.STONE, BlockID.STONE), 2.0,
+          (('tree', 0.01), ('boulder', 0.01))),
+    Biome('scrubland', (BlockID.DIRT, BlockID.DIRT, BlockID.STONE, BlockID.STONE), 0.75,
+          (('tree', 0.005), ('boulder', 0.004))),
+)
+PLAINS, FOREST, DESERT, HILLS, SCRUBLAND = range(len(BIOMES))
+# Per-biome tables, indexed by biome like BlockRegistry's by block ID.
+STRATA = np.array([b.strata for b in BIOMES], dtype=np.uint8)
+AMPLITUDE = np.array([b.amplitude for b in BIOMES])
+
+
+def classify(temperature, humidity):
+    # Biome index per column from the two climate fields (roughly -0.5..0.5).
+    return np.select([temperature < -0.12, (temperature > 0.12) & (humidity < 0), humidity < -0.1, humidity > 0.1],
+                     [HILLS, DESERT, SCRUBLAND, FOREST], PLAINS).astype(np.uint8)
+
+
+def derived_seed(seed, name):
+    # A separate non-zero noise seed per climate field.
+    return random.Random(f'{seed}:{name}').getrandbits(31) | 1
+
+
+class BiomeMap:
+    # Temperature and humidity are low-frequency noise, so they are sampled
+    # once per BIOME_CELL blocks over a region of BIOME_REGION chunks and
+    # bilinearly interpolated from there. Regions are kept in an LRU of
+    # BIOME_CACHE_REGIONS; a chunk costs one interpolation instead of two
+    # noise evaluations per column, and generation asks for the same chunk
+    # several times (heights, strata, trees), so the last few chunks' columns
+    # are kept too. Safe from worker threads.
+    def __init__(self, seed):
+        self.temperature = TerrainNoise(derived_seed(seed, 'temperature'), octaves=1)
+        self.humidity = TerrainNoise(derived_seed(seed, 'humidity'), octaves=1)
+        self.regions = OrderedDict()
+        self.chunks = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def region(self, rkey):
+        # (temperature, humidity, amplitude) on the region's coarse grid,
+        # corners included, so interpolation never needs a neighbour region.
+        with self.lock:
+            fields = self.regions.get(rkey)
+            if fields is not None:
+                self.regions.move_to_end(rkey)
+                self.hits += 1
+                return fields
+        span, cell = Settings.BIOME_REGION * Settings.CHUNK_SIZE, Settings.BIOME_CELL
+        xs, zs = np.meshgrid(rkey[0]*span + np.arange(0, span + 1, cell),
+                             rkey[1]*span + np.arange(0, span + 1, cell), indexing='ij')
+        t = self.temperature(xs * Settings.BIOME_SCALE, zs * Settings.BIOME_SCALE)
+        h = self.humidity(xs * Settings.BIOME_SCALE, zs * Settings.BIOME_SCALE)
+        fields = np.stack([t, h, AMPLITUDE[classify(t, h)]])
+        with self.lock:
+            self.misses += 1
+            self.regions[rkey] = fields
+            if len(self.regions) > Settings.BIOME_CACHE_REGIONS:
+                self.regions.popitem(last=False)
+        return fields
+
+    def sample(self, xs, zs):
+        # Interpolated (temperature, humidity, amplitude) at block columns;
+        # a (3,) + xs.shape array. Columns are grouped by region, which for
+        # a chunk is always just one.
+        xs, zs = np.asarray(xs, dtype=np.int64), np.asarray(zs, dtype=np.int64)
+        span = Settings.BIOME_REGION * Settings.CHUNK_SIZE
+        rx, rz = xs // span, zs // span
+        if rx.min() == rx.max() and rz.min() == rz.max():
+            return self.interpolate((int(rx.min()), int(rz.min())), xs, zs)
+        out = np.empty((3,) + xs.shape)
+        for rkey in set(zip(rx.ravel().tolist(), rz.ravel().tolist())):
+            sel = (rx == rkey[0]) & (rz == rkey[1])
+            out[:, sel] = self.interpolate(rkey, xs[sel], zs[sel])
+        return out
+
+    def interpolate(self, rkey, xs, zs):
+        span, cell = Settings.BIOME_REGION * Settings.CHUNK_SIZE, Settings.BIOME_CELL
+        grid = self.region(rkey)
+        fx = (xs - rkey[0]*span) / cell
+        fz = (zs - rkey[1]*span) / cell
+        i, k = fx.astype(np.int64), fz.astype(np.int64)
+        tx, tz = fx - i, fz - k
+        near = grid[:, i, k] + tx * (grid[:, i + 1, k] - grid[:, i, k])
+        far = grid[:, i, k + 1] + tx * (grid[:, i + 1, k + 1] - grid[:, i, k + 1])
+        return near + tz * (far - near)
+
+    def columns(self, xs, zs):
+        # (biome index, height amplitude) per column.
+        if not Settings.BIOMES:
+            shape = np.shape(xs)
+            return np.zeros(shape, dtype=np.uint8), np.full(shape, float(Settings.TERRAIN_AMPLITUDE))
+        t, h, amplitude = self.sample(xs, zs)
+        return classify(t, h), amplitude * Settings.TERRAIN_AMPLITUDE
+
+    def chunk(self, cx, cz):
+        # columns() for a chunk, indexed [local x, local z]. Shared arrays:
+        # do not write to them.
+        key = (cx, cz, Settings.BIOMES)
+        with self.lock:
+            cached = self.chunks.get(key)
+        if cached is None:
+            cached = self.columns(*chunk_columns(cx, cz))
+            with self.lock:
+                self.chunks[key] = cached
+                if len(self.chunks) > 4 * Settings.STREAM_WORKERS:
+                    self.chunks.popitem(last=False)
+        return cached
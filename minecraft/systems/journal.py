@@ -0,0 +1,258 @@
+import os, struct, warnings
+from array import array
+from contextlib import contextmanager
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.systems.structures import TEMPLATES
+
+# One edit per little-endian uint64:
+#   bit 0       first edit of an undo step
+#   bits 1-20   x + 2^19
+#   bits 21-40  z + 2^19
+#   bits 41-47  y - MIN_Y
+#   bits 48-55  old block ID
+#   bits 56-63  new block ID
+COORD_BITS = 20
+COORD_LIMIT = 1 << (COORD_BITS - 1)
+Y_BITS = 7
+HEADER = struct.Struct('<4sHqQQ')   # magic, version, seed, edits, cursor
+MAGIC = b'OTJ\0'
+FORMAT_VERSION = 1
+
+
+def covers(xs, ys, zs):
+    # Which positions fit the record format: |x|, |z| < COORD_LIMIT and
+    # 2^Y_BITS rows from MIN_Y.
+    xs, ys, zs = (np.asarray(c, dtype=np.int64) for c in (xs, ys, zs))
+    return (np.abs(xs) < COORD_LIMIT) & (np.abs(zs) < COORD_LIMIT) & (ys >= Settings.MIN_Y) & \
+        (ys - Settings.MIN_Y < 1 << Y_BITS)
+
+
+def spill_reach():
+    # How many chunks away a structure stamped in one chunk can write to.
+    overhang = max(max(o, n - 1 - o) for variants in TEMPLATES.values() for t in variants
+                   for o, n in ((t.origin[0], t.blocks.shape[0]), (t.origin[2], t.blocks.shape[2])))
+    return -(-overhang // Settings.CHUNK_SIZE)
+
+
+def pack(xs, ys, zs, old, new, first):
+    # Arrays in, uint64 records out. first: bool array, set on step starts.
+    if not covers(xs, ys, zs).all():
+        raise ValueError(f'edit journal only covers |x|, |z| < {COORD_LIMIT} and {1 << Y_BITS} rows from MIN_Y')
+    xs, zs = np.asarray(xs, dtype=np.int64), np.asarray(zs, dtype=np.int64)
+    ys = np.asarray(ys, dtype=np.int64) - Settings.MIN_Y
+    return (np.asarray(first, dtype=np.uint64)
+            | (xs + COORD_LIMIT).astype(np.uint64) << np.uint64(1)
+            | (zs + COORD_LIMIT).astype(np.uint64) << np.uint64(21)
+            | ys.astype(np.uint64) << np.uint64(41)
+            | np.asarray(old, dtype=np.uint64) << np.uint64(48)
+            | np.asarray(new, dtype=np.uint64) << np.uint64(56))
+
+
+def unpack(records):
+    # uint64 records -> (first, x, y, z, old, new) arrays.
+    r = np.asarray(records, dtype=np.uint64)
+    field = lambda shift, bits: ((r >> np.uint64(shift)) & np.uint64((1 << bits) - 1)).astype(np.int64)
+    return (field(0, 1).astype(bool), field(1, COORD_BITS) - COORD_LIMIT, field(41, Y_BITS) + Settings.MIN_Y,
+            field(21, COORD_BITS) - COORD_LIMIT, field(48, 8).astype(np.uint8), field(56, 8).astype(np.uint8))
+
+
+class EditJournal:
+    # Append-only log of the player's block edits (and bulk box edits), 8
+    # bytes each, for undo/redo and for replaying a session onto a freshly
+    # generated world. Every edit outside group() is its own undo step;
+    # everything inside one group() is a single step. Undo and redo move a
+    # cursor over the log; a new edit after an undo drops the undone tail,
+    # like any editor. Block ticks (falling sand, water) are not recorded:
+    # they follow from the edits.
+    def __init__(self, world):
+        self.world = world
+        self.records = array('Q')
+        self.cursor = 0         # edits currently applied
+        self.depth = 0          # open group() blocks
+        self.opened = False     # the next edit starts the open group
+        self.applying = False   # undo/redo/replay in progress: record nothing
+        self.skipped = 0        # edits too far out for the record format
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def nbytes(self):
+        return len(self.records) * self.records.itemsize
+
+    @contextmanager
+    def group(self):
+        # Edits inside, bulk edits included, undo and redo as one step.
+        if self.depth == 0:
+            self.opened = True
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+
+    def starts_step(self):
+        first = self.depth == 0 or self.opened
+        self.opened = False
+        return first
+
+    def append(self, packed):
+        if self.cursor < len(self.records):
+            del self.records[self.cursor:]
+        self.records.frombytes(packed.astype('<u8').tobytes())
+        self.cursor = len(self.records)
+
+    def record(self, pos, old, new):
+        if self.applying or old == new:
+            return
+        x, y, z = pos
+        if abs(x) >= COORD_LIMIT or abs(z) >= COORD_LIMIT or not 0 <= y - Settings.MIN_Y < 1 << Y_BITS:
+            self.skip(1)
+            return
+        # pack() for one edit, in plain ints: a player's click should not
+        # pay for building five arrays.
+        if self.cursor < len(self.records):
+            del self.records[self.cursor:]
+        self.records.append(self.starts_step() | (x + COORD_LIMIT) << 1 | (z + COORD_LIMIT) << 21
+                            | (y - Settings.MIN_Y) << 41 | old << 48 | new << 56)
+        self.cursor = len(self.records)
+
+    def record_box(self, corner, old, new, changed):
+        # A bulk edit's changed cells; old/new are the piece's block arrays
+        # and corner the world position of its low corner.
+        if self.applying:
+            return
+        ox, oy, oz = corner
+        ix, iy, iz = np.nonzero(changed)
+        xs, ys, zs = ix + ox, iy + oy, iz + oz
+        fits = covers(xs, ys, zs)
+        if not fits.all():
+            self.skip(int(np.count_nonzero(~fits)))
+            if not fits.any():
+                return
+        first = np.zeros(int(np.count_nonzero(fits)), dtype=bool)
+        first[0] = self.starts_step()
+        self.append(pack(xs[fits], ys[fits], zs[fits], old[changed][fits], new[changed][fits], first))
+
+    def skip(self, count):
+        # Edits the format cannot hold still happen, they just cannot be
+        # undone or replayed. Warned about once.
+        if not self.skipped:
+            warnings.warn(f'edits beyond |x|, |z| < {COORD_LIMIT} are not journaled (no undo or replay)',
+                          stacklevel=3)
+        self.skipped += count
+
+    def step_bounds(self, cursor, forward):
+        # (start, end) of the undo step ending at cursor (backwards) or
+        # starting at it (forwards).
+        firsts = np.flatnonzero(np.frombuffer(self.records, dtype=np.uint64) & np.uint64(1))
+        if forward:
+            later = firsts[firsts > cursor]
+            return cursor, int(later[0]) if len(later) else len(self.records)
+        return int(firsts[firsts < cursor][-1]), cursor
+
+    def undo(self):
+        # Puts back the blocks of the last applied step. Returns False if
+        # there is nothing to undo.
+        if not self.cursor:
+            return False
+        start, end = self.step_bounds(self.cursor, forward=False)
+        _, xs, ys, zs, old, _ = unpack(np.frombuffer(self.records, dtype=np.uint64)[start:end])
+        # A cell edited twice in the step goes back to its first old ID.
+        self.apply(xs[::-1], ys[::-1], zs[::-1], old[::-1])
+        self.cursor = start
+        return True
+
+    def redo(self):
+        if self.cursor == len(self.records):
+            return False
+        start, end = self.step_bounds(self.cursor, forward=True)
+        _, xs, ys, zs, _, new = unpack(np.frombuffer(self.records, dtype=np.uint64)[start:end])
+        self.apply(xs, ys, zs, new)
+        self.cursor = end
+        return True
+
+    def replay(self):
+        # Applies every edit up to the cursor to the world, generating the
+        # chunks they touch if needed: a saved session rebuilt on its seed.
+        # Their neighbours come first, so structure spill into an edited
+        # chunk is in place before the edits and never merged over them.
+        _, xs, ys, zs, _, new = unpack(np.frombuffer(self.records, dtype=np.uint64)[:self.cursor])
+        world = self.world
+        reach = spill_reach()
+        edited = set(zip((xs // Settings.CHUNK_SIZE).tolist(), (zs // Settings.CHUNK_SIZE).tolist()))
+        for cx, cz in edited:
+            for key in ((cx + dx, cz + dz) for dx in range(-reach, reach + 1) for dz in range(-reach, reach + 1)):
+                if key not in world.chunks:
+                    world.add_chunk(*world.load_chunk(*key))
+        self.apply(xs, ys, zs, new)
+
+    def apply(self, xs, ys, zs, ids):
+        # Writes ids at the positions, the last write to a cell winning. A
+        # few cells go through put_block (incremental relight); more go
+        # through edit_box one chunk at a time.
+        if not len(xs):
+            return
+        # Cells keyed by their packed position bits: 1D unique is far
+        # cheaper than np.unique(axis=0).
+        where = pack(xs, ys, zs, 0, 0, False)
+        _, last = np.unique(where[::-1], return_index=True)
+        keep = len(where) - 1 - last
+        cells, ids = np.stack([xs, ys, zs], axis=1)[keep], ids[keep]
+        self.applying = True
+        try:
+            if len(cells) <= Settings.LIGHT_BATCH_CELLS:
+                for pos, block_id in zip(map(tuple, cells.tolist()), ids.tolist()):
+                    self.world.put_block(pos, block_id)
+                return
+            s = Settings.CHUNK_SIZE
+            keys = (cells[:, 0] // s) * COORD_LIMIT + cells[:, 2] // s
+            for key in np.unique(keys):
+                mine = keys == key
+                self.world.edit_box(tuple(cells[mine].min(axis=0)), tuple(cells[mine].max(axis=0)),
+                                    self.writer(cells[mine], ids[mine]))
+        finally:
+            self.applying = False
+
+    @staticmethod
+    def writer(cells, ids):
+        # edit_box callback writing ids at the world cells inside its piece.
+        def edit(old, corner):
+            local = cells - np.array(corner)
+            inside = ((local >= 0) & (local < old.shape)).all(axis=1)
+            new = old.copy()
+            new[tuple(local[inside].T)] = ids[inside]
+            return new
+        return edit
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.world.noise.seed, len(self.records), self.cursor))
+            f.write(np.frombuffer(self.records, dtype=np.uint64).astype('<u8').tobytes())
+
+    def load(self, path):
+        # Replaces the log with a saved one (nothing is applied; see
+        # replay()). Returns the seed it was recorded on.
+        with open(path, 'rb') as f:
+            magic, version, seed, count, cursor = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f'{path}: not an edit journal this version can read')
+            self.records = array('Q', np.frombuffer(f.read(count * 8), dtype='<u8').astype(np.uint64).tobytes())
+        self.cursor = cursor
+        return seed
+
+
+def replay_journal(path):
+    # A fresh world on the journal's seed with its edits applied. Like
+    # replay.replay, this sets Settings.SEED. Returns the WorldManager.
+    # Imported here: world.py imports this module.
+    from minecraft.systems.world import WorldManager
+    with open(path, 'rb') as f:
+        _, _, seed, _, _ = HEADER.unpack(f.read(HEADER.size))
+    Settings.SEED = seed
+    world = WorldManager()
+    world.journal.load(path)
+    world.journal.replay()
+    return world
@@ -0,0 +1,212 @@
+import os, queue
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.core.chunk import Chunk, chunk_shape, pad_blocks
+from minecraft.core.lighting import light_blocks
+from minecraft.core.mesher import MeshData, build_chunk_mesh
+from minecraft.systems.terrain import chunk_columns
+
+# Per-process state set up by _init_worker.
+_worker = {}
+
+
+def settings_snapshot():
+    # Workers may be spawned rather than forked (Windows), in which case they
+    # re-import Settings and would roll a different SEED.
+    return {k: v for k, v in vars(Settings).items() if k.isupper()}
+
+
+def _attach(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _init_worker(settings, keys, blocks_name, heights_name):
+    from minecraft.systems.world import WorldManager
+    for k, v in settings.items():
+        setattr(Settings, k, v)
+    n, s = len(keys), Settings.CHUNK_SIZE
+    blocks_shm, blocks = _attach(blocks_name, (n,) + chunk_shape(), np.uint8)
+    heights_shm, heights = _attach(heights_name, (n, s, s), np.int16)
+    _worker.update(
+        world=WorldManager(),
+        index={k: i for i, k in enumerate(keys)},
+        shm=(blocks_shm, heights_shm),
+        blocks=blocks,
+        heights=heights,
+    )
+
+
+def _chunk(key):
+    return Chunk(*key, blocks=_worker['blocks'][_worker['index'][key]])
+
+
+def _terrain_stage(key):
+    # Heightmap, stratification and caves.
+    world = _worker['world']
+    heights = world.heights(*chunk_columns(*key))
+    _worker['heights'][_worker['index'][key]] = heights
+    chunk = _chunk(key)
+    world.stratify(chunk, heights)
+    world.carve(chunk, heights)
+    return 'terrain', key, None
+
+
+def _decorate_stage(key):
+    # Trees inside the chunk are written in place; the few blocks that spill
+    # over the border go back to the parent, which owns cross-chunk writes.
+    heights = _worker['heights'][_worker['index'][key]].astype(np.int64)
+    return 'decorate', key, _worker['world'].decorate(_chunk(key), heights)
+
+
+def _mesh_stage(key):
+    index, blocks = _worker['index'], _worker['blocks']
+    padded = pad_blocks(lambda k, i: blocks[index[k]][i] if k in index else None, *key)
+    light = light_blocks(padded) if Settings.LIGHTING else None
+    mesh = build_chunk_mesh(padded, _worker['world'].colors, light=light)
+    if not mesh.vertex_count:
+        return 'mesh', key, None
+    parts = (mesh.vertices, mesh.triangles, mesh.colors)
+    shm = shared_memory.SharedMemory(create=True, size=sum(p.nbytes for p in parts))
+    offset = 0
+    for p in parts:
+        shm.buf[offset:offset + p.nbytes] = p.tobytes()
+        offset += p.nbytes
+    name = shm.name
+    shm.close()  # the parent unlinks it once copied out
+    return 'mesh', key, (name, mesh.vertex_count, len(mesh.triangles))
+
+
+def _read_mesh(name, n_vertices, n_indices):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        buf, offset, out = shm.buf, 0, []
+        for dtype, shape in ((np.float32, (n_vertices, 3)), (np.uint32, (n_indices,)), (np.float32, (n_vertices, 4))):
+            count = int(np.prod(shape))
+            out.append(np.frombuffer(buf, dtype=dtype, count=count, offset=offset).reshape(shape).copy())
+            offset += count * np.dtype(dtype).itemsize
+        return MeshData(*out)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def neighbourhood(key, r):
+    cx, cz = key
+    return [(cx+dx, cz+dz) for dx in range(-r, r+1) for dz in range(-r, r+1)]
+
+
+class PregenResult:
+    # Chunk arrays for a rectangular area, living in one shared-memory block.
+    def __init__(self, keys, blocks_shm, heights_shm):
+        n, s = len(keys), Settings.CHUNK_SIZE
+        self.keys = keys
+        self.index = {k: i for i, k in enumerate(keys)}
+        self.shm = (blocks_shm, heights_shm)
+        self.blocks = np.ndarray((n,) + chunk_shape(), dtype=np.uint8, buffer=blocks_shm.buf)
+        self.heights = np.ndarray((n, s, s), dtype=np.int16, buffer=heights_shm.buf)
+        self.meshes = {}
+        self.spills = {}  # blocks that fell outside the area, {target: {source: blocks}}
+
+    def chunk(self, key):
+        return Chunk(*key, blocks=self.blocks[self.index[key]])
+
+    def install(self, world):
+        # Copy the chunks out of shared memory into a WorldManager.
+        for key in self.keys:
+            world.chunks[key] = Chunk(*key, blocks=self.blocks[self.index[key]].copy())
+            world.settle(key)
+        for target, sources in self.spills.items():
+            world.spills.setdefault(target, {}).update(sources)
+            for source, blocks in sources.items():
+                world.chunks[source].spills_out[target] = blocks
+        for key in self.meshes:
+            world.lods[key] = 0
+        if world.renderer is not None:
+            for key, mesh in self.meshes.items():
+                world.renderer.show(key, mesh)
+
+    def close(self):
+        self.blocks = self.heights = None
+        for shm in self.shm:
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GenerationPipeline:
+    # Pre-generates a rectangle of chunks on a process pool. Each chunk goes
+    # through terrain -> decorate -> mesh; a stage is only submitted once the
+    # chunks it depends on are far enough along:
+    #   decorate(c) needs terrain(c)
+    #   spills into c are applied once decorate(c) is done (own trees first)
+    #   mesh(c) needs decorate on the 5x5 around c, so c and the border
+    #   cells it reads from its neighbours have received every spill.
+    # Block arrays live in shared memory that every worker maps; only chunk
+    # keys, tree spill lists and shared-memory names cross process borders.
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+
+    def run(self, cx0, cz0, width, depth, mesh=True):
+        keys = [(cx, cz) for cx in range(cx0, cx0 + width) for cz in range(cz0, cz0 + depth)]
+        s = Settings.CHUNK_SIZE
+        blocks_shm = shared_memory.SharedMemory(create=True, size=len(keys) * int(np.prod(chunk_shape())))
+        heights_shm = shared_memory.SharedMemory(create=True, size=len(keys) * s * s * 2)
+        result = PregenResult(keys, blocks_shm, heights_shm)
+        result.blocks[:] = BlockID.AIR
+        try:
+            self.schedule(result, mesh)
+        except BaseException:
+            result.close()
+            raise
+        return result
+
+    def schedule(self, result, mesh):
+        done = queue.Queue()
+        decorated, mesh_submitted, waiting = set(), set(), {}
+        pending = 0
+        initargs = (settings_snapshot(), result.keys, result.shm[0].name, result.shm[1].name)
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=initargs) as pool:
+            def submit(fn, key):
+                nonlocal pending
+                pending += 1
+                pool.submit(fn, key).add_done_callback(done.put)
+
+            for key in result.keys:
+                submit(_terrain_stage, key)
+
+            while pending:
+                stage, key, payload = done.get().result()
+                pending -= 1
+                if stage == 'terrain':
+                    submit(_decorate_stage, key)
+                elif stage == 'decorate':
+                    decorated.add(key)
+                    for target, blocks in payload.items():
+                        if target not in result.index:
+                            result.spills.setdefault(target, {})[key] = blocks
+                        elif target in decorated:
+                            result.chunk(target).merge(blocks)
+                        else:
+                            waiting.setdefault(target, []).extend(blocks)
+                    result.chunk(key).merge(waiting.pop(key, ()))
+                    if mesh:
+                        for c in neighbourhood(key, 2):
+                            if (c in result.index and c not in mesh_submitted and
+                                    all(n in decorated for n in neighbourhood(c, 2) if n in result.index)):
+                                mesh_submitted.add(c)
+                                submit(_mesh_stage, c)
+                elif payload is not None:
+                    result.meshes[key] = _read_mesh(*payload)
+                else:
+                    result.meshes[key] = MeshData.empty()
+
@@ -0,0 +1,113 @@
+import csv, gc, os, sys, time
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SECTIONS = ('input', 'physics', 'generation', 'ticks', 'upload', 'render')
+
+
+def rss_mb():
+    # Current resident set size where the OS exposes it, else the peak.
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1 << 20)
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+class FrameProfiler:
+    # Per-frame timings split by subsystem, with no ursina dependency. Code
+    # wraps its work in section(name); end_frame() closes the frame, and
+    # whatever frame time no section claimed is booked as 'render' (the
+    # engine's draw and bookkeeping between our callbacks).
+    def __init__(self, window=600):
+        self.frames = deque(maxlen=window)
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+        self.last = None
+        self.gc_count = 0
+        self.gc_ms = 0.0
+        self.gc_start = None
+        self.csv_file = None
+        self.csv_writer = None
+        gc.callbacks.append(self.on_gc)
+
+    @contextmanager
+    def section(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] += time.perf_counter() - start
+
+    def on_gc(self, phase, info):
+        if phase == 'start':
+            self.gc_start = time.perf_counter()
+        elif self.gc_start is not None:
+            self.gc_count += 1
+            self.gc_ms += (time.perf_counter() - self.gc_start) * 1000
+            self.gc_start = None
+
+    def end_frame(self, **counts):
+        # counts: live numbers to log with the frame, e.g. chunks=, entities=.
+        now = time.perf_counter()
+        if self.last is None:
+            self.last = now
+            self.current = dict.fromkeys(SECTIONS, 0.0)
+            return None
+        frame = now - self.last
+        self.last = now
+        row = {name: self.current[name] * 1000 for name in SECTIONS}
+        row['render'] = max(0.0, frame * 1000 - sum(row.values()))
+        row.update(time=now, frame=frame * 1000, gc_count=self.gc_count, gc_ms=self.gc_ms, **counts)
+        self.frames.append(row)
+        self.current = dict.fromkeys(SECTIONS, 0.0)
+        self.gc_count, self.gc_ms = 0, 0.0
+        if self.csv_writer is not None:
+            self.csv_writer.writerow(row)
+        return row
+
+    def percentiles(self, qs=(50, 95, 99)):
+        if not self.frames:
+            return dict.fromkeys(qs, 0.0)
+        values = np.percentile([f['frame'] for f in self.frames], qs)
+        return dict(zip(qs, values.tolist()))
+
+    def averages(self):
+        if not self.frames:
+            return dict.fromkeys(SECTIONS, 0.0)
+        return {name: sum(f[name] for f in self.frames) / len(self.frames) for name in SECTIONS}
+
+    def gc_pauses(self):
+        return sum(f['gc_count'] for f in self.frames), max((f['gc_ms'] for f in self.frames), default=0.0)
+
+    def start_csv(self, path, counts=()):
+        # Every frame from now on is appended to path until stop_csv().
+        self.stop_csv()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.csv_file = open(path, 'w', newline='')
+        fields = ['time', 'frame', *SECTIONS, 'gc_count', 'gc_ms', *counts]
+        self.csv_writer = csv.DictWriter(self.csv_file, fields, extrasaction='ignore')
+        self.csv_writer.writeheader()
+
+    def stop_csv(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+        self.csv_file = self.csv_writer = None
+
+    @property
+    def recording(self):
+        return self.csv_writer is not None
+
+    def close(self):
+        self.stop_csv()
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
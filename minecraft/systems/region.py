@@ -0,0 +1,175 @@
+import json, mmap, os, struct, threading, zlib
+from collections import OrderedDict
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.core import palette
+from minecraft.core.chunk import Chunk, chunk_key, chunk_shape
+
+# Region file: REGION_SIZE x REGION_SIZE chunks in one file.
+#
+#   header   b'OTRG', u16 format version, u16 region size
+#   table    one (u32 first sector, u32 sector count, u32 byte length) per
+#            chunk slot, x-major; sector count 0 means "not saved"
+#   payload  4 KiB sectors; each chunk is a zlib stream of
+#              u16 palette size, palette IDs, u8 index bits, packed indices,
+#              u32 spill count, spill entries (i32 x, i16 y, i32 z, u8 id)
+#
+# A rewritten chunk goes back into its old sectors if it still fits, else to
+# the end of the file, so an incremental save only touches dirty chunks.
+MAGIC = b'OTRG'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHH')
+SECTOR = 4096
+SPILL = struct.Struct('<ihiB')
+
+
+def region_key(cx, cz):
+    return (cx // Settings.REGION_SIZE, cz // Settings.REGION_SIZE)
+
+
+def slot(cx, cz):
+    n = Settings.REGION_SIZE
+    return (cx % n) * n + (cz % n)
+
+
+def encode_chunk(chunk):
+    ids, bits, packed = palette.encode(chunk.view())
+    spills = [(pos, block_id) for blocks in chunk.spills_out.values() for pos, block_id in blocks]
+    parts = [struct.pack('<H', len(ids)), ids.tobytes(), struct.pack('<B', bits), packed.tobytes(),
+             struct.pack('<I', len(spills))]
+    parts.extend(SPILL.pack(x, y, z, block_id) for (x, y, z), block_id in spills)
+    return zlib.compress(b''.join(parts))
+
+
+def decode_chunk(cx, cz, payload):
+    raw = zlib.decompress(payload)
+    (n,) = struct.unpack_from('<H', raw, 0)
+    ids = np.frombuffer(raw, dtype=np.uint8, count=n, offset=2)
+    (bits,) = struct.unpack_from('<B', raw, 2 + n)
+    shape = chunk_shape()
+    packed_len = 0 if bits == 0 else -(-int(np.prod(shape)) * bits // 8)
+    packed = np.frombuffer(raw, dtype=np.uint8, count=packed_len, offset=3 + n)
+    chunk = Chunk(cx, cz, blocks=palette.decode(ids, bits, packed, shape).copy())
+    offset = 3 + n + packed_len
+    (count,) = struct.unpack_from('<I', raw, offset)
+    offset += 4
+    for _ in range(count):
+        x, y, z, block_id = SPILL.unpack_from(raw, offset)
+        offset += SPILL.size
+        chunk.spills_out.setdefault(chunk_key(x, z), []).append(((x, y, z), block_id))
+    chunk.from_disk = True
+    chunk.saved_version = chunk.version
+    return chunk
+
+
+class RegionFile:
+    def __init__(self, path):
+        self.path = path
+        n = Settings.REGION_SIZE ** 2
+        self.table = np.zeros((n, 3), dtype=np.uint32)
+        self.header_sectors = -(-(HEADER.size + self.table.nbytes) // SECTOR)
+        self.file = None
+        self.map = None
+        if os.path.exists(path):
+            self.open_map()
+
+    def open_map(self):
+        self.file = open(self.path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION or size != Settings.REGION_SIZE:
+            raise ValueError(f'{self.path}: not a region file this version can read')
+        self.table[:] = np.frombuffer(self.map, dtype='<u4', count=self.table.size,
+                                      offset=HEADER.size).reshape(self.table.shape)
+
+    def close_map(self):
+        if self.map is not None:
+            self.map.close()
+            self.file.close()
+        self.map = self.file = None
+
+    def read(self, index):
+        first, count, length = (int(v) for v in self.table[index])
+        if not count:
+            return None
+        start = first * SECTOR
+        return self.map[start:start + length]
+
+    def write(self, payloads):
+        # payloads: {slot: bytes}. The map is dropped while writing because
+        # Windows cannot grow a file that is still mapped.
+        self.close_map()
+        exists = os.path.exists(self.path)
+        with open(self.path, 'r+b' if exists else 'w+b') as f:
+            if not exists:
+                f.write(HEADER.pack(MAGIC, FORMAT_VERSION, Settings.REGION_SIZE))
+                f.write(b'\0' * (self.header_sectors * SECTOR - HEADER.size))
+            end = max(self.header_sectors, int((self.table[:, 0] + self.table[:, 1]).max()))
+            for index, data in payloads.items():
+                sectors = -(-len(data) // SECTOR)
+                first, count, _ = (int(v) for v in self.table[index])
+                if sectors > count:
+                    # Outgrew its sectors: move to the end. The old ones stay
+                    # unused until the region is rewritten from scratch.
+                    first, count, end = end, sectors, end + sectors
+                f.seek(first * SECTOR)
+                f.write(data + b'\0' * (sectors * SECTOR - len(data)))
+                self.table[index] = (first, count, len(data))
+            f.seek(HEADER.size)
+            f.write(self.table.astype('<u4').tobytes())
+        self.open_map()
+
+
+class RegionStore:
+    # Saved world on disk: one directory with world.json (seed) and region
+    # files. Region files are memory-mapped on first use and only the
+    # requested chunk's bytes are decompressed.
+    def __init__(self, path, max_open=16):
+        self.path = path
+        self.max_open = max_open
+        self.regions = OrderedDict()
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        meta = os.path.join(path, 'world.json')
+        if os.path.exists(meta):
+            with open(meta) as f:
+                self.seed = json.load(f)['seed']
+        else:
+            self.seed = Settings.SEED
+            with open(meta, 'w') as f:
+                json.dump({'seed': self.seed}, f)
+
+    def region(self, rkey):
+        region = self.regions.get(rkey)
+        if region is None:
+            region = RegionFile(os.path.join(self.path, f'r.{rkey[0]}.{rkey[1]}.otr'))
+            self.regions[rkey] = region
+            if len(self.regions) > self.max_open:
+                self.regions.popitem(last=False)[1].close_map()
+        self.regions.move_to_end(rkey)
+        return region
+
+    def load(self, cx, cz):
+        # Returns a Chunk, or None if it was never saved. Safe from worker threads.
+        with self.lock:
+            payload = self.region(region_key(cx, cz)).read(slot(cx, cz))
+        return None if payload is None else decode_chunk(cx, cz, payload)
+
+    def save(self, chunks):
+        # Writes the chunks that changed since they were last saved or loaded.
+        by_region = {}
+        for chunk in chunks:
+            if chunk.saved_version != chunk.version:
+                by_region.setdefault(region_key(chunk.cx, chunk.cz), []).append(chunk)
+        with self.lock:
+            for rkey, dirty in by_region.items():
+                self.region(rkey).write({slot(c.cx, c.cz): encode_chunk(c) for c in dirty})
+                for c in dirty:
+                    c.saved_version = c.version
+        return sum(len(d) for d in by_region.values())
+
+    def close(self):
+        with self.lock:
+            for region in self.regions.values():
+                region.close_map()
+            self.regions.clear()
@@ -0,0 +1,99 @@
+import gzip, hashlib, json, math, time
+from contextlib import nullcontext
+from minecraft.config.settings import Settings
+from minecraft.core.chunk import chunk_key, world_to_block
+from minecraft.core.controls import InputFrame, PlayerSim
+from minecraft.systems.streaming import ChunkStreamer
+from minecraft.systems.world import WorldManager
+
+FORMAT_VERSION = 1
+
+
+class Recording:
+    # A fixed seed, a spawn point and one InputFrame per frame. Stored as
+    # gzipped JSON; floats round-trip exactly, so a replay sees the same numbers.
+    def __init__(self, seed, position, frames=None):
+        self.seed = seed
+        self.position = tuple(position)
+        self.frames = frames if frames is not None else []
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    @property
+    def duration(self):
+        return sum(f.dt for f in self.frames)
+
+    def save(self, path):
+        data = {'version': FORMAT_VERSION, 'seed': self.seed, 'position': self.position,
+                'frames': [f.to_list() for f in self.frames]}
+        with gzip.open(path, 'wt') as f:
+            json.dump(data, f, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, 'rt') as f:
+            data = json.load(f)
+        if data['version'] != FORMAT_VERSION:
+            raise ValueError(f'{path}: recording format {data["version"]} is not supported')
+        return cls(data['seed'], data['position'], [InputFrame.from_list(r) for r in data['frames']])
+
+
+class Recorder:
+    def __init__(self, seed, position):
+        self.recording = Recording(seed, position)
+
+    def add(self, frame):
+        self.recording.frames.append(frame)
+
+
+def fingerprint(world, sim):
+    # Player position plus the blocks of the 3x3 chunks around it: equal
+    # fingerprints mean two runs ended up in the same state.
+    x, _, z = world_to_block(sim.body.position)
+    cx, cz = chunk_key(x, z)
+    digest = hashlib.sha1(repr(tuple(round(p, 9) for p in sim.body.position)).encode())
+    for key in sorted((cx+dx, cz+dz) for dx in (-1, 0, 1) for dz in (-1, 0, 1)):
+        digest.update(world.chunks[key].view().tobytes())
+    return digest.hexdigest()
+
+
+def replay(recording, realtime=False, profiler=None, render_distance=None, workers=None):
+    # Headless replay: the same per-frame order as MinecraftGame (player,
+    # then streaming, block ticks and remeshing), so it lands where the recorded session
+    # did. realtime paces frames by their recorded dt; otherwise frames run
+    # back to back. Returns (world, sim).
+    Settings.SEED = recording.seed
+    world = WorldManager()
+    streamer = ChunkStreamer(world, render_distance, workers)
+    sim = PlayerSim(world, recording.position, profiler)
+    section = profiler.section if profiler else lambda name: nullcontext()
+    try:
+        streamer.preload((0, 0, 0))
+        start = time.perf_counter()
+        clock = 0.0
+        for frame in recording:
+            sim.apply(frame)
+            with section('generation'):
+                streamer.schedule(sim.body.position)
+                streamer.ensure(sim.body.position)
+            with section('upload'):
+                streamer.upload()
+            with section('ticks'):
+                # No time budget: a replay must run the same block updates
+                # on every machine.
+                world.ticks.update(frame.dt, budget_ms=math.inf)
+            with section('upload'):
+                world.flush_remesh()
+            if profiler:
+                profiler.end_frame(chunks=len(world.chunks), meshed=len(streamer.meshed),
+                                   dirty=len(world.dirty), ticks_queued=len(world.ticks.queue))
+            if realtime:
+                clock += frame.dt
+                time.sleep(max(0.0, start + clock - time.perf_counter()))
+    finally:
+        streamer.shutdown()
+    return world, sim
@@ -0,0 +1,262 @@
+import heapq, math, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from minecraft.config.settings import Settings
+from minecraft.core.chunk import chunk_key, world_to_block
+from minecraft.core.lighting import flood_chunk
+from minecraft.core.mesher import build_chunk_mesh
+
+SIDES = ((1,0), (-1,0), (0,1), (0,-1))
+
+
+class ChunkStreamer:
+    # Keeps the chunks within RENDER_DISTANCE of the player generated and
+    # meshed. Generation and meshing run on a thread pool, nearest chunk
+    # first; the main thread only merges results into the world and uploads
+    # at most UPLOAD_BUDGET_MS worth of meshes per frame.
+    #
+    # Chunks are generated one ring further out than they are meshed, so a
+    # chunk is only meshed once all four side neighbours exist and its border
+    # faces are final.
+    #
+    # Chunks past Settings.LOD_DISTANCES get downsampled meshes; a chunk only
+    # changes level once it is LOD_HYSTERESIS chunks past the edge, so walking
+    # back and forth over an edge does not remesh it every time.
+    #
+    # With lighting on, a chunk is meshed once it and its sides are lit. Their
+    # floods run on the pool too, from a snapshot; two light jobs never
+    # overlap, i.e. read or write each other's chunk or sides, so a result is
+    # only thrown away (and redone) when a block edit got in between. A lit
+    # neighbour that should take light from a newly lit chunk is flooded
+    # again rather than brightened cell by cell on the main thread.
+    def __init__(self, world, render_distance=None, workers=None):
+        self.world = world
+        self.render_distance = render_distance or Settings.RENDER_DISTANCE
+        self.workers = workers or Settings.STREAM_WORKERS
+        self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        self.center = None
+        self.queue = []          # heap of (distance², key) still to generate
+        self.generating = {}     # key -> future
+        self.meshing = {}        # key -> (future, chunk version at submit, lod)
+        self.lighting = {}       # key -> (future, light_state at submit)
+        self.needs_mesh = set()
+        self.meshed = set()
+        self.ready = deque()     # (key, mesh, chunk version, lod) waiting for upload
+
+    def distance2(self, key):
+        return (key[0] - self.center[0])**2 + (key[1] - self.center[1])**2
+
+    def lod_for(self, key):
+        d = math.sqrt(self.distance2(key))
+        current = self.world.lods.get(key)
+        level = 0
+        for i, edge in enumerate(Settings.LOD_DISTANCES):
+            # Edges below the current level move in, edges above it move out;
+            # a chunk meshed for the first time takes the plain edges.
+            margin = 0 if current is None else Settings.LOD_HYSTERESIS * (-1 if i < current else 1)
+            if d > edge + margin:
+                level = i + 1
+        return level
+
+    def in_ring(self, key, extra=0):
+        return self.distance2(key) <= (self.render_distance + extra)**2
+
+    def ring(self, extra=0):
+        r = self.render_distance + extra
+        cx, cz = self.center
+        keys = [(cx+dx, cz+dz) for dx in range(-r, r+1) for dz in range(-r, r+1)]
+        return [k for k in keys if self.in_ring(k, extra)]
+
+    def update(self, position):
+        self.schedule(position)
+        return self.upload()
+
+    def schedule(self, position):
+        # Everything in update() except the uploads, for callers that time the two apart.
+        x, _, z = world_to_block(position)
+        center = chunk_key(x, z)
+        if center != self.center:
+            self.recenter(center)
+        self.collect()
+        self.submit()
+
+    def recenter(self, center):
+        self.center = center
+        # One ring of slack before unloading so walking along a border does
+        # not thrash chunks in and out.
+        leaving = [k for k in self.world.chunks if not self.in_ring(k, 2)]
+        self.world.save(leaving)
+        for key in leaving:
+            self.world.unload_chunk(key)
+            self.needs_mesh.discard(key)
+            self.meshed.discard(key)
+        for key in [k for k in self.generating if not self.in_ring(k, 2)]:
+            self.generating.pop(key).cancel()
+        self.queue = [(self.distance2(k), k) for k in self.ring(1)
+                      if k not in self.world.chunks and k not in self.generating]
+        heapq.heapify(self.queue)
+        self.needs_mesh = {k for k in self.needs_mesh if self.in_ring(k, 2)}
+        self.needs_mesh.update(k for k in self.ring() if k in self.world.chunks and k not in self.meshed)
+        self.needs_mesh.update(k for k in self.meshed if self.lod_for(k) != self.world.lods.get(k, 0))
+
+    def collect(self):
+        for key, future in list(self.generating.items()):
+            if not future.done():
+                continue
+            del self.generating[key]
+            if future.cancelled() or not self.in_ring(key, 2):
+                continue
+            self.install(key, future.result())
+
+        for key, (future, version, lod) in list(self.meshing.items()):
+            if not future.done():
+                continue
+            del self.meshing[key]
+            chunk = self.world.chunks.get(key)
+            if chunk is None:
+                continue
+            if chunk.version != version:
+                self.needs_mesh.add(key)
+                continue
+            self.ready.append((key, future.result(), version, lod))
+
+        light = self.world.light
+        for key, (future, state) in list(self.lighting.items()):
+            if not future.done():
+                continue
+            del self.lighting[key]
+            if key not in self.world.chunks or light.is_lit(key) or state != self.light_state(key):
+                continue
+            # Light that should flow on into lit neighbours is not spread
+            # here, breadth first: they are flooded again on the pool.
+            for side, _, _ in light.store(key, *future.result()):
+                light.invalidate(side)
+            cx, cz = key
+            around = [key] + [(cx+dx, cz+dz) for dx, dz in SIDES]
+            self.needs_mesh.update(k for k in around if k in self.world.chunks)
+
+    def light_state(self, key):
+        # Everything a light job's snapshot depends on.
+        cx, cz = key
+        around = [key] + [(cx+dx, cz+dz) for dx, dz in SIDES]
+        chunks, light = self.world.chunks, self.world.light
+        return ([chunks[k].version if k in chunks else None for k in around],
+                [light.is_lit(k) and light.versions.get(k) for k in around])
+
+    def lit(self, key):
+        # Whether key and its sides have light; starts light jobs for those
+        # that do not, as far as overlap and the backlog allow.
+        light = self.world.light
+        cx, cz = key
+        missing = [k for k in [key] + [(cx+dx, cz+dz) for dx, dz in SIDES]
+                   if k in self.world.chunks and not light.is_lit(k)]
+        for k in missing:
+            if (k not in self.lighting and len(self.lighting) < self.workers * 2 and
+                    all(abs(k[0] - j[0]) + abs(k[1] - j[1]) > 2 for j in self.lighting)):
+                self.lighting[k] = (self.pool.submit(flood_chunk, *light.snapshot(k)), self.light_state(k))
+        return not missing
+
+    def install(self, key, result):
+        touched = self.world.add_chunk(*result)
+        self.needs_mesh.add(key)
+        self.needs_mesh.update({(key[0]+dx, key[1]+dz) for dx, dz in SIDES} - self.meshed)
+        self.needs_mesh.update(touched & self.meshed)
+
+    def ensure(self, position, radius=1):
+        # Blocks until the chunks around position are in the world, waiting on
+        # (or doing) their generation. Replays use this so the player never
+        # stalls on a chunk that happens to stream in late.
+        x, _, z = world_to_block(position)
+        cx, cz = chunk_key(x, z)
+        for key in [(cx+dx, cz+dz) for dx in range(-radius, radius+1) for dz in range(-radius, radius+1)]:
+            if key in self.world.chunks:
+                continue
+            future = self.generating.pop(key, None)
+            if future is not None and not future.cancelled():
+                self.install(key, future.result())
+            else:
+                self.install(key, self.world.load_chunk(*key))
+
+    def meshable(self, key):
+        cx, cz = key
+        return (key in self.world.chunks and key not in self.meshing and self.in_ring(key)
+                and all((cx+dx, cz+dz) in self.world.chunks for dx, dz in SIDES))
+
+    def submit(self):
+        # Keep a short backlog per worker so re-prioritising after the player
+        # moves takes effect quickly.
+        limit = self.workers * 2
+        for key in sorted((k for k in self.needs_mesh if self.meshable(k)), key=self.distance2):
+            if len(self.meshing) >= limit:
+                break
+            lod = self.lod_for(key)
+            if lod == 0 and self.world.light is not None and not self.lit(key):
+                continue
+            self.needs_mesh.discard(key)
+            padded, scale, light = self.world.mesh_input(key, lod)
+            job = self.pool.submit(build_chunk_mesh, padded, self.world.colors, None, scale, light)
+            self.meshing[key] = (job, self.world.chunks[key].version, lod)
+
+        while self.queue and len(self.generating) < limit:
+            _, key = heapq.heappop(self.queue)
+            if key not in self.world.chunks and key not in self.generating:
+                self.generating[key] = self.pool.submit(self.world.load_chunk, *key)
+
+    def upload(self):
+        budget = Settings.UPLOAD_BUDGET_MS / 1000
+        start = time.perf_counter()
+        uploaded = 0
+        while self.ready and (uploaded == 0 or time.perf_counter() - start < budget):
+            key, mesh, version, lod = self.ready.popleft()
+            chunk = self.world.chunks.get(key)
+            if chunk is None:
+                continue
+            if chunk.version != version:
+                # Edited while waiting; a newer mesh must not be overwritten.
+                self.needs_mesh.add(key)
+                continue
+            self.world.lods[key] = lod
+            if self.world.renderer is not None:
+                self.world.renderer.show(key, mesh)
+            self.world.settle(key)
+            self.meshed.add(key)
+            uploaded += 1
+        return uploaded
+
+    def preload(self, position, radius=1):
+        # Synchronous load of the chunks right around the spawn point, so the
+        # player has ground under them on the first frame.
+        x, _, z = world_to_block(position)
+        self.recenter(chunk_key(x, z))
+        cx, cz = self.center
+        keys = [(cx+dx, cz+dz) for dx in range(-radius-1, radius+2) for dz in range(-radius-1, radius+2)]
+        for key in keys:
+            if key not in self.world.chunks:
+                self.world.add_chunk(*self.world.load_chunk(*key))
+        for dx in range(-radius, radius+1):
+            for dz in range(-radius, radius+1):
+                key = (cx+dx, cz+dz)
+                self.world.remesh_chunk(key)
+                self.meshed.add(key)
+        self.needs_mesh -= self.meshed
+        self.queue = [(d, k) for d, k in self.queue if k not in self.world.chunks]
+        heapq.heapify(self.queue)
+
+    def idle(self):
+        return not (self.queue or self.generating or self.meshing or self.lighting or self.ready or
+                    any(self.meshable(k) for k in self.needs_mesh))
+
+    def stats(self):
+        return {
+            'loaded': len(self.world.chunks),
+            'meshed': len(self.meshed),
+            'queued': len(self.queue),
+            'generating': len(self.generating),
+            'meshing': len(self.meshing),
+            'lighting': len(self.lighting),
+            'ready': len(self.ready),
+            'dirty': len(self.world.dirty),
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
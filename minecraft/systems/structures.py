@@ -0,0 +1,84 @@
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID
+from minecraft.core.chunk import RANKS
+
+
+class Template:
+    # A structure precompiled to a small block array indexed [x, y, z]. origin
+    # is the cell that lands on the position it is stamped at; air cells are
+    # not written (their rank is 0). The non-air cells are also kept as a
+    # list, for the part of a structure that overhangs into the next chunk.
+    def __init__(self, name, blocks, origin):
+        self.name = name
+        self.blocks = blocks
+        self.origin = origin
+        self.ranks = RANKS[blocks]
+        mask = blocks != BlockID.AIR
+        self.cells = list(zip(map(tuple, (np.argwhere(mask) - origin).tolist()), blocks[mask].tolist()))
+
+
+def tree(trunk):
+    # A trunk with two 3x3 layers of leaves around its top.
+    blocks = np.zeros((3, trunk, 3), dtype=np.uint8)
+    blocks[:, trunk-2:, :] = BlockID.LEAVES
+    blocks[1, :, 1] = BlockID.WOOD
+    return Template(f'tree{trunk}', blocks, (1, 0, 1))
+
+
+def boulder(width, height):
+    # A rough ellipsoid of stone, sunk one block into the ground.
+    x, y, z = np.meshgrid(*(np.arange(n) - (n - 1) / 2 for n in (width, height, width)), indexing='ij')
+    inside = (x / (width / 2))**2 + (y / (height / 2))**2 + (z / (width / 2))**2 <= 1.0
+    blocks = np.where(inside, BlockID.STONE, BlockID.AIR).astype(np.uint8)
+    return Template(f'boulder{width}x{height}', blocks, (width // 2, 1, width // 2))
+
+
+def house():
+    # Wooden walls with a doorway on the -z side, a stone roof and a lamp
+    # hanging inside. The floor is whatever the ground is.
+    blocks = np.zeros((5, 4, 5), dtype=np.uint8)
+    blocks[:, :3, :] = BlockID.WOOD
+    blocks[1:4, :3, 1:4] = BlockID.AIR
+    blocks[2, :2, 0] = BlockID.AIR
+    blocks[:, 3, :] = BlockID.STONE
+    blocks[2, 2, 2] = BlockID.LAMP
+    return Template('house', blocks, (2, 0, 2))
+
+
+# Variants of each structure kind; decoration picks one with
+# rng.randrange(len(...)). Tree variants are trunk heights 4-6, in the order
+# the old rng.randint(4, 6) call drew them.
+TEMPLATES = {
+    'tree': [tree(h) for h in (4, 5, 6)],
+    'boulder': [boulder(2, 2), boulder(3, 3), boulder(4, 3)],
+    'house': [house()],
+}
+
+
+def stamp(chunk, template, pos, spills):
+    # Writes the part of template (origin at world pos) that falls inside
+    # chunk in one slice assignment, where its blocks outrank what is there
+    # (see SPILL_RANK). The cells that land in other chunks are appended to
+    # spills {chunk key: [(pos, id)]}, for add_chunk to merge over there.
+    s = Settings.CHUNK_SIZE
+    x, y, z = pos
+    ox, oy, oz = template.origin
+    sx, sy, sz = template.blocks.shape
+    # The template's box and the chunk's, in chunk-local cells.
+    x0, y0, z0 = x - ox - chunk.cx * s, y - oy - Settings.MIN_Y, z - oz - chunk.cz * s
+    lx, ly, lz = max(x0, 0), max(y0, 0), max(z0, 0)
+    hx, hy, hz = min(x0 + sx, s), min(y0 + sy, Settings.CHUNK_HEIGHT), min(z0 + sz, s)
+    if lx < hx and ly < hy and lz < hz:
+        index = (slice(lx, hx), slice(ly, hy), slice(lz, hz))
+        part = (slice(lx - x0, hx - x0), slice(ly - y0, hy - y0), slice(lz - z0, hz - z0))
+        current = chunk.blocks[index]
+        wins = template.ranks[part] > RANKS[current]
+        chunk.assign(index, np.where(wins, template.blocks[part], current))
+    if x0 >= 0 and z0 >= 0 and x0 + sx <= s and z0 + sz <= s:
+        return
+    home = chunk.key
+    for (dx, dy, dz), block_id in template.cells:
+        key = ((x + dx) // s, (z + dz) // s)
+        if key != home:
+            spills.setdefault(key, []).append(((x + dx, y + dy, z + dz), block_id))
@@ -0,0 +1,139 @@
+import math, random
+import numpy as np
+from minecraft.config.settings import Settings
+
+
+class TerrainNoise:
+    # Batched re-implementation of perlin_noise.PerlinNoise for 2D grids. It
+    # follows the library step for step (lattice hash, seeded gradients, fade,
+    # summation order) so heights match WorldManager.get_height bit for bit.
+    def __init__(self, seed, octaves=None):
+        self.seed = seed
+        self.octaves = Settings.TERRAIN_OCTAVES if octaves is None else octaves
+        self.gradients = {}
+
+    def gradient(self, h):
+        vec = self.gradients.get(h)
+        if vec is None:
+            rng = random.Random(self.seed * h)
+            vec = self.gradients[h] = (rng.uniform(-1, 1), rng.uniform(-1, 1))
+        return vec
+
+    def corner_gradients(self, cx, cz):
+        hashes = np.maximum(1, np.abs(cx + 10*cz + 1))
+        uniq, inverse = np.unique(hashes, return_inverse=True)
+        table = np.array([self.gradient(int(h)) for h in uniq]).reshape(-1, 2)
+        return table[inverse.reshape(hashes.shape), 0], table[inverse.reshape(hashes.shape), 1]
+
+    @staticmethod
+    def fade(t):
+        # math.pow, not np.power: the two disagree in the last ulp. Grid
+        # inputs only hold a handful of distinct offsets, so this stays cheap.
+        uniq, inverse = np.unique(t, return_inverse=True)
+        table = np.array([6*math.pow(v, 5) - 15*math.pow(v, 4) + 10*math.pow(v, 3) for v in uniq.tolist()])
+        return table[inverse.reshape(t.shape)]
+
+    def __call__(self, xs, zs):
+        xs = np.asarray(xs, dtype=np.float64) * self.octaves
+        zs = np.asarray(zs, dtype=np.float64) * self.octaves
+        x0, z0 = np.floor(xs).astype(np.int64), np.floor(zs).astype(np.int64)
+        total = np.zeros(xs.shape)
+        for cx in (x0, x0 + 1):
+            for cz in (z0, z0 + 1):
+                gx, gz = self.corner_gradients(cx, cz)
+                dx, dz = xs - cx, zs - cz
+                weight = self.fade(1 - np.abs(dx)) * self.fade(1 - np.abs(dz))
+                total = total + weight * (0 + gx*dx + gz*dz)
+        return total
+
+    def heights(self, xs, zs, amplitude=None):
+        # amplitude: per-column height scale (see WorldManager.heights), else
+        # TERRAIN_AMPLITUDE everywhere.
+        v = self(np.asarray(xs) * Settings.TERRAIN_SCALE, np.asarray(zs) * Settings.TERRAIN_SCALE)
+        return np.floor(v * (Settings.TERRAIN_AMPLITUDE if amplitude is None else amplitude)).astype(np.int64)
+
+
+def chunk_columns(cx, cz):
+    # World x/z grids for a chunk, indexed [local x, local z] like Chunk.blocks.
+    s = Settings.CHUNK_SIZE
+    return np.meshgrid(np.arange(cx*s, cx*s + s), np.arange(cz*s, cz*s + s), indexing='ij')
+
+
+# Edge midpoints of a cube, Perlin's improved-noise gradient set.
+CAVE_GRADIENTS = np.array([(1,1,0), (-1,1,0), (1,-1,0), (-1,-1,0), (1,0,1), (-1,0,1),
+                           (1,0,-1), (-1,0,-1), (0,1,1), (0,-1,1), (0,1,-1), (0,-1,-1)], dtype=np.float64)
+# Caves are wider than they are tall: y runs at twice the horizontal frequency.
+CAVE_SQUASH = 2.0
+
+
+class CaveNoise:
+    # 3D gradient noise (Perlin's improved noise) for carving caves. chunk()
+    # evaluates a whole chunk volume in one go: the lattice lookups are done
+    # per axis and broadcast, so the cost is a few array passes over the
+    # volume. point() is the same noise one block at a time.
+    def __init__(self, seed):
+        perm = list(range(256))
+        random.Random(f'{seed}:caves').shuffle(perm)
+        self.perm = np.array(perm * 2, dtype=np.int64)
+        self.table = perm * 2
+        # Gradient components by hash value, so a corner costs three takes.
+        self.gx, self.gy, self.gz = CAVE_GRADIENTS[np.arange(256) % 12].T.copy()
+
+    @staticmethod
+    def lattice(v):
+        # Integer cell (mod 256), offset inside it and its fade curve.
+        v0 = np.floor(v)
+        t = v - v0
+        return v0.astype(np.int64) & 255, t, t * t * t * (t * (t * 6 - 15) + 10)
+
+    def __call__(self, xs, ys, zs):
+        # xs, ys, zs broadcast against each other, e.g. shapes (n,1,1),
+        # (1,m,1) and (1,1,k) for a grid. Returns values in about [-1, 1].
+        (xi, xt, u), (yi, yt, v), (zi, zt, w) = (self.lattice(np.asarray(a, dtype=np.float64)) for a in (xs, ys, zs))
+        p = self.perm
+        corners = {}
+        for dx in (0, 1):
+            a = p[xi + dx]
+            for dy in (0, 1):
+                b = p[a + yi + dy]
+                for dz in (0, 1):
+                    h = p[b + zi + dz]
+                    corners[dx, dy, dz] = self.gx[h]*(xt - dx) + self.gy[h]*(yt - dy) + self.gz[h]*(zt - dz)
+        x00 = corners[0, 0, 0] + u * (corners[1, 0, 0] - corners[0, 0, 0])
+        x10 = corners[0, 1, 0] + u * (corners[1, 1, 0] - corners[0, 1, 0])
+        x01 = corners[0, 0, 1] + u * (corners[1, 0, 1] - corners[0, 0, 1])
+        x11 = corners[0, 1, 1] + u * (corners[1, 1, 1] - corners[0, 1, 1])
+        y0 = x00 + v * (x10 - x00)
+        y1 = x01 + v * (x11 - x01)
+        return y0 + w * (y1 - y0)
+
+    def point(self, x, y, z):
+        # Noise at one world block in plain Python: the scalar twin of
+        # chunk(), same operations in the same order, so the two agree exactly.
+        f = Settings.CAVE_SCALE
+        p, cells, out = self.table, [], []
+        for c in (x * f, y * (f * CAVE_SQUASH), z * f):
+            c0 = math.floor(c)
+            t = c - c0
+            cells.append((c0 & 255, t, t * t * t * (t * (t * 6 - 15) + 10)))
+        (xi, xt, u), (yi, yt, v), (zi, zt, w) = cells
+        for dx, dy, dz in ((0,0,0), (1,0,0), (0,1,0), (1,1,0), (0,0,1), (1,0,1), (0,1,1), (1,1,1)):
+            gx, gy, gz = CAVE_GRADIENTS[p[p[p[xi + dx] + yi + dy] + zi + dz] % 12].tolist()
+            out.append(gx*(xt - dx) + gy*(yt - dy) + gz*(zt - dz))
+        c000, c100, c010, c110, c001, c101, c011, c111 = out
+        x00 = c000 + u * (c100 - c000)
+        x10 = c010 + u * (c110 - c010)
+        x01 = c001 + u * (c101 - c001)
+        x11 = c011 + u * (c111 - c011)
+        y0 = x00 + v * (x10 - x00)
+        y1 = x01 + v * (x11 - x01)
+        return y0 + w * (y1 - y0)
+
+    def chunk(self, cx, cz, rows=None):
+        # Noise over a chunk volume, indexed [local x, row, local z] like
+        # Chunk.blocks; rows (a slice of rows) limits the y span evaluated.
+        s = Settings.CHUNK_SIZE
+        ys = Settings.MIN_Y + np.arange(Settings.CHUNK_HEIGHT)[rows if rows is not None else slice(None)]
+        f = Settings.CAVE_SCALE
+        return self((cx*s + np.arange(s))[:, None, None] * f, ys[None, :, None] * (f * CAVE_SQUASH),
+                    (cz*s + np.arange(s))[None, None, :] * f)
@@ -0,0 +1,213 @@
+import heapq, itertools, time
+import numpy as np
+from minecraft.config.settings import Settings
+from minecraft.config.blocks import BlockID, BlockRegistry, FLUID_LEVELS
+from minecraft.core.chunk import chunk_key, in_height_range
+
+NEIGHBOURS = ((1,0,0), (-1,0,0), (0,1,0), (0,-1,0), (0,0,1), (0,0,-1))
+SIDES = ((1,0,0), (-1,0,0), (0,0,1), (0,0,-1))
+FLOWING = {level: block_id for block_id, level in FLUID_LEVELS.items()}
+MAX_FLOW = max(FLOWING)
+# By block ID, for notify_box: what sand falls into, and water (flowing
+# water in particular) for the cells that water can spread into or drain.
+FALLS_INTO = np.zeros(256, dtype=bool)
+FALLS_INTO[[BlockID.AIR, *FLUID_LEVELS]] = True
+IS_FLUID = np.zeros(256, dtype=bool)
+IS_FLUID[list(FLUID_LEVELS)] = True
+IS_FLOWING = np.zeros(256, dtype=bool)
+IS_FLOWING[[b for b, level in FLUID_LEVELS.items() if level]] = True
+OPENS = IS_FLOWING.copy()
+OPENS[BlockID.AIR] = True
+
+
+class BlockTicker:
+    # Scheduled block updates: falling sand and flowing water. Only blocks
+    # that might change are held, in a heap keyed by the game tick they are
+    # due; a change schedules the changed block and its neighbours, so
+    # nothing ever scans the world.
+    #
+    # Game ticks run at BLOCK_TICK_RATE. Each tick runs at most
+    # BLOCK_UPDATES_PER_TICK updates (the rest wait for the next tick), and
+    # update() stops once BLOCK_TICK_BUDGET_MS is spent, leaving the updates
+    # it did not reach for the next frame. Falling further behind than
+    # MAX_TICK_BACKLOG ticks drops game time rather than piling up work.
+    # Light for the blocks a frame moved is brought up to date in one batch
+    # at the end (see WorldManager.relight_batch).
+    def __init__(self, world):
+        self.world = world
+        self.queue = []          # heap of (due tick, order, position)
+        self.scheduled = set()   # positions in the queue, each queued once
+        self.order = itertools.count()
+        self.tick = 0            # last tick run
+        self.clock = 0.0         # game time in seconds
+        self.processed = 0       # updates run by the last update()
+        self.moved = []          # positions changed this update, for relighting
+
+    def block_at(self, pos):
+        # Integer-only get_block: ticks look up every neighbour of every move.
+        x, y, z = pos
+        if not in_height_range(y):
+            return BlockID.AIR
+        chunk = self.world.chunks.get(chunk_key(x, z))
+        return chunk.get(x, y, z) if chunk else BlockID.AIR
+
+    def schedule(self, pos, delay=None):
+        block_id = self.block_at(pos)
+        if delay is None:
+            delay = int(BlockRegistry.TICK[block_id])
+        if not delay or pos in self.scheduled:
+            return
+        self.scheduled.add(pos)
+        heapq.heappush(self.queue, (self.tick + delay, next(self.order), pos))
+
+    def notify(self, pos):
+        # The block at pos changed: it and its neighbours may now move.
+        x, y, z = pos
+        self.schedule(pos)
+        for dx, dy, dz in NEIGHBOURS:
+            self.schedule((x+dx, y+dy, z+dz))
+
+    def schedule_many(self, positions, delays):
+        # schedule() for a batch, pushed onto the heap in one go.
+        due = [(self.tick + delay, n, pos) for delay, n, pos in zip(delays, self.order, positions)
+               if pos not in self.scheduled]
+        if not due:
+            return
+        self.scheduled.update(pos for _, _, pos in due)
+        # heapify is linear in the whole queue; a few pushes into a long one
+        # are cheaper one at a time.
+        if len(due) * 8 < len(self.queue):
+            for item in due:
+                heapq.heappush(self.queue, item)
+        else:
+            self.queue.extend(due)
+            heapq.heapify(self.queue)
+
+    def notify_box(self, corner, blocks, changed):
+        # notify() for a bulk edit: blocks is the new content of a box whose
+        # low corner is at corner, changed the cells that differ. Blocks that
+        # changed or touch a change inside the box are scheduled, and so are
+        # the ones standing on top of it; water beside the box is not poked.
+        # Only blocks that can move are: sand with air or water under it (or
+        # under the sand it stands on), flowing water (it may drain) and
+        # water with air or flowing water next to it.
+        near = changed.copy()
+        for axis in range(3):
+            lo = [slice(None)] * 3
+            hi = [slice(None)] * 3
+            lo[axis], hi[axis] = slice(None, -1), slice(1, None)
+            near[tuple(lo)] |= changed[tuple(hi)]
+            near[tuple(hi)] |= changed[tuple(lo)]
+        ox, oy, oz = corner
+        sx, sy, sz = blocks.shape
+        sand = blocks == BlockID.SAND
+        fluid = IS_FLUID[blocks]
+        if (near & (sand | fluid)).any():
+            # The box and a one-block border of what is around it.
+            around = self.world.copy_box((ox - 1, oy - 1, oz - 1), (ox + sx, oy + sy, oz + sz))
+            around[1:-1, 1:-1, 1:-1] = blocks
+            # Sand is loose if the first block under its column of sand (the
+            # border row under the box for none) is something it falls into.
+            ground = np.maximum.accumulate(np.where(sand, -1, np.arange(sy)[None, :, None]), axis=1)
+            under = np.take_along_axis(FALLS_INTO[blocks], np.maximum(ground, 0), axis=1)
+            under = np.where(ground < 0, FALLS_INTO[around[1:-1, :1, 1:-1]], under)
+            movable = near & sand & under
+            if fluid.any():
+                opens = OPENS[around]
+                open_ = IS_FLOWING[blocks]
+                for d in NEIGHBOURS:
+                    open_ |= opens[tuple(slice(1 + a, n + 1 + a) for a, n in zip(d, blocks.shape))]
+                movable |= near & fluid & open_
+            self.schedule_many([(ox + i, oy + j, oz + k) for i, j, k in np.argwhere(movable).tolist()],
+                               BlockRegistry.TICK[blocks[movable]].tolist())
+        # On top of the box: sand that can now fall, and any water (on new
+        # ground it spreads instead of falling).
+        top = changed[:, -1, :]
+        if top.any():
+            y = oy + sy
+            above = self.world.copy_box((ox, y, oz), (ox + sx - 1, y, oz + sz - 1))[:, 0, :]
+            falls = FALLS_INTO[blocks[:, -1, :]] | (blocks[:, -1, :] == BlockID.SAND)
+            rest = top & ((above == BlockID.SAND) & falls | IS_FLUID[above])
+            self.schedule_many([(ox + i, y, oz + k) for i, k in np.argwhere(rest).tolist()],
+                               BlockRegistry.TICK[above[rest]].tolist())
+
+    def update(self, dt, budget_ms=None):
+        # Advance game time by dt and run the ticks that became due. Returns
+        # the number of block updates run.
+        budget = (Settings.BLOCK_TICK_BUDGET_MS if budget_ms is None else budget_ms) / 1000
+        start = time.perf_counter()
+        self.clock += dt
+        target = int(self.clock * Settings.BLOCK_TICK_RATE)
+        if target - self.tick > Settings.MAX_TICK_BACKLOG:
+            self.tick = target - Settings.MAX_TICK_BACKLOG
+            self.clock = target / Settings.BLOCK_TICK_RATE
+        self.processed = 0
+        self.moved = []
+        out_of_time = False
+        while self.tick < target and not out_of_time:
+            self.tick += 1
+            for _ in range(Settings.BLOCK_UPDATES_PER_TICK):
+                if not self.queue or self.queue[0][0] > self.tick:
+                    break
+                if time.perf_counter() - start >= budget:
+                    out_of_time = True
+                    break
+                _, _, pos = heapq.heappop(self.queue)
+                self.scheduled.discard(pos)
+                self.run(pos)
+                self.processed += 1
+        self.world.relight_batch(self.moved)
+        return self.processed
+
+    def put(self, pos, block_id):
+        if self.world.put_block(pos, block_id, relight=False):
+            self.moved.append(pos)
+
+    def run(self, pos):
+        block_id = self.block_at(pos)
+        if block_id == BlockID.SAND:
+            self.fall(pos)
+        elif block_id in FLUID_LEVELS:
+            self.flow(pos, FLUID_LEVELS[block_id])
+
+    def fall(self, pos):
+        # Sand drops one block per tick into air or water.
+        x, y, z = pos
+        below = (x, y - 1, z)
+        if not in_height_range(y - 1):
+            return
+        if self.block_at(below) in (BlockID.AIR, *FLUID_LEVELS):
+            self.put(below, BlockID.SAND)
+            self.put(pos, BlockID.AIR)
+
+    def flow(self, pos, level):
+        # Sources (level 0) stay; flowing water needs water above it or a
+        # side neighbour nearer the source, else it drains away. Water over
+        # air falls; water on the ground spreads one level further sideways.
+        x, y, z = pos
+        if level and not self.fed(pos, level):
+            self.put(pos, BlockID.AIR)
+            return
+        below = (x, y - 1, z)
+        under = self.block_at(below) if in_height_range(y - 1) else None
+        if under == BlockID.AIR:
+            self.put(below, FLOWING[1])
+            return
+        if level == MAX_FLOW or under in FLUID_LEVELS and FLUID_LEVELS[under] > 0:
+            return
+        for dx, dy, dz in SIDES:
+            side = (x+dx, y+dy, z+dz)
+            current = self.block_at(side)
+            if current == BlockID.AIR or FLUID_LEVELS.get(current, -1) > level + 1:
+                self.put(side, FLOWING[level + 1])
+
+    def fed(self, pos, level):
+        x, y, z = pos
+        if self.block_at((x, y + 1, z)) in FLUID_LEVELS:
+            return True
+        return any(FLUID_LEVELS.get(self.block_at((x+dx, y, z+dz)), MAX_FLOW + 1) < level
+                   for dx, _, dz in SIDES)
+
+    def stats(self):
+        return {'queued': len(self.queue), 'processed': self.processed,
+                'behind': int(self.clock * Settings.BLOCK_TICK_RATE) - self.tick}
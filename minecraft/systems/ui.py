@@ -1,12 +1,10 @@
 from ursina import *
-from minecraft.config.blocks import BlockRegistry, BlockID
+from minecraft.config.blocks import BlockRegistry, HOTBAR
+from minecraft.systems.profiler import SECTIONS
 
 class UIManager:
     def __init__(self):
-        self.available_blocks = [
-            BlockID.GRASS, BlockID.STONE, BlockID.DIRT,
-            BlockID.WOOD, BlockID.SAND, BlockID.OBSIDIAN
-        ]
+        self.available_blocks = HOTBAR
         self.current_slot = 0
         self.slots = []
         self.setup()
@@ -21,7 +19,7 @@ class UIManager:
                 model='quad',
                 scale=(0.08,0.08),
                 position=(-0.3+i*0.1,-0.45),
-                color=BlockRegistry.get(b)['color']
+                color=BlockRegistry.color(b)
             )
             self.slots.append(slot)
 
@@ -40,3 +38,49 @@ class UIManager:
 
     def get_current_block_id(self):
         return self.available_blocks[self.current_slot]
+
+
+class DebugOverlay:
+    # F3 screen: position, frame-time percentiles, per-subsystem averages, GC,
+    # live counts and memory, fed from a FrameProfiler.
+    def __init__(self, profiler, world):
+        self.profiler = profiler
+        self.world = world
+        self.text = Text(parent=camera.ui, position=window.top_left + Vec2(0.01, -0.01),
+                         origin=(-0.5, 0.5), scale=0.75, background=True, enabled=False)
+        self.next_refresh = 0
+
+    def toggle(self):
+        self.text.enabled = not self.text.enabled
+
+    def block_memory(self):
+        kinds, dense = self.world.memory_report()
+        total = sum(size for _, size in kinds.values())
+        sections = '  '.join(f'{kind} {count}' for kind, (count, _) in sorted(kinds.items()))
+        return f'blocks {total / (1 << 20):.1f} MB (dense {dense / (1 << 20):.1f} MB)  {sections}'
+
+    def refresh(self, position, block):
+        if not self.text.enabled or time.time() < self.next_refresh:
+            return
+        self.next_refresh = time.time() + 0.25
+        p = self.profiler
+        last = p.frames[-1] if p.frames else {}
+        pct = p.percentiles()
+        avg = p.averages()
+        gc_count, gc_worst = p.gc_pauses()
+        memory = last.get('memory_mb')
+        lines = [
+            f'xyz {position[0]:.1f} {position[1]:.1f} {position[2]:.1f}  block {block}',
+            f'frame p50 {pct[50]:.1f}  p95 {pct[95]:.1f}  p99 {pct[99]:.1f} ms',
+            '  '.join(f'{name} {avg[name]:.2f}' for name in SECTIONS),
+            f'gc {gc_count} pauses, worst {gc_worst:.1f} ms (last {len(p.frames)} frames)',
+            f"chunks {last.get('chunks', 0)}  meshed {last.get('meshed', 0)}  "
+            f"dirty {last.get('dirty', 0)}  entities {last.get('entities', 0)}",
+            f"visible {last.get('visible', 0)}  culled: frustum {last.get('frustum_culled', 0)}  "
+            f"distance {last.get('distance_culled', 0)}",
+            f"block ticks queued {last.get('ticks_queued', 0)}  "
+            f"edits {self.world.journal.cursor}/{len(self.world.journal)} ({self.world.journal.nbytes / 1024:.0f} KB)",
+            'memory ' + ('n/a' if memory is None else f'{memory:.0f} MB') + ('  [REC csv]' if p.recording else ''),
+            self.block_memory(),
+        ]
+        self.text.text = '\n'.join(lines)
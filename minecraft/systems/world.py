@@ -1,59 +1,479 @@
-import random, math
+import random, math, time
+from collections import OrderedDict
+import numpy as np
 from perlin_noise import PerlinNoise
-from ursina import destroy
 from minecraft.config.settings import Settings
-from minecraft.config.blocks import BlockID
-from minecraft.core.voxel import Voxel
+from minecraft.config.blocks import BlockID, BlockRegistry
+from minecraft.core.chunk import Chunk, box_chunks, chunk_key, chunk_shape, in_height_range, pad_blocks
+from minecraft.core.lighting import LightEngine
+from minecraft.core.mesher import build_chunk_mesh, color_table
+from minecraft.core.raycast import raycast
+from minecraft.systems.biomes import BIOMES, STRATA, BiomeMap
+from minecraft.systems.journal import EditJournal
+from minecraft.systems.structures import TEMPLATES, stamp
+from minecraft.systems.terrain import CaveNoise, TerrainNoise, chunk_columns
+from minecraft.systems.ticks import BlockTicker
+
+
+def block_pos(pos):
+    return tuple(int(round(c)) for c in pos)
+
 
 class WorldManager:
-    def __init__(self):
+    def __init__(self, renderer=None, storage=None):
         self.noise = PerlinNoise(
             octaves=Settings.TERRAIN_OCTAVES,
             seed=Settings.SEED
         )
-        self.voxels = {}
+        self.terrain = TerrainNoise(self.noise.seed)
+        self.caves = CaveNoise(self.noise.seed)
+        self.biomes = BiomeMap(self.noise.seed)
+        self.chunks = {}
+        # Blocks that generation placed outside their own chunk (tree crowns),
+        # {target chunk: {source chunk: [(pos, id)]}}. Kept so a chunk that is
+        # unloaded and generated again gets its neighbours' spill back; keyed
+        # by source so a source that reloads replaces its entry.
+        self.spills = {}
+        # None runs headless: meshes are still built but never uploaded.
+        self.renderer = renderer
+        # Optional RegionStore; without one nothing is saved.
+        self.storage = storage
+        self.colors = color_table()
+        # Chunks waiting for a remesh after block edits, most urgent first.
+        # Edits only mark chunks; flush_remesh() rebuilds them once per frame.
+        self.dirty = OrderedDict()
+        # Level of detail of each meshed chunk (0 full, n: 2^n blocks per
+        # cell); the streamer picks it for distant chunks.
+        self.lods = {}
+        # Sky and block light, baked into the meshes; None draws flat colors.
+        self.light = LightEngine(self) if Settings.LIGHTING else None
+        # Falling sand and flowing water, scheduled by edits.
+        self.ticks = BlockTicker(self)
+        # Undo/redo log of block edits.
+        self.journal = EditJournal(self)
 
     def generate_terrain(self):
         offset = Settings.WORLD_SIZE // 2
+        lo, hi = -offset, Settings.WORLD_SIZE - offset
+        span = range(lo // Settings.CHUNK_SIZE, (hi-1) // Settings.CHUNK_SIZE + 1)
+        columns = {}
+
+        for cx in span:
+            for cz in span:
+                saved = self.storage.load(cx, cz) if self.storage is not None else None
+                if saved is not None:
+                    self.add_chunk(saved, saved.spills_out)
+                    continue
+                xs, zs = chunk_columns(cx, cz)
+                inside = (xs >= lo) & (xs < hi) & (zs >= lo) & (zs < hi)
+                heights = self.heights(xs, zs)
+                chunk = self.get_chunk(cx, cz, create=True)
+                self.stratify(chunk, heights, inside)
+                self.carve(chunk, heights, inside)
+                columns[(cx, cz)] = (heights, inside)
+
+        # Same order as generate_chunk + add_chunk: every chunk's own trees
+        # first, then the spill between chunks.
+        spills = {key: self.decorate(self.chunks[key], *columns[key]) for key in columns}
+        for key in columns:
+            self.add_chunk(self.chunks[key], spills[key])
+
+        for key in self.chunks:
+            self.remesh_chunk(key)
+
+    def load_chunk(self, cx, cz):
+        # Saved copy if there is one, otherwise generate. Thread-safe like
+        # generate_chunk.
+        if self.storage is not None:
+            chunk = self.storage.load(cx, cz)
+            if chunk is not None:
+                return chunk, chunk.spills_out
+        return self.generate_chunk(cx, cz)
+
+    def save(self, keys=None):
+        if self.storage is None:
+            return 0
+        keys = self.chunks if keys is None else keys
+        return self.storage.save([self.chunks[k] for k in keys if k in self.chunks])
+
+    def chunk_rng(self, cx, cz):
+        # Derived from the world seed and chunk position only, so chunks can be
+        # generated in any order, on any thread or process, and come out the same.
+        return random.Random(f'{self.noise.seed}:{cx}:{cz}')
+
+    def generate_chunk(self, cx, cz):
+        # Pure function of the seed: builds a detached Chunk plus the blocks it
+        # spills into neighbours, without touching self.chunks. Safe to run
+        # from a worker thread.
+        chunk = Chunk(cx, cz)
+        heights = self.heights(*chunk_columns(cx, cz))
+        self.stratify(chunk, heights)
+        self.carve(chunk, heights)
+        return chunk, self.decorate(chunk, heights)
+
+    def decorate(self, chunk, heights, columns=None):
+        # Trees, boulders and houses for one chunk, stamped straight into its
+        # array from their templates. Blocks that land in another chunk are
+        # returned as {chunk key: [(pos, id)]}.
+        rng = self.chunk_rng(chunk.cx, chunk.cz)
+        spills = {}
+        xs, zs = (a.tolist() for a in chunk_columns(chunk.cx, chunk.cz))
+        biomes = self.biomes.chunk(chunk.cx, chunk.cz)[0].tolist()
+        heights = heights.tolist()
+        for iz in range(Settings.CHUNK_SIZE):
+            for ix in range(Settings.CHUNK_SIZE):
+                # Roll every column, masked or not, so a chunk's RNG stream does
+                # not depend on where the world edge is.
+                roll = rng.random()
+                if columns is not None and not columns[ix, iz]:
+                    continue
+                h = heights[ix][iz]
+                if h <= 0:
+                    continue
+                for kind, chance in BIOMES[biomes[ix][iz]].structures:
+                    if roll < chance:
+                        variants = TEMPLATES[kind]
+                        stamp(chunk, variants[rng.randrange(len(variants))], (xs[ix][iz], h+1, zs[ix][iz]), spills)
+                        break
+                    roll -= chance
+        return spills
+
+    def add_chunk(self, chunk, spills):
+        # Main thread only. Returns the already-loaded chunks whose blocks changed.
+        self.chunks[chunk.key] = chunk
+        chunk.spills_out = spills
+        for blocks in self.spills.get(chunk.key, {}).values():
+            chunk.merge(blocks)
+        touched = set()
+        for key, blocks in spills.items():
+            self.spills.setdefault(key, {})[chunk.key] = blocks
+            if key in self.chunks and not self.chunks[key].from_disk:
+                self.chunks[key].merge(blocks)
+                touched.add(key)
+        if self.light is not None:
+            for key in touched | {chunk.key}:
+                self.light.invalidate(key)
+        return touched
 
-        for z in range(Settings.WORLD_SIZE):
-            for x in range(Settings.WORLD_SIZE):
-                wx, wz = x-offset, z-offset
-                h = self.get_height(wx, wz)
+    def unload_chunk(self, key):
+        # Callers unloading many chunks should save() them in one batch first.
+        self.save([key])
+        self.dirty.pop(key, None)
+        self.lods.pop(key, None)
+        if self.light is not None:
+            self.light.invalidate(key)
+        chunk = self.chunks.pop(key, None)
+        if chunk is not None:
+            self.drop_spills(key, chunk.spills_out)
+        if self.renderer is not None:
+            self.renderer.hide(key)
 
-                self.create_block((wx,h,wz), BlockID.GRASS)
-                for d in range(1,4):
-                    self.create_block(
-                        (wx,h-d,wz),
-                        BlockID.DIRT if d < 2 else BlockID.STONE
-                    )
+    def drop_spills(self, key, spills_out):
+        # Forget spill entries with neither end loaded any more: the source
+        # adds its entry again when it loads.
+        pairs = [(target, key) for target in spills_out] + [(key, source) for source in self.spills.get(key, ())]
+        for target, source in pairs:
+            if target in self.chunks or source in self.chunks:
+                continue
+            sources = self.spills.get(target, {})
+            sources.pop(source, None)
+            if not sources:
+                self.spills.pop(target, None)
 
-                if random.random() < 0.02 and h > 0:
-                    self.generate_tree(wx, h+1, wz)
+    def heights(self, xs, zs):
+        # Surface height of block columns, scaled by each column's biome.
+        return self.terrain.heights(xs, zs, self.biomes.columns(xs, zs)[1])
 
     def get_height(self, x, z):
         v = self.noise([x*Settings.TERRAIN_SCALE, z*Settings.TERRAIN_SCALE])
-        return math.floor(v * Settings.TERRAIN_AMPLITUDE)
+        return math.floor(v * self.biomes.columns([x], [z])[1][0])
+
+    def stratify(self, chunk, heights, columns=None):
+        # Lay the biome's strata down from each column's surface height in
+        # one pass per layer, then solid stone below them to the bottom of
+        # the world.
+        ix, iz = np.nonzero(np.ones(heights.shape, bool) if columns is None else columns)
+        strata = STRATA[self.biomes.chunk(chunk.cx, chunk.cz)[0][ix, iz]]
+        surface = heights[ix, iz] - Settings.MIN_Y
+        for depth in range(strata.shape[1]):
+            iy = surface - depth
+            ok = (iy >= 0) & (iy < Settings.CHUNK_HEIGHT)
+            cells = (ix[ok], iy[ok], iz[ok])
+            chunk.blocks[cells] = np.where(chunk.blocks[cells] == BlockID.AIR, strata[ok, depth], chunk.blocks[cells])
+        column = chunk.blocks[ix, :, iz]
+        below = np.arange(Settings.CHUNK_HEIGHT)[None, :] <= (surface - strata.shape[1])[:, None]
+        chunk.blocks[ix, :, iz] = np.where(below & (column == BlockID.AIR), BlockID.STONE, column)
+
+    def carve(self, chunk, heights, columns=None):
+        # Caves: air wherever the 3D cave noise rises above CAVE_THRESHOLD,
+        # between CAVE_DEPTH blocks below each column's surface. The noise is
+        # only evaluated over the rows that depth range can reach.
+        if not Settings.CAVES:
+            return
+        lo, hi = Settings.CAVE_DEPTH
+        first = max(1, int(heights.min()) - hi - Settings.MIN_Y)
+        last = min(Settings.CHUNK_HEIGHT, int(heights.max()) - lo - Settings.MIN_Y + 1)
+        if first >= last:
+            return
+        rows = slice(first, last)
+        depth = heights[:, None, :] - (Settings.MIN_Y + np.arange(first, last))[None, :, None]
+        hollow = (depth >= lo) & (depth <= hi) & (self.caves.chunk(chunk.cx, chunk.cz, rows) > Settings.CAVE_THRESHOLD)
+        if columns is not None:
+            hollow &= columns[:, None, :]
+        chunk.blocks[:, rows, :][hollow] = BlockID.AIR
+
+    def get_chunk(self, cx, cz, create=False):
+        chunk = self.chunks.get((cx, cz))
+        if chunk is None and create:
+            chunk = self.chunks[(cx, cz)] = Chunk(cx, cz)
+        return chunk
+
+    def get_block(self, pos):
+        x, y, z = block_pos(pos)
+        if not in_height_range(y):
+            return BlockID.AIR
+        chunk = self.chunks.get(chunk_key(x, z))
+        return chunk.get(x, y, z) if chunk else BlockID.AIR
+
+    def is_solid(self, x, y, z):
+        # Integer-only fast path for physics.
+        if not in_height_range(y):
+            return False
+        chunk = self.chunks.get(chunk_key(x, z))
+        return chunk is not None and BlockRegistry.SOLID[chunk.get(x, y, z)]
+
+    def is_loaded(self, pos):
+        x, _, z = block_pos(pos)
+        return chunk_key(x, z) in self.chunks
+
+    def set_block(self, pos, block_id):
+        # Storage only, no remesh. Returns False if the cell was already taken.
+        x, y, z = block_pos(pos)
+        if not in_height_range(y):
+            return False
+        chunk = self.get_chunk(*chunk_key(x, z), create=True)
+        if chunk.get(x, y, z) != BlockID.AIR:
+            return False
+        chunk.set(x, y, z, block_id)
+        return True
+
+    def raycast(self, origin, direction, reach=None):
+        return raycast(self.get_block, origin, direction, Settings.REACH if reach is None else reach)
 
     def create_block(self, pos, block_id):
-        pos = tuple(pos)
-        if pos in self.voxels:
+        pos = block_pos(pos)
+        if self.set_block(pos, block_id):
+            self.journal.record(pos, BlockID.AIR, block_id)
+            self.block_changed(pos)
+
+    def remove_block(self, pos):
+        pos = block_pos(pos)
+        x, y, z = pos
+        chunk = self.chunks.get(chunk_key(x, z)) if in_height_range(y) else None
+        old = chunk.get(x, y, z) if chunk is not None else BlockID.AIR
+        if old == BlockID.AIR:
             return
-        self.voxels[pos] = Voxel(pos, block_id)
-
-    def remove_block(self, voxel):
-        pos = tuple(voxel.position)
-        if pos in self.voxels:
-            del self.voxels[pos]
-            destroy(voxel)
-
-    def generate_tree(self, x, y, z):
-        h = random.randint(4,6)
-        for i in range(h):
-            self.create_block((x,y+i,z), BlockID.WOOD)
-
-        for ly in range(2):
-            for lx in range(-1,2):
-                for lz in range(-1,2):
-                    if lx==lz==ly==0: continue
-                    self.create_block((x+lx,y+h-2+ly,z+lz), BlockID.LEAVES)
+        chunk.set(x, y, z, BlockID.AIR)
+        self.journal.record(pos, old, BlockID.AIR)
+        self.block_changed(pos)
+
+    def put_block(self, pos, block_id, relight=True):
+        # Overwrites whatever is at pos; block ticks move blocks with this and
+        # relight in a batch afterwards. Not journaled. Returns False outside
+        # the loaded world.
+        x, y, z = pos
+        chunk = self.chunks.get(chunk_key(x, z)) if in_height_range(y) else None
+        if chunk is None:
+            return False
+        chunk.set(x, y, z, block_id)
+        self.block_changed(pos, relight)
+        return True
+
+    def block_changed(self, pos, relight=True):
+        if relight:
+            self.relight(pos)
+        self.ticks.notify(pos)
+        self.mark_dirty(pos)
+
+    def relight(self, pos):
+        # Chunks whose light changed with the block at pos get remeshed too.
+        if self.light is None:
+            return
+        for key in self.light.update(pos):
+            if key in self.lods:
+                self.dirty.setdefault(key)
+
+    def relight_batch(self, positions):
+        # Light for many changed blocks: cell by cell where a chunk saw only a
+        # few changes, a full relight at its next remesh where it saw more
+        # than LIGHT_BATCH_CELLS.
+        if self.light is None:
+            return
+        by_chunk = {}
+        for pos in positions:
+            by_chunk.setdefault(chunk_key(pos[0], pos[2]), []).append(pos)
+        for key, cells in by_chunk.items():
+            if len(cells) > Settings.LIGHT_BATCH_CELLS:
+                self.light.invalidate(key)
+            else:
+                for pos in cells:
+                    self.relight(pos)
+
+    def mark_dirty(self, pos):
+        # The edited chunk, plus any neighbour whose border face just changed.
+        # A chunk already queued is not queued twice, so a burst of edits costs
+        # one rebuild per chunk; the edited chunk jumps the queue so the click
+        # shows up on the next flush.
+        x, _, z = pos
+        home = chunk_key(x, z)
+        for dx, dz in ((1,0), (-1,0), (0,1), (0,-1)):
+            key = chunk_key(x+dx, z+dz)
+            if key != home and key in self.chunks:
+                self.dirty.setdefault(key)
+        if home in self.chunks:
+            self.dirty[home] = None
+            self.dirty.move_to_end(home, last=False)
+
+    def edit_box(self, lo, hi, edit):
+        # Vectorised edit of the loaded chunks overlapping the inclusive block
+        # box lo..hi. edit(blocks, corner) gets one chunk's piece of the box and
+        # the world position of its low corner, and returns the new IDs. Each
+        # changed chunk, and each neighbour whose border it changed, is marked
+        # dirty once. The whole edit is one undo step. Returns the number of
+        # blocks changed.
+        with self.journal.group():
+            return self.edit_pieces(lo, hi, edit)
+
+    def edit_pieces(self, lo, hi, edit):
+        s = Settings.CHUNK_SIZE
+        changed = 0
+        for key, index, corner in box_chunks(lo, hi):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                continue
+            old = chunk.view()[index]
+            new = edit(old, corner)
+            diff = new != old
+            count = int(np.count_nonzero(diff))
+            if not count:
+                continue
+            # Before assign: on a dense chunk old is a view of its blocks.
+            self.journal.record_box(corner, old, new, diff)
+            chunk.assign(index, new)
+            self.ticks.notify_box(corner, new, diff)
+            changed += count
+            cx, cz = key
+            xs, _, zs = index
+            sides = {(cx-1, cz): xs.start == 0 and diff[0].any(),
+                     (cx+1, cz): xs.stop == s and diff[-1].any(),
+                     (cx, cz-1): zs.start == 0 and diff[:, :, 0].any(),
+                     (cx, cz+1): zs.stop == s and diff[:, :, -1].any()}
+            for k in [key] + [k for k, hit in sides.items() if hit]:
+                if k in self.chunks:
+                    self.dirty.setdefault(k)
+                    # Bulk edits relight whole chunks when they are remeshed
+                    # rather than flooding cell by cell.
+                    if self.light is not None:
+                        self.light.invalidate(k)
+        return changed
+
+    def fill_box(self, lo, hi, block_id):
+        return self.edit_box(lo, hi, lambda old, corner: np.full_like(old, block_id))
+
+    def replace_box(self, lo, hi, old_id, new_id):
+        return self.edit_box(lo, hi, lambda old, corner: np.where(old == old_id, np.uint8(new_id), old))
+
+    def clear_sphere(self, center, radius, block_id=BlockID.AIR):
+        cx, cy, cz = block_pos(center)
+        r = int(math.ceil(radius))
+
+        def edit(old, corner):
+            x, y, z = (np.arange(n) + c - m for n, c, m in zip(old.shape, corner, (cx, cy, cz)))
+            inside = x[:, None, None]**2 + y[None, :, None]**2 + z[None, None, :]**2 <= radius**2
+            return np.where(inside, np.uint8(block_id), old)
+        return self.edit_box((cx-r, cy-r, cz-r), (cx+r, cy+r, cz+r), edit)
+
+    def copy_box(self, lo, hi):
+        # Block IDs of the inclusive box as an array, for paste(); cells in
+        # unloaded chunks or outside the height range come back as air.
+        lo, hi = tuple(map(min, lo, hi)), tuple(map(max, lo, hi))
+        out = np.zeros([b - a + 1 for a, b in zip(lo, hi)], dtype=np.uint8)
+        for key, index, corner in box_chunks(lo, hi):
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                part = chunk.view()[index]
+                at = tuple(slice(c - l, c - l + n) for c, l, n in zip(corner, lo, part.shape))
+                out[at] = part
+        return out
+
+    def paste(self, structure, corner, skip_air=True):
+        # Writes a block-ID array with its low corner at `corner`. With
+        # skip_air, air cells in the structure leave the world unchanged.
+        structure = np.asarray(structure, dtype=np.uint8)
+        lo = block_pos(corner)
+        hi = tuple(c + n - 1 for c, n in zip(lo, structure.shape))
+
+        def edit(old, at):
+            part = structure[tuple(slice(a - l, a - l + n) for a, l, n in zip(at, lo, old.shape))]
+            return np.where(part != BlockID.AIR, part, old) if skip_air else part
+        return self.edit_box(lo, hi, edit)
+
+    def flush_remesh(self, budget_ms=None):
+        # Rebuild dirty chunks until the frame budget is spent, always at least
+        # one; the rest wait for the next frame. Returns how many were rebuilt.
+        budget = (Settings.REMESH_BUDGET_MS if budget_ms is None else budget_ms) / 1000
+        start = time.perf_counter()
+        rebuilt = 0
+        while self.dirty and (rebuilt == 0 or time.perf_counter() - start < budget):
+            key, _ = self.dirty.popitem(last=False)
+            if key in self.chunks:
+                self.remesh_chunk(key)
+                rebuilt += 1
+        return rebuilt
+
+    def build_mesh(self, key):
+        # At the level of detail the streamer last picked for this chunk.
+        padded, scale, light = self.mesh_input(key, self.lods.get(key, 0))
+        return build_chunk_mesh(padded, self.colors, None, scale, light)
+
+    def mesh_input(self, key, lod=0):
+        # (padded blocks, scale, padded light or None) for build_chunk_mesh.
+        # Lighting the chunk can change its neighbours' light; the meshed
+        # ones are queued for a remesh.
+        scale = 1 << lod
+        light = None
+        if self.light is not None and lod == 0:
+            light, touched = self.light.padded(*key)
+            for k in touched:
+                if k in self.lods:
+                    self.dirty.setdefault(k)
+        return self.padded_blocks(*key, scale), scale, light
+
+    def remesh_chunk(self, key):
+        mesh = self.build_mesh(key)
+        self.lods.setdefault(key, 0)
+        self.settle(key)
+        if self.renderer is not None:
+            self.renderer.show(key, mesh)
+        return mesh
+
+    def settle(self, key):
+        # A chunk that was just meshed is usually left alone for a while, so
+        # it is held compacted until the next write expands it.
+        if Settings.COMPACT_CHUNKS and key in self.chunks:
+            self.chunks[key].compact()
+
+    def memory_report(self):
+        # Block storage by section kind: {kind: (sections, bytes)}, plus what
+        # the same chunks would take dense.
+        out = {}
+        for chunk in self.chunks.values():
+            for kind, (count, size) in chunk.memory().items():
+                c, b = out.get(kind, (0, 0))
+                out[kind] = (c + count, b + size)
+        dense = len(self.chunks) * int(np.prod(chunk_shape()))
+        return out, dense
+
+    def padded_blocks(self, cx, cz, border=1):
+        return pad_blocks(lambda key, index: self.chunks[key].read(index) if key in self.chunks else None,
+                          cx, cz, border)